@@ -0,0 +1,225 @@
+"""
+alerts.py - Indexed price alerts checked against every batch of fetched quotes
+
+Rules are one line of text each:
+
+    SPK.NZ below 4.50               price crosses down through 4.50
+    NVDA above 150                  price crosses up through 150
+    FPH.NZ moves more than 2%       |change vs previous close| crosses 2%
+    any .NZ symbol moves more than 3%
+    any symbol moves more than 5%
+
+Level rules are edge-triggered. They fire when a new price crosses the level since the
+previous price, or on the first price seen if it is already past the level. So a symbol
+sitting below its alert doesn't fire on every cycle, and it re-arms once it moves back.
+Move rules work the same way on the absolute daily change, so they re-arm at the start of
+the next session.
+
+Indexing: each symbol keeps its 'above' and 'below' levels in sorted lists. Move rules are
+sorted per scope (symbol, suffix or any) and merged per symbol on first use. A price update
+finds the crossed levels with two bisections, so one quote costs O(log rules + fired)
+however many rules exist.
+
+AlertEngine.check(quotes) takes anything with .symbol/.price/.change_pct (stale quotes are
+skipped) and hands each Alert to the registered hooks (tickerV3: log, bell and the Recent
+Alerts list).
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+import yaml
+
+
+# ----------------------------- Tunable Constants -----------------------------
+ALERTS_FILE = "alerts.yaml"
+
+_RULE_RE = re.compile(
+    r"^\s*(?:(?P<any>any)(?:\s+(?P<suffix>\.[A-Z0-9]+))?(?:\s+symbols?)?|(?P<symbol>[A-Z0-9^=.\-]+))\s+"
+    r"(?:(?P<dir>above|below)\s+\$?(?P<level>\d+(?:\.\d*)?)"
+    r"|moves?\s+(?:(?:more\s+than|over|by|>)\s*)?(?P<pct>\d+(?:\.\d*)?)\s*%?)\s*$",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One parsed rule. scope is a symbol, a '.SUFFIX' or '*' (move rules only)."""
+    text: str
+    scope: str
+    kind: str       # 'above' | 'below' | 'move'
+    level: float    # price for above/below, percent for move
+
+
+@dataclass
+class Alert:
+    """A rule that fired for one symbol."""
+    rule: Rule
+    symbol: str
+    price: float
+    change_pct: Optional[float]
+
+    @property
+    def message(self) -> str:
+        change = "" if self.change_pct is None else f" ({self.change_pct:+.2f}%)"
+        return f"{self.symbol} at {self.price:.2f}{change}: {self.rule.text}"
+
+
+def parse_rule(text: str) -> Rule:
+    """Parse one rule line; raises ValueError if it doesn't match the grammar above."""
+    m = _RULE_RE.match(text)
+    if not m:
+        raise ValueError(f"Unrecognised alert rule: {text!r}")
+    if m.group("any"):
+        if m.group("dir"):
+            raise ValueError(f"Level alerts need a symbol, not 'any': {text!r}")
+        scope = m.group("suffix").upper() if m.group("suffix") else "*"
+    else:
+        scope = m.group("symbol").upper()
+    if m.group("dir"):
+        return Rule(text.strip(), scope, m.group("dir").lower(), float(m.group("level")))
+    return Rule(text.strip(), scope, "move", float(m.group("pct")))
+
+
+def load_rules(path: str = ALERTS_FILE) -> list[str]:
+    """Rule lines from path ({'alerts': [...]} or a bare list); [] if the file is missing."""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        src = data if isinstance(data, list) else (data.get("alerts") or [] if isinstance(data, dict) else [])
+        return [str(r).strip() for r in src if r and str(r).strip()]
+    except Exception as e:
+        logging.warning(f"Alerts load warning ({path}): {e}")
+        return []
+
+
+def save_rules(rules: Iterable[Rule], path: str = ALERTS_FILE):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.safe_dump({"alerts": [r.text for r in rules]}, f, default_flow_style=False, sort_keys=False)
+    except Exception as e:
+        logging.error(f"Alerts save failed: {e}")
+
+
+class Levels:
+    """Sorted thresholds with their rules in parallel lists (bisect on levels)."""
+
+    __slots__ = ("levels", "rules")
+
+    def __init__(self):
+        self.levels: list[float] = []
+        self.rules: list[Rule] = []
+
+    def add(self, rule: Rule):
+        i = bisect.bisect_right(self.levels, rule.level)
+        self.levels.insert(i, rule.level)
+        self.rules.insert(i, rule)
+
+    def remove(self, rule: Rule) -> bool:
+        i = bisect.bisect_left(self.levels, rule.level)
+        while i < len(self.levels) and self.levels[i] == rule.level:
+            if self.rules[i] == rule:
+                del self.levels[i], self.rules[i]
+                return True
+            i += 1
+        return False
+
+    def crossed_up(self, old: Optional[float], new: float) -> list[Rule]:
+        """Rules with old < level <= new (every level <= new when old is None)."""
+        lo = 0 if old is None else bisect.bisect_right(self.levels, old)
+        return self.rules[lo:bisect.bisect_right(self.levels, new)]
+
+    def crossed_down(self, old: Optional[float], new: float) -> list[Rule]:
+        """Rules with new <= level < old (every level >= new when old is None)."""
+        hi = len(self.levels) if old is None else bisect.bisect_left(self.levels, old)
+        return self.rules[bisect.bisect_left(self.levels, new):hi]
+
+
+class AlertEngine:
+    """Rule index + last-seen state; check() is called once per fetched batch."""
+
+    def __init__(self, rules: Iterable[str] = (), hooks: Iterable[Callable[[Alert], None]] = ()):
+        self._above: dict[str, Levels] = {}
+        self._below: dict[str, Levels] = {}
+        self._moves: dict[str, Levels] = {}          # scope -> move rules
+        self._move_cache: dict[str, Levels] = {}     # symbol -> merged move rules of its scopes
+        self._last_price: dict[str, float] = {}
+        self._last_move: dict[str, float] = {}
+        self.rules: list[Rule] = []
+        self.hooks: list[Callable[[Alert], None]] = list(hooks)
+        for text in rules:
+            try:
+                self.add_rule(text)
+            except ValueError as e:
+                logging.warning(str(e))
+
+    def add_hook(self, hook: Callable[[Alert], None]):
+        self.hooks.append(hook)
+
+    def add_rule(self, text: str) -> Rule:
+        rule = parse_rule(text)
+        book = {"above": self._above, "below": self._below, "move": self._moves}[rule.kind]
+        book.setdefault(rule.scope, Levels()).add(rule)
+        if rule.kind == "move":
+            self._move_cache.clear()
+        self.rules.append(rule)
+        return rule
+
+    def remove_rule(self, rule: Rule):
+        book = {"above": self._above, "below": self._below, "move": self._moves}[rule.kind]
+        levels = book.get(rule.scope)
+        if levels is not None and levels.remove(rule):
+            if not levels.levels:
+                del book[rule.scope]
+            if rule.kind == "move":
+                self._move_cache.clear()
+            self.rules.remove(rule)
+
+    def _moves_for(self, symbol: str) -> Optional[Levels]:
+        merged = self._move_cache.get(symbol)
+        if merged is None:
+            merged = Levels()
+            suffix = "." + symbol.rsplit(".", 1)[1] if "." in symbol else None
+            for scope in (symbol, suffix, "*"):
+                for rule in self._moves[scope].rules if scope in self._moves else ():
+                    merged.add(rule)
+            self._move_cache[symbol] = merged
+        return merged if merged.levels else None
+
+    def check(self, quotes: Iterable) -> list[Alert]:
+        """Evaluate fresh quotes against the index, notify the hooks and return what fired."""
+        fired: list[Alert] = []
+        for q in quotes:
+            if q.price is None or getattr(q, "stale", False):
+                continue
+            sym, price = q.symbol, float(q.price)
+            old = self._last_price.get(sym)
+            if old != price:
+                self._last_price[sym] = price
+                up, down = self._above.get(sym), self._below.get(sym)
+                rules = (up.crossed_up(old, price) if up else []) + (down.crossed_down(old, price) if down else [])
+                fired.extend(Alert(r, sym, price, q.change_pct) for r in rules)
+            if q.change_pct is not None and self._moves:
+                move = abs(float(q.change_pct))
+                old_move = self._last_move.get(sym)
+                if old_move != move:
+                    self._last_move[sym] = move
+                    levels = self._moves_for(sym)
+                    if levels is not None:
+                        fired.extend(Alert(r, sym, price, q.change_pct)
+                                     for r in levels.crossed_up(-1.0 if old_move is None else old_move, move))
+        for alert in fired:
+            for hook in self.hooks:
+                try:
+                    hook(alert)
+                except Exception as e:
+                    logging.error(f"Alert hook failed: {e}")
+        return fired
@@ -0,0 +1,263 @@
+"""
+baskets.py - Live custom basket / index levels with O(1) updates per price change
+
+baskets.yaml defines weighted baskets over tape symbols:
+
+    baskets:
+      - name: NZX EQ
+        members: .NZ            # a suffix, 'tape' (every non-index tape symbol) or a list
+        weighting: equal        # equal | mcap | fixed
+        rebalance: monthly      # daily | weekly | monthly | seconds between rebalances
+      - name: NZX CAP
+        members: .NZ
+        weighting: mcap
+        rebalance: weekly
+      - name: CHIPS
+        members: [NVDA, AMD, TSM]
+        weighting: fixed
+        weights: {NVDA: 0.5, AMD: 0.25, TSM: 0.25}
+        base: 100
+
+A basket holds notional units of each member, like a real index fund. At a rebalance the
+units are set so that each member is its target weight of the current level (the level
+stays continuous), and between rebalances the weights drift with prices. The level is
+sum(units * price). A price change moves it by units_i * (new - old): O(1) per quote, no
+re-sum. The previous-close level is kept the same way, so the tape shows a daily change.
+
+Weights: equal = 1/k over members with a price. fixed = the configured weights,
+renormalized over members with a price. mcap = market caps from Yahoo info (fetched
+in the background when a rebalance is due; equal weight until they arrive). Caps are
+compared in each member's listing currency, which is fine for single-exchange baskets.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import yaml
+
+
+# ----------------------------- Tunable Constants -----------------------------
+BASKETS_FILE = "baskets.yaml"
+BASE_LEVEL = 1000.0
+DEFAULT_REBALANCE = "monthly"
+WEIGHTINGS = ("equal", "mcap", "fixed")
+
+
+def next_rebalance(spec, now: float) -> float:
+    """Epoch seconds of the next rebalance after now: local midnight / Monday / 1st of month, or now + seconds."""
+    if isinstance(spec, (int, float)) or str(spec).replace(".", "", 1).isdigit():
+        return now + max(60.0, float(spec))
+    day = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    spec = str(spec).lower()
+    if spec == "daily":
+        nxt = day + timedelta(days=1)
+    elif spec == "weekly":
+        nxt = day + timedelta(days=7 - day.weekday())
+    elif spec == "monthly":
+        nxt = (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+    else:
+        raise ValueError(f"Unknown rebalance schedule {spec!r} (daily, weekly, monthly or seconds)")
+    return nxt.timestamp()
+
+
+class Basket:
+    """One basket: units per member, live level and previous-close level."""
+
+    def __init__(self, name: str, members: list[str], weighting: str = "equal",
+                 weights: Optional[dict[str, float]] = None, rebalance=DEFAULT_REBALANCE,
+                 base: float = BASE_LEVEL):
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Basket {name}: weighting must be one of {', '.join(WEIGHTINGS)}")
+        self.name = name
+        self.members = list(dict.fromkeys(members))
+        self.index = {s: i for i, s in enumerate(self.members)}
+        self.weighting = weighting
+        self.fixed = np.array([float((weights or {}).get(s, 0.0)) for s in self.members])
+        self.schedule = rebalance
+        next_rebalance(rebalance, time.time())  # validate now, not at the first rebalance
+        self.base = float(base)
+        n = len(self.members)
+        self.units = np.zeros(n)
+        self.price = np.full(n, np.nan)
+        self.prev = np.full(n, np.nan)
+        self.level = math.nan
+        self.prev_level = math.nan
+        self.next_rebalance = 0.0   # 0 = not started; the first full board starts it
+        self.caps: dict[str, float] = {}
+        self.caps_requested = False # an mcap fetch for the due rebalance is in flight
+        self.caps_fresh = False     # caps arrived for the due rebalance
+        self.unpriced: set[int] = set()  # members with no price at the last rebalance (held at 0 units)
+
+    @property
+    def change_pct(self) -> Optional[float]:
+        if math.isnan(self.level) or not self.prev_level or math.isnan(self.prev_level):
+            return None
+        return (self.level / self.prev_level - 1.0) * 100.0
+
+    def update(self, col: int, price: float, prev: float) -> bool:
+        """O(1): move the levels by this member's units times its price change."""
+        old, old_prev = self.price[col], self.prev[col]
+        if price == old and (prev == old_prev or math.isnan(prev)):
+            return False
+        units = self.units[col]
+        if units and not math.isnan(old):
+            self.level += units * (price - old)
+            if not math.isnan(prev) and not math.isnan(old_prev):
+                self.prev_level += units * (prev - old_prev)
+            elif not math.isnan(prev):
+                self._reprice_prev(col, prev)
+        self.price[col] = price
+        if col in self.unpriced and price > 0:
+            self.unpriced.discard(col)
+            self.next_rebalance = min(self.next_rebalance, time.time())  # bring it in early
+        if not math.isnan(prev):
+            self.prev[col] = prev
+        return units != 0.0
+
+    def _reprice_prev(self, col: int, prev: float):
+        self.prev[col] = prev
+        self.prev_level = float(np.nansum(self.units * np.where(np.isnan(self.prev), self.price, self.prev)))
+
+    def target_weights(self) -> np.ndarray:
+        priced = ~np.isnan(self.price) & (self.price > 0)
+        if self.weighting == "fixed":
+            w = np.where(priced, self.fixed, 0.0)
+        elif self.weighting == "mcap" and self.caps:
+            w = np.array([self.caps.get(s, 0.0) if ok else 0.0 for s, ok in zip(self.members, priced)])
+        else:
+            w = priced.astype(np.float64)
+        total = w.sum()
+        return w / total if total > 0 else w
+
+    def rebalance(self, now: Optional[float] = None) -> bool:
+        """Reset units to the target weights at the current level (vectorized; level unchanged).
+
+        With no priced member nothing changes and the basket stays due, so the next cycle
+        retries. Members still unpriced are held at 0 units until their first price, which
+        brings the next rebalance forward. Returns True if the units were reset.
+        """
+        now = time.time() if now is None else now
+        w = self.target_weights()
+        if w.sum() <= 0:
+            logging.info(f"Basket {self.name}: no member priced yet; rebalance retried next cycle")
+            return False
+        level = self.base if math.isnan(self.level) else self.level
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.units = np.where(w > 0, w * level / self.price, 0.0)
+        self.level = float(np.nansum(self.units * self.price))
+        self.prev_level = float(np.nansum(self.units * np.where(np.isnan(self.prev), self.price, self.prev)))
+        wanted = self.fixed > 0 if self.weighting == "fixed" else np.ones(len(self.members), dtype=bool)
+        self.unpriced = set(np.flatnonzero(wanted & ~(self.price > 0)).tolist())
+        self.next_rebalance = next_rebalance(self.schedule, now)
+        self.caps_requested = self.caps_fresh = False
+        logging.info(f"Basket {self.name} rebalanced ({self.weighting}, {int((w > 0).sum())} members) "
+                     f"at {self.level:.2f}")
+        return True
+
+
+def resolve_members(spec, tape: list[str]) -> list[str]:
+    """Member list from a list, a '.SUFFIX' (tape symbols with it) or 'tape' (non-index tape symbols)."""
+    if isinstance(spec, list):
+        return [str(s).strip().upper() for s in spec if s]
+    spec = str(spec).strip()
+    if spec.lower() == "tape":
+        return [s for s in tape if not s.startswith("^") and not s.endswith("=X")]
+    if spec.startswith("."):
+        return [s for s in tape if s.upper().endswith(spec.upper())]
+    return [spec.upper()]
+
+
+def load_baskets(tape: list[str], path: str = BASKETS_FILE) -> list[Basket]:
+    """Baskets from path ({'baskets': [...]} or a bare list); [] if it is missing."""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except Exception as e:
+        logging.warning(f"Baskets load warning ({path}): {e}")
+        return []
+    out = []
+    for b in data if isinstance(data, list) else data.get("baskets") or []:
+        try:
+            weights = {str(k).upper(): float(v) for k, v in (b.get("weights") or {}).items()}
+            members = resolve_members(b.get("members", list(weights)), tape)
+            if not members:
+                raise ValueError("no members")
+            out.append(Basket(str(b["name"]), members, str(b.get("weighting", "equal")).lower(), weights,
+                              b.get("rebalance", DEFAULT_REBALANCE), float(b.get("base", BASE_LEVEL))))
+        except Exception as e:
+            logging.warning(f"Skipping basket {b!r} in {path}: {e}")
+    return out
+
+
+class BasketBook:
+    """All baskets plus a symbol -> [(basket, column)] index, so a quote touches only its baskets."""
+
+    def __init__(self, baskets: list[Basket]):
+        self.baskets = baskets
+        self._by_symbol: dict[str, list[tuple[Basket, int]]] = {}
+        for b in baskets:
+            for sym, col in b.index.items():
+                self._by_symbol.setdefault(sym, []).append((b, col))
+        self._caps_lock = threading.Lock()
+
+    def symbols(self) -> list[str]:
+        return list(self._by_symbol)
+
+    def apply(self, quotes: Iterable) -> bool:
+        """Fold quotes into every basket holding them (O(1) each). Returns True if any level moved."""
+        moved = False
+        for q in quotes:
+            entries = self._by_symbol.get(q.symbol)
+            if not entries or q.price is None:
+                continue
+            price = float(q.price)
+            chg = q.change_pct
+            prev = price / (1.0 + chg / 100.0) if chg is not None and chg > -100.0 else math.nan
+            for basket, col in entries:
+                moved = basket.update(col, price, prev) or moved
+        return moved
+
+    def due(self, now: Optional[float] = None) -> list[Basket]:
+        now = time.time() if now is None else now
+        return [b for b in self.baskets if now >= b.next_rebalance]
+
+    def rebalance_due(self, now: Optional[float] = None,
+                      fetch_caps: Optional[Callable[[Basket], None]] = None) -> list[Basket]:
+        """Rebalance due baskets.
+
+        An mcap basket asks fetch_caps(basket) for fresh caps first; the fetcher must end with
+        set_caps(). A running basket keeps its units until they arrive, and a new one starts at
+        equal weight and is rebalanced again once they do.
+        """
+        now = time.time() if now is None else now
+        done = []
+        with self._caps_lock:
+            for b in self.due(now):
+                if b.weighting == "mcap" and fetch_caps is not None and not b.caps_fresh:
+                    if not b.caps_requested:
+                        b.caps_requested = True
+                        fetch_caps(b)
+                    if b.next_rebalance or not b.rebalance(now):
+                        continue
+                    b.caps_requested = True     # still in flight; set_caps makes it due again
+                elif not b.rebalance(now):
+                    continue
+                done.append(b)
+        return done
+
+    def set_caps(self, basket: Basket, caps: dict[str, float]):
+        """From any thread: store fetched caps (empty = fetch failed: equal weight) and make the basket due."""
+        with self._caps_lock:
+            basket.caps = {s: c for s, c in caps.items() if c and c > 0}
+            basket.caps_fresh = True
+            basket.next_rebalance = min(basket.next_rebalance, time.time())
@@ -0,0 +1,483 @@
+"""
+charts.py - Price chart window for w_share_main (one reusable figure, blitting, LTTB downsampling)
+
+ChartWindow owns a single matplotlib Figure/canvas and a single Line2D for as long as the
+window is open. Switching ticker or range swaps the line's data in place, with no new
+figure or Toplevel. Bars come from history_store, so only missing history is downloaded.
+
+The single-symbol chart can overlay SMA 20/50 and Bollinger bands. These come from
+indicators.compute(), the same streaming code the screener and tape use, seeded with
+enough history before the visible range to be warmed up at its left edge.
+
+Drawing cost follows the canvas width, not the data size. Every series is reduced with
+Largest-Triangle-Three-Buckets (LTTB) to about one point per horizontal pixel, so a 20-year
+daily chart draws as fast as a month. Live refreshes of intraday ranges redraw only the
+line via blitting when the new data still fits the current axes.
+
+CompareWindow overlays N symbols rebased to 100 on shared axes. Missing history for all of
+them comes from one batch download (history_store.ensure_many). The series are aligned on
+a common day grid and rebased in a single vectorized pass (rebase_to_100).
+
+HeatmapWindow renders a correlation.RollingCorrelation matrix as one reusable image. show()
+only swaps the image data, and hovering a cell names the pair.
+
+matplotlib is imported when the first chart opens, not when w_share_main starts.
+"""
+
+from __future__ import annotations
+
+import time
+import tkinter as tk
+from typing import Callable, Optional
+
+import numpy as np
+
+import history_store
+import indicators
+
+
+# ----------------------------- Tunable Constants -----------------------------
+RANGES = {                  # label -> (days back or None for everything stored, bar interval)
+    "1d": (1, "5m"),
+    "5d": (5, "15m"),
+    "1mo": (31, "1d"),
+    "6mo": (183, "1d"),
+    "1y": (365, "1d"),
+    "5y": (5 * 365 + 2, "1d"),
+    "max": (None, "1d"),
+}
+DEFAULT_RANGE = "1mo"
+LIVE_REFRESH_MS = 60_000    # intraday ranges re-query the store (tail fetch) this often
+POINTS_PER_PIXEL = 1.0      # LTTB target density
+COMPARE_RANGES = ("1mo", "6mo", "1y", "5y", "max")   # daily only: intraday bars don't align across venues
+COMPARE_DEFAULT_RANGE = "1y"
+COMPARE_LEGEND_MAX = 15     # more lines than this get no legend (it would cover the chart)
+HEATMAP_LABEL_MAX = 60      # label the heatmap axes with symbols up to this many
+INDICATOR_WARMUP_BARS = 2 * indicators.SMA_SLOW   # history before the visible range fed to the overlays
+OVERLAYS = {                # indicators.compute() key -> line style
+    "sma_fast": dict(color="#ff9800", linewidth=0.9, label=f"SMA {indicators.SMA_FAST}"),
+    "sma_slow": dict(color="#9c27b0", linewidth=0.9, label=f"SMA {indicators.SMA_SLOW}"),
+    "boll_upper": dict(color="#888888", linewidth=0.7, linestyle="--", label=f"Bollinger {indicators.BOLL_PERIOD}"),
+    "boll_lower": dict(color="#888888", linewidth=0.7, linestyle="--", label="_nolegend_"),
+}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets downsampling of a sorted series to `threshold` points.
+
+    Keeps the first and last points. From each of the threshold-2 buckets in between, it keeps
+    the point that forms the largest triangle with the previously kept point and the next
+    bucket's average. Peaks and troughs survive, unlike plain striding.
+    """
+    keep = lttb_indices(x, y, threshold)
+    return x[keep], y[keep]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices lttb() keeps (so companion series, e.g. indicator overlays, can use the same points)."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def load_series(ticker: str, range_key: str) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+    """Blocking: (epoch seconds, close, indicator arrays) for ticker over range_key, from the local store."""
+    days, interval = RANGES[range_key]
+    start = None if days is None else int(time.time()) - days * 86400
+    history_store.ensure(ticker, interval, 0 if start is None else start)
+    last = history_store.last_timestamp(ticker, interval)
+    if start is not None and last is not None:
+        start = min(start, last - days * 86400)  # anchor on the last session (weekends, closed markets)
+    bars = history_store.query(ticker, interval=interval)
+    first = 0 if start is None else int(np.searchsorted(bars["ts"], start))
+    bars = bars[max(0, first - INDICATOR_WARMUP_BARS):]
+    ok = ~np.isnan(bars["close"])
+    bars = bars[ok]
+    ind = indicators.compute(np.asarray(bars["close"]), np.asarray(bars["high"]), np.asarray(bars["low"]))
+    visible = 0 if start is None else int(np.searchsorted(bars["ts"], start))
+    ts = np.asarray(bars["ts"][visible:], dtype=np.float64)
+    close = np.asarray(bars["close"][visible:], dtype=np.float64)
+    return ts, close, {key: values[visible:] for key, values in ind.items()}
+
+
+def rebase_to_100(series: dict[str, tuple[np.ndarray, np.ndarray]]) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """Align daily (ts, close) series on one day grid and rebase each to 100 at its first price.
+
+    Returns (day grid as epoch seconds, T x N matrix, symbols in column order). Gaps (holidays,
+    other venues' trading days) are forward-filled. Before a symbol's first price it is NaN.
+    """
+    symbols = [s for s, (ts, _) in series.items() if len(ts)]
+    if not symbols:
+        return np.empty(0), np.empty((0, 0)), []
+    days = [history_store.day_number(series[s][0]) for s in symbols]
+    grid = np.unique(np.concatenate(days))
+    m = np.full((len(grid), len(symbols)), np.nan)
+    for j, (d, s) in enumerate(zip(days, symbols)):
+        m[np.searchsorted(grid, d), j] = series[s][1]
+
+    # One pass over the whole matrix: forward-fill, then divide by each column's first price
+    rows = np.arange(len(grid))[:, None]
+    cols = np.arange(len(symbols))
+    filled_from = np.maximum.accumulate(np.where(np.isnan(m), 0, rows), axis=0)
+    m = m[filled_from, cols]
+    first = np.argmax(~np.isnan(m), axis=0)
+    m = m / m[first, cols] * 100.0
+    return grid * 86400, m, symbols
+
+
+def minmax_columns(x: np.ndarray, m: np.ndarray, buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """Downsample every column of m at once to 2 points per bucket (bucket min and max).
+
+    This is the many-series counterpart of lttb(). Columns share one x grid, so a pair of
+    reduceat calls covers the whole matrix. Extremes survive, and the pair sits at
+    sub-pixel distance, so its order within a bucket doesn't show. NaN stays NaN.
+    """
+    n = len(x)
+    if n <= 2 * buckets or buckets < 2:
+        return x, m
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    nan = np.isnan(m)
+    lo = np.minimum.reduceat(np.where(nan, np.inf, m), edges, axis=0)
+    hi = np.maximum.reduceat(np.where(nan, -np.inf, m), edges, axis=0)
+    lo[np.isinf(lo)] = np.nan
+    hi[np.isinf(hi)] = np.nan
+    mid = np.append(edges[1:], n)
+    out_x = np.empty(2 * buckets)
+    out_x[0::2] = x[edges]
+    out_x[1::2] = x[(edges + mid - 1) // 2]
+    out = np.empty((2 * buckets, m.shape[1]))
+    out[0::2] = lo
+    out[1::2] = hi
+    return out_x, out
+
+
+class ChartWindow:
+    """One Toplevel with range buttons and a reusable figure; call show() to switch ticker/range."""
+
+    def __init__(self, master: tk.Misc, run_in_background: Callable[[Callable, Callable], None]):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        import matplotlib.dates as mdates
+
+        self._run = run_in_background
+        self._epoch = mdates.date2num(np.datetime64("1970-01-01T00:00:00"))
+        self.ticker: Optional[str] = None
+        self.range_key = DEFAULT_RANGE
+        self._request = 0           # bumps on every show(); late results for older requests are dropped
+        self._live_after: Optional[str] = None
+        self._background = None
+        self.show_indicators = tk.BooleanVar(master=master, value=True)
+
+        self.top = tk.Toplevel(master)
+        self.top.protocol("WM_DELETE_WINDOW", self.close)
+
+        bar = tk.Frame(self.top)
+        bar.pack(side="top", fill="x")
+        for key in RANGES:
+            tk.Button(bar, text=key, width=4, command=lambda k=key: self.show(self.ticker, k)).pack(side="left", padx=1, pady=2)
+        tk.Checkbutton(bar, text="Indicators", variable=self.show_indicators,
+                       command=self._toggle_indicators).pack(side="left", padx=6)
+        self.status = tk.Label(bar, text="", anchor="e", font=("Arial", 8))
+        self.status.pack(side="right", padx=6)
+
+        self.fig = Figure(figsize=(7, 4))
+        self.ax = self.fig.add_subplot()
+        self.ax.grid(True)
+        self.ax.set_xlabel("Date")
+        self.ax.set_ylabel("Price")
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(mdates.AutoDateLocator()))
+        (self.line,) = self.ax.plot([], [], linewidth=1.2, label="Close")
+        self.overlays = {key: self.ax.plot([], [], **style)[0] for key, style in OVERLAYS.items()}
+        self.artists = [self.line] + list(self.overlays.values())
+        for artist in self.artists:
+            artist.set_animated(True)  # drawn by _on_draw / blit, never baked into the background
+        self.ax.legend(handles=self.artists, loc="upper left", fontsize=8)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.top)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    # --------------------------- Public ---------------------------
+    def alive(self) -> bool:
+        try:
+            return bool(self.top.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def show(self, ticker: Optional[str], range_key: Optional[str] = None):
+        """Load ticker over range_key (background) and swap it into the existing line."""
+        if not ticker:
+            return
+        self.ticker = ticker
+        self.range_key = range_key or self.range_key
+        self._request += 1
+        self.top.title(f"{ticker} Price Chart")
+        self.status.config(text="Loading...")
+        self.top.lift()
+        self._load(full_redraw=True)
+
+    def close(self):
+        self._cancel_live()
+        self._request += 1
+        self.top.destroy()
+
+    # --------------------------- Internals ---------------------------
+    def _load(self, full_redraw: bool):
+        request, ticker, range_key = self._request, self.ticker, self.range_key
+        self._run(lambda: load_series(ticker, range_key),
+                  lambda series: self._apply(request, series, full_redraw))
+
+    def _apply(self, request: int, series: tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]], full_redraw: bool):
+        """Tk thread: downsample to the axes' pixel width and update the lines in place."""
+        if request != self._request or not self.alive():
+            return
+        ts, close, ind = series
+        if len(ts) == 0:
+            for artist in self.artists:
+                artist.set_data([], [])
+            self.ax.set_title(f"{self.ticker} - no data for {self.range_key}")
+            self.status.config(text="No data")
+            self.canvas.draw_idle()
+            return
+
+        width_px = max(100, int(self.ax.bbox.width * POINTS_PER_PIXEL))
+        x = ts / 86400.0 + self._epoch
+        keep = lttb_indices(x, close, width_px)
+        dx, dy = x[keep], close[keep]
+        self.line.set_data(dx, dy)
+        for key, artist in self.overlays.items():
+            artist.set_data(dx, ind[key][keep])
+            artist.set_visible(self.show_indicators.get())
+        latest = "   ".join(f"{name} {ind[key][-1]:.2f}" for name, key in (("RSI", "rsi"), ("ATR", "atr"), ("MACD", "macd"))
+                             if not np.isnan(ind[key][-1]))
+        self.status.config(text=f"{latest}   {len(x):,} bars, {len(dx):,} drawn".strip())
+
+        lo, hi = float(dy.min()), float(dy.max())
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        fits = x0 <= dx[0] and dx[-1] <= x1 and y0 <= lo and hi <= y1
+        if not full_redraw and fits and self._background is not None:
+            self._blit()
+        else:
+            pad = (hi - lo) * 0.05 or abs(hi) * 0.01 or 1.0
+            span = dx[-1] - dx[0]
+            self.ax.set_xlim(dx[0], dx[-1] + (span * 0.01 or 1.0))
+            self.ax.set_ylim(lo - pad, hi + pad)
+            self.ax.set_title(f"{self.ticker} {self.range_key} ({RANGES[self.range_key][1]} bars)")
+            self.canvas.draw_idle()
+
+        self._cancel_live()
+        if RANGES[self.range_key][1] != "1d":
+            self._live_after = self.top.after(LIVE_REFRESH_MS, lambda: self._load(full_redraw=False))
+
+    def _on_draw(self, _event):
+        """After a full draw: cache the static background, then draw the lines on top."""
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def _blit(self):
+        self.canvas.restore_region(self._background)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
+    def _toggle_indicators(self):
+        for artist in self.overlays.values():
+            artist.set_visible(self.show_indicators.get())
+        if self._background is not None:
+            self._blit()
+
+    def _cancel_live(self):
+        if self._live_after is not None:
+            try:
+                self.top.after_cancel(self._live_after)
+            except tk.TclError:
+                pass
+            self._live_after = None
+
+
+class CompareWindow:
+    """Many symbols rebased to 100 on shared axes; show() swaps the symbol set or range in place."""
+
+    def __init__(self, master: tk.Misc, run_in_background: Callable[[Callable, Callable], None]):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        import matplotlib.dates as mdates
+
+        self._run = run_in_background
+        self._epoch = mdates.date2num(np.datetime64("1970-01-01T00:00:00"))
+        self.symbols: list[str] = []
+        self.range_key = COMPARE_DEFAULT_RANGE
+        self._request = 0
+        self.lines: list = []       # Line2D objects, reused across show() calls
+
+        self.top = tk.Toplevel(master)
+        self.top.protocol("WM_DELETE_WINDOW", self.close)
+
+        bar = tk.Frame(self.top)
+        bar.pack(side="top", fill="x")
+        for key in COMPARE_RANGES:
+            tk.Button(bar, text=key, width=4, command=lambda k=key: self.show(self.symbols, k)).pack(side="left", padx=1, pady=2)
+        self.status = tk.Label(bar, text="", anchor="e", font=("Arial", 8))
+        self.status.pack(side="right", padx=6)
+
+        self.fig = Figure(figsize=(8, 4.5))
+        self.ax = self.fig.add_subplot()
+        self.ax.grid(True)
+        self.ax.set_ylabel("Rebased (first day = 100)")
+        self.ax.axhline(100.0, color="#999999", linewidth=0.8)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(mdates.AutoDateLocator()))
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.top)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def alive(self) -> bool:
+        try:
+            return bool(self.top.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def show(self, symbols: list[str], range_key: Optional[str] = None):
+        """Load symbols over range_key (one batch for anything missing) and redraw."""
+        if not symbols:
+            return
+        self.symbols = list(dict.fromkeys(symbols))
+        self.range_key = range_key or self.range_key
+        self._request += 1
+        request, syms, key = self._request, self.symbols, self.range_key
+        width_px = max(100, int(self.ax.bbox.width * POINTS_PER_PIXEL))
+        self.top.title(f"Compare: {', '.join(syms[:6])}{' ...' if len(syms) > 6 else ''}")
+        self.status.config(text="Loading...")
+        self.top.lift()
+        self._run(lambda: self._load(syms, key, width_px), lambda result: self._apply(request, result))
+
+    def close(self):
+        self._request += 1
+        self.top.destroy()
+
+    @staticmethod
+    def _load(symbols: list[str], range_key: str, width_px: int):
+        """Blocking: batch-refresh the store, align, rebase and downsample (no Tk here)."""
+        days, interval = RANGES[range_key]
+        start = None if days is None else int(time.time()) - days * 86400
+        stored = history_store.ensure_many(symbols, interval, 0 if start is None else start)
+        series = {}
+        for sym, bars in stored.items():
+            window = bars if start is None else bars[np.searchsorted(bars["ts"], start):]
+            close = np.asarray(window["close"], dtype=np.float64)
+            ok = ~np.isnan(close)
+            series[sym] = (np.asarray(window["ts"])[ok], close[ok])
+        grid, m, found = rebase_to_100(series)
+        x, m_drawn = minmax_columns(grid.astype(np.float64), m, width_px // 2)
+        return grid, x, m_drawn, found
+
+    def _apply(self, request: int, result):
+        """Tk thread: reuse / add / drop Line2D objects to match the columns, then draw once."""
+        if request != self._request or not self.alive():
+            return
+        grid, x, m, symbols = result
+        missing = [s for s in self.symbols if s not in symbols]
+        if not symbols:
+            self.status.config(text="No data")
+            return
+
+        while len(self.lines) < len(symbols):
+            (line,) = self.ax.plot([], [], linewidth=1.0)
+            self.lines.append(line)
+        while len(self.lines) > len(symbols):
+            self.lines.pop().remove()
+
+        x = x / 86400.0 + self._epoch
+        for j, (line, sym) in enumerate(zip(self.lines, symbols)):
+            line.set_data(x, m[:, j])  # NaN before a symbol's first price just isn't drawn
+            line.set_label(sym)
+
+        lo, hi = float(np.nanmin(m)), float(np.nanmax(m))
+        pad = (hi - lo) * 0.05 or 1.0
+        self.ax.set_xlim(x[0], x[-1])
+        self.ax.set_ylim(lo - pad, hi + pad)
+        self.ax.set_title(f"{len(symbols)} symbols, {self.range_key}, rebased to 100")
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        if len(symbols) <= COMPARE_LEGEND_MAX:
+            self.ax.legend(loc="upper left", fontsize=8, ncol=2 if len(symbols) > 6 else 1)
+        note = f"no data: {', '.join(missing)}" if missing else f"{len(grid):,} days"
+        self.status.config(text=note)
+        self.canvas.draw_idle()
+
+
+class HeatmapWindow:
+    """Correlation matrix as one reusable image; show() swaps its data, hovering names the pair."""
+
+    def __init__(self, master: tk.Misc):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.symbols: list[str] = []
+        self.corr = np.empty((0, 0))
+        self.top = tk.Toplevel(master)
+        self.top.title("Correlation")
+
+        bar = tk.Frame(self.top)
+        bar.pack(side="top", fill="x")
+        self.status = tk.Label(bar, text="", anchor="w", font=("Arial", 8))
+        self.status.pack(side="left", padx=6)
+        self.hover = tk.Label(bar, text="", anchor="e", font=("Arial", 9))
+        self.hover.pack(side="right", padx=6)
+
+        self.fig = Figure(figsize=(7, 6))
+        self.ax = self.fig.add_subplot()
+        self.image = self.ax.imshow(np.zeros((1, 1)), cmap="RdBu_r", vmin=-1.0, vmax=1.0, interpolation="nearest")
+        self.fig.colorbar(self.image, ax=self.ax, shrink=0.8)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.top)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.mpl_connect("motion_notify_event", self._on_motion)
+
+    def alive(self) -> bool:
+        try:
+            return bool(self.top.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def show(self, symbols: list[str], corr: np.ndarray, note: str = ""):
+        """Tk thread: draw the matrix (rows/columns in symbols order)."""
+        self.symbols, self.corr = list(symbols), corr
+        n = len(symbols)
+        self.image.set_data(np.ma.masked_invalid(corr))
+        self.image.set_extent((-0.5, n - 0.5, n - 0.5, -0.5))
+        ticks = np.arange(n) if n <= HEATMAP_LABEL_MAX else []
+        self.ax.set_xticks(ticks)
+        self.ax.set_yticks(ticks)
+        if n <= HEATMAP_LABEL_MAX:
+            size = 8 if n <= 30 else 6
+            self.ax.set_xticklabels(symbols, rotation=90, fontsize=size)
+            self.ax.set_yticklabels(symbols, fontsize=size)
+        self.status.config(text=note)
+        self.top.lift()
+        self.canvas.draw_idle()
+
+    def _on_motion(self, event):
+        if event.inaxes is not self.ax or event.xdata is None or not self.symbols:
+            self.hover.config(text="")
+            return
+        i, j = int(round(event.ydata)), int(round(event.xdata))
+        if 0 <= i < len(self.symbols) and 0 <= j < len(self.symbols):
+            value = self.corr[i, j]
+            self.hover.config(text=f"{self.symbols[i]} / {self.symbols[j]}: "
+                                   + ("n/a" if np.isnan(value) else f"{value:+.2f}"))
@@ -0,0 +1,168 @@
+"""
+correlation.py - Rolling cross-sectional correlation of daily returns from the history store
+
+RollingCorrelation keeps the last `window` trading days of log returns for N symbols and
+the pairwise sums that define their correlations:
+
+    C = M'M    pairs where both have a return that day
+    P = X'X    sum of x_i * x_j
+    S = X'M    sum of x_i over the days j also traded
+    Q = X2'M   sum of x_i^2 over the days j also traded
+
+Here X holds the returns (0 where missing), M is the presence mask and X2 = X*X. Pairwise
+complete days are used, so a holiday on one exchange doesn't blank the row or bias the
+others toward zero. Each pair's correlation is read off the sums in one vectorized pass:
+
+    corr_ij = (C P - S S') / sqrt((C Q - S^2)(C Q' - S'^2))
+
+Incremental: a new (or revised) day is one rank-1 update of the four N x N sums, and the
+day that drops out of the window is one rank-1 downdate. A daily refresh costs O(N^2) per
+new day instead of recomputing O(window * N^2). The first build is four matrix products
+(60 x 1000 returns: well under a second). update() reads only bars newer than what it has
+already consumed, straight from the memory-mapped store. Nothing is downloaded except
+missing tails (one ensure_many batch).
+
+Days are calendar dates (history_store.day_number), so NZX, ASX and US closes of the
+same date line up. Today's still-forming daily bar is folded in and revised as it moves.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+import history_store
+
+
+# ----------------------------- Tunable Constants -----------------------------
+CORR_WINDOW = 60            # trading days of returns
+MIN_OVERLAP = 20            # pairs with fewer common days are NaN
+
+
+class RollingCorrelation:
+    """Correlation matrix of daily log returns over a rolling window, updated from history_store."""
+
+    def __init__(self, symbols: list[str], window: int = CORR_WINDOW, min_overlap: int = MIN_OVERLAP):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.window = int(window)
+        self.min_overlap = int(min_overlap)
+        n = len(self.symbols)
+        self._rows: dict[int, np.ndarray] = {}      # day -> returns (NaN = none that day)
+        self._C = np.zeros((n, n))
+        self._P = np.zeros((n, n))
+        self._S = np.zeros((n, n))
+        self._Q = np.zeros((n, n))
+        # per symbol: ts of the last bar consumed, its close, and the close before it
+        self._last_ts = np.full(n, -1, dtype=np.int64)
+        self._last_close = np.full(n, np.nan)
+        self._prev_close = np.full(n, np.nan)
+        self._lock = threading.Lock()
+
+    # ---- sums ----
+    def _fold(self, rows: np.ndarray, sign: float):
+        """Add (sign=1) or remove (sign=-1) a k x N block of return rows from the sums."""
+        m = ~np.isnan(rows)
+        x = np.where(m, rows, 0.0)
+        mf = m.astype(np.float64)
+        self._C += sign * (mf.T @ mf)
+        self._P += sign * (x.T @ x)
+        self._S += sign * (x.T @ mf)
+        self._Q += sign * ((x * x).T @ mf)
+
+    def _set_day(self, day: int, returns: dict[int, float]):
+        """Write returns for one day: a revised day is swapped out and back in; a new one may evict the oldest."""
+        old = self._rows.get(day)
+        if old is None and len(self._rows) >= self.window and day < min(self._rows):
+            return  # older than everything in a full window
+        row = np.full(len(self.symbols), np.nan) if old is None else old.copy()
+        for col, r in returns.items():
+            row[col] = r
+        if old is not None:
+            self._fold(old[None, :], -1.0)
+        self._rows[day] = row
+        self._fold(row[None, :], 1.0)
+        while len(self._rows) > self.window:
+            oldest = min(self._rows)
+            self._fold(self._rows.pop(oldest)[None, :], -1.0)
+
+    # ---- data ----
+    def update(self, fetch: bool = True) -> int:
+        """Fold in daily bars the store gained since the last call (fetching missing tails first).
+
+        Returns the number of symbol-days written. The first call builds the window with one
+        matrix product per sum; later calls only touch the days that changed.
+        """
+        start = int(time.time()) - int(self.window * 1.6 + 10) * 86400
+        if fetch:
+            history_store.ensure_many(self.symbols, "1d", start)
+        with self._lock:
+            first_build = not self._rows
+            by_day: dict[int, dict[int, float]] = {}
+            for sym, col in self.index.items():
+                try:
+                    since = int(self._last_ts[col]) if self._last_ts[col] >= 0 else start
+                    bars = history_store.query(sym, start=since, fields=("ts", "close"))
+                except Exception as e:
+                    logging.debug(f"Correlation: no history for {sym}: {e}")
+                    continue
+                bars = bars[~np.isnan(bars["close"])]
+                if not len(bars):
+                    continue
+                ts, close, days = bars["ts"], np.asarray(bars["close"], dtype=np.float64), history_store.day_number(bars["ts"])
+                prev_close, last_close = self._prev_close[col], self._last_close[col]
+                for i in range(len(bars)):
+                    if ts[i] == self._last_ts[col]:
+                        base = prev_close           # the last consumed bar was revised in place
+                    else:
+                        base = last_close
+                        prev_close = last_close
+                    if base > 0 and close[i] > 0:
+                        by_day.setdefault(int(days[i]), {})[col] = float(np.log(close[i] / base))
+                    last_close = close[i]
+                self._last_ts[col] = int(ts[-1])
+                self._last_close[col], self._prev_close[col] = last_close, prev_close
+
+            if first_build:
+                days = sorted(by_day)[-self.window:]
+                block = np.full((len(days), len(self.symbols)), np.nan)
+                for r, day in enumerate(days):
+                    for col, ret in by_day[day].items():
+                        block[r, col] = ret
+                    self._rows[day] = block[r]
+                self._fold(block, 1.0)
+            else:
+                for day in sorted(by_day):
+                    self._set_day(day, by_day[day])
+            return sum(len(v) for v in by_day.values())
+
+    def matrix(self) -> tuple[list[str], np.ndarray]:
+        """(symbols, N x N correlations); NaN where a pair overlaps on fewer than min_overlap days."""
+        with self._lock:
+            C, P, S, Q = self._C.copy(), self._P.copy(), self._S.copy(), self._Q.copy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = C * P - S * S.T
+            var = C * Q - S * S
+            corr = cov / np.sqrt(np.maximum(var, 0.0) * np.maximum(var.T, 0.0))
+        corr[C < self.min_overlap] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        have = np.diag(C) >= self.min_overlap
+        np.fill_diagonal(corr, np.where(have, 1.0, np.nan))
+        return list(self.symbols), corr
+
+    def days(self) -> int:
+        return len(self._rows)
+
+    def most_correlated(self, n: int = 10, corr: Optional[np.ndarray] = None) -> list[tuple[str, str, float]]:
+        """Top n distinct pairs by correlation (for a quick concentration check)."""
+        if corr is None:
+            _, corr = self.matrix()
+        iu = np.triu_indices(len(self.symbols), k=1)
+        vals = corr[iu]
+        ok = np.flatnonzero(~np.isnan(vals))
+        top = ok[np.argsort(-vals[ok], kind="stable")[:n]]
+        return [(self.symbols[iu[0][k]], self.symbols[iu[1][k]], float(vals[k])) for k in top]
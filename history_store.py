@@ -0,0 +1,606 @@
+"""
+history_store.py - Local incremental OHLCV bar store shared by the apps
+
+One raw file of fixed-width records per symbol and interval:
+
+    history/<SYMBOL>/<interval>.bars      records of BAR_DTYPE, sorted by ts (epoch seconds UTC)
+
+The files have no header, so np.memmap maps them directly. Reads are zero-copy and
+appends are a plain write at the end of the file. update() fetches only the bars at or
+after the last stored one. That bar is rewritten in place because it may have been
+partial (today's daily bar, the current intraday bar) when it was stored.
+
+Nothing here touches Tk; safe to call from any thread (writes are serialized per file).
+
+Backfill years of bars for the whole watchlist (resumable; re-run the same command after
+an interruption and finished chunks are skipped):
+
+    python history_store.py backfill --years 10 --interval 1d
+
+Query a window straight off the memory-mapped file (half-open [start, end), no copy):
+
+    bars = history_store.query("AIA.NZ", "2024-01-01", "2025-01-01", fields=("close", "volume"))
+    python history_store.py query AIA.NZ --start 2024-01-01 --end 2025-01-01 --fields close volume
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import yaml
+
+import market_data
+
+
+# ----------------------------- Tunable Constants -----------------------------
+HISTORY_DIR = "history"
+BAR_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+FIELDS = BAR_DTYPE.names[1:]
+DAY_SHIFT_SEC = 14 * 3600   # daily bars are stamped at local midnight; shift before flooring to a date
+DAILY_INTERVALS = ("1d", "5d", "1wk", "1mo", "3mo")   # bars stamped at the exchange's local midnight
+TAIL_REFRESH_SEC = 120      # don't ask the network again for the same file within this window
+INITIAL_PERIOD = {          # first fetch for a file that doesn't exist yet
+    "1d": "5y", "1wk": "max", "1mo": "max",
+    "1h": "730d", "60m": "730d", "30m": "60d", "15m": "60d", "5m": "60d", "2m": "60d", "1m": "7d",
+}
+MAX_LOOKBACK_DAYS = {       # Yahoo refuses intraday start dates older than this
+    "1h": 729, "60m": 729, "30m": 59, "15m": 59, "5m": 59, "2m": 59, "1m": 29,
+}
+BACKFILL_CHUNK_SIZE = 20    # symbols per batch download
+BACKFILL_WINDOW_DAYS = {    # date range per request; Yahoo caps intraday ranges per call
+    "1h": 180, "60m": 180, "30m": 30, "15m": 30, "5m": 30, "2m": 30, "1m": 7,
+}
+BACKFILL_DEFAULT_WINDOW_DAYS = 365 * 2
+BACKFILL_WORKERS = 2         # yf.download runs one at a time per process; a second worker merges meanwhile
+BACKFILL_CHECKPOINT = "backfill_checkpoint.json"   # inside the history root
+
+
+_locks: dict[str, threading.RLock] = {}
+_locks_guard = threading.Lock()
+_first_trades: dict[str, int | None] = {}   # symbol -> Yahoo firstTradeDate (None = Yahoo has none)
+_checked: dict[str, float] = {}  # path -> time.time() of the last successful tail fetch
+_head_checked: dict[str, int] = {}  # path -> earliest start_ts already requested this session
+_maps: dict[str, tuple[int, int, np.ndarray, np.ndarray]] = {}  # path -> (size, mtime_ns, bars, ts) for query()
+
+
+def _lock_for(path: str) -> threading.RLock:
+    with _locks_guard:
+        return _locks.setdefault(path, threading.RLock())
+
+
+def _unmap(path: str):
+    """Drop query()'s cached mapping of path before writing it. Windows can't truncate or
+    replace a mapped file; the map closes once no caller still holds a view of it."""
+    _maps.pop(path, None)
+
+
+def day_number(ts: np.ndarray) -> np.ndarray:
+    """Calendar day (days since epoch) of each daily bar ts, so different venues' closes of a date line up."""
+    return (np.asarray(ts).astype(np.int64) + DAY_SHIFT_SEC) // 86400
+
+
+def bar_path(symbol: str, interval: str = "1d", root: str = HISTORY_DIR) -> str:
+    """File holding symbol's bars at interval (path-safe symbol, e.g. ^GSPC, EURUSD=X)."""
+    safe = symbol.strip().upper().replace("/", "_").replace("\\", "_")
+    return os.path.join(root, safe, f"{interval}.bars")
+
+
+def read(symbol: str, interval: str = "1d", root: str = HISTORY_DIR) -> np.ndarray:
+    """All stored bars as a read-only memmap (empty array if none are stored)."""
+    path = bar_path(symbol, interval, root)
+    try:
+        count = os.path.getsize(path) // BAR_DTYPE.itemsize  # ignores a torn trailing record
+        if count:
+            return np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,))
+    except OSError:
+        pass
+    return np.empty(0, dtype=BAR_DTYPE)
+
+
+def last_timestamp(symbol: str, interval: str = "1d", root: str = HISTORY_DIR) -> int | None:
+    """ts of the newest stored bar, reading only the final record."""
+    path = bar_path(symbol, interval, root)
+    try:
+        size = os.path.getsize(path)
+        if size < BAR_DTYPE.itemsize:
+            return None
+        with open(path, "rb") as f:
+            f.seek((size // BAR_DTYPE.itemsize - 1) * BAR_DTYPE.itemsize)
+            return int(np.frombuffer(f.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)["ts"][0])
+    except OSError:
+        return None
+
+
+def frame_to_bars(df) -> np.ndarray:
+    """yfinance history/download frame (Open/High/Low/Close/Volume) -> sorted BAR_DTYPE array."""
+    if df is None or df.empty:
+        return np.empty(0, dtype=BAR_DTYPE)
+    idx = df.index
+    if getattr(idx, "tz", None) is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    bars = np.empty(len(df), dtype=BAR_DTYPE)
+    bars["ts"] = idx.values.astype("datetime64[s]").astype(np.int64)
+    for field in FIELDS:
+        col = field.capitalize()
+        bars[field] = df[col].to_numpy(dtype=np.float64, na_value=np.nan) if col in df else np.nan
+    bars = bars[~np.isnan(bars["close"])]
+    bars.sort(order="ts", kind="stable")
+    _, first = np.unique(bars["ts"][::-1], return_index=True)  # keep the newest copy of any duplicate ts
+    return bars[len(bars) - 1 - first]
+
+
+def to_frame(bars: np.ndarray):
+    """BAR_DTYPE array -> pandas frame with a UTC DatetimeIndex and yfinance column names."""
+    import pandas as pd
+    index = pd.to_datetime(np.asarray(bars["ts"]), unit="s", utc=True)
+    return pd.DataFrame({f.capitalize(): np.asarray(bars[f]) for f in FIELDS}, index=index)
+
+
+def append(symbol: str, interval: str, bars: np.ndarray, root: str = HISTORY_DIR) -> int:
+    """Store bars newer than the file's tail (an equal-ts tail bar is overwritten). Returns bars written."""
+    if len(bars) == 0:
+        return 0
+    path = bar_path(symbol, interval, root)
+    with _lock_for(path):
+        last = last_timestamp(symbol, interval, root)
+        if last is not None:
+            bars = bars[bars["ts"] >= last]
+            if len(bars) == 0:
+                return 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _unmap(path)
+        with open(path, "r+b" if last is not None else "wb") as f:
+            end = (os.fstat(f.fileno()).st_size // BAR_DTYPE.itemsize) * BAR_DTYPE.itemsize
+            if last is not None and bars["ts"][0] == last:
+                end -= BAR_DTYPE.itemsize  # refresh the partial tail bar
+            f.seek(end)
+            f.write(np.ascontiguousarray(bars, dtype=BAR_DTYPE).tobytes())
+            f.truncate()
+    return len(bars)
+
+
+def merge(symbol: str, interval: str, bars: np.ndarray, root: str = HISTORY_DIR) -> int:
+    """Store bars from any date range. New bars win over stored ones with the same ts.
+
+    Pure tail data takes the cheap append() path. Anything older than the stored tail
+    (e.g. a backfill of earlier years) rewrites the file atomically. Returns bars written.
+    """
+    if len(bars) == 0:
+        return 0
+    path = bar_path(symbol, interval, root)
+    with _lock_for(path):
+        last = last_timestamp(symbol, interval, root)
+        if last is None or bars["ts"][0] >= last:
+            return append(symbol, interval, bars, root)
+        combined = np.concatenate([bars, np.array(read(symbol, interval, root))])
+        _, first = np.unique(combined["ts"], return_index=True)  # first occurrence = the new bar
+        combined = combined[first]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(combined.tobytes())
+        _unmap(path)
+        os.replace(tmp, path)
+    return len(bars)
+
+
+def fetch_tail(symbol: str, interval: str = "1d", root: str = HISTORY_DIR):
+    """Network fetch of the bars the store is missing (from the stored tail bar onwards)."""
+    ticker = market_data.get_ticker(symbol)
+    last = last_timestamp(symbol, interval, root)
+    market_data.throttle()
+    if last is None:
+        return ticker.history(period=INITIAL_PERIOD.get(interval, "1y"), interval=interval)
+    start = datetime.fromtimestamp(last, tz=timezone.utc)
+    lookback = MAX_LOOKBACK_DAYS.get(interval)
+    if lookback is not None:
+        start = max(start, datetime.now(timezone.utc) - timedelta(days=lookback))
+    return ticker.history(start=start.strftime("%Y-%m-%d"), interval=interval)
+
+
+def update(symbol: str, interval: str = "1d", root: str = HISTORY_DIR,
+           max_age: float = TAIL_REFRESH_SEC) -> np.ndarray:
+    """Bring the local file up to date (tail fetch only) and return all bars as a memmap.
+
+    A fetch within max_age seconds of the previous one is skipped. Network errors are
+    logged and the stored bars are returned as they are.
+    """
+    path = bar_path(symbol, interval, root)
+    if time.time() - _checked.get(path, 0.0) >= max_age:
+        try:
+            written = append(symbol, interval, frame_to_bars(fetch_tail(symbol, interval, root)), root)
+            _checked[path] = time.time()
+            logging.debug(f"History {symbol} {interval}: {written} bar(s) written")
+        except Exception as e:
+            logging.warning(f"History update failed for {symbol} {interval}: {e}")
+    return read(symbol, interval, root)
+
+
+def ensure(symbol: str, interval: str = "1d", start_ts: int = 0, root: str = HISTORY_DIR) -> np.ndarray:
+    """update() plus, once per session, a fetch of anything older than the stored head back to start_ts.
+
+    Lets a long chart range (e.g. "max") fill itself in without running a full backfill.
+    """
+    bars = update(symbol, interval, root)
+    path = bar_path(symbol, interval, root)
+    if len(bars) and bars["ts"][0] > start_ts + 7 * 86400 and start_ts < _head_checked.get(path, 1 << 62):
+        _head_checked[path] = start_ts
+        first = datetime.fromtimestamp(int(bars["ts"][0]), tz=timezone.utc)
+        lookback = MAX_LOOKBACK_DAYS.get(interval)
+        earliest = datetime.fromtimestamp(max(start_ts, 0), tz=timezone.utc)
+        if lookback is not None:
+            earliest = max(earliest, datetime.now(timezone.utc) - timedelta(days=lookback))
+        if earliest < first - timedelta(days=1):
+            try:
+                market_data.throttle()
+                ticker = market_data.get_ticker(symbol)
+                if start_ts <= 0 and lookback is None:
+                    df = ticker.history(period="max", interval=interval)
+                else:
+                    df = ticker.history(start=earliest.strftime("%Y-%m-%d"),
+                                        end=first.strftime("%Y-%m-%d"), interval=interval)
+                if merge(symbol, interval, frame_to_bars(df), root):
+                    bars = read(symbol, interval, root)
+            except Exception as e:
+                logging.warning(f"History head fetch failed for {symbol} {interval}: {e}")
+    return bars
+
+
+def ensure_many(symbols: list[str], interval: str = "1d", start_ts: int = 0, root: str = HISTORY_DIR,
+                max_age: float = TAIL_REFRESH_SEC) -> dict[str, np.ndarray]:
+    """ensure() for many symbols with ONE batch download covering every gap.
+
+    Symbols already refreshed within max_age are skipped. The batch starts at the earliest
+    point any remaining symbol needs: start_ts for symbols without enough stored history,
+    otherwise its stored tail. Returns symbol -> memmap of all stored bars.
+    """
+    now = time.time()
+    need: list[str] = []
+    since = None
+    for sym in symbols:
+        path = bar_path(sym, interval, root)
+        bars = read(sym, interval, root)
+        head_missing = ((not len(bars) or bars["ts"][0] > start_ts + 7 * 86400)
+                        and start_ts < _head_checked.get(path, 1 << 62))
+        if not head_missing and now - _checked.get(path, 0.0) < max_age:
+            continue
+        sym_start = start_ts if head_missing else int(bars["ts"][-1])
+        since = sym_start if since is None else min(since, sym_start)
+        need.append(sym)
+
+    if need:
+        kwargs = {"interval": interval, "progress": False, "group_by": "ticker", "auto_adjust": True, "threads": False}
+        lookback = MAX_LOOKBACK_DAYS.get(interval)
+        if since <= 0 and lookback is None:
+            kwargs["period"] = "max"
+        else:
+            start = datetime.fromtimestamp(max(since, 0), tz=timezone.utc)
+            if lookback is not None:
+                start = max(start, datetime.now(timezone.utc) - timedelta(days=lookback))
+            kwargs["start"] = start.strftime("%Y-%m-%d")
+        try:
+            import pandas as pd
+            batch_df = market_data.download(need, **kwargs)
+            for sym in need:  # answered: don't ask again for symbols Yahoo had nothing for either
+                path = bar_path(sym, interval, root)
+                _checked[path] = now
+                _head_checked[path] = min(since, _head_checked.get(path, 1 << 62))
+            if batch_df is None or batch_df.empty:
+                return {sym: read(sym, interval, root) for sym in symbols}
+            is_multi = isinstance(getattr(batch_df, "columns", None), pd.MultiIndex)
+            for sym in need:
+                if is_multi and sym in batch_df.columns.get_level_values(0):
+                    sym_df = batch_df[sym]
+                elif not is_multi and len(need) == 1:
+                    sym_df = batch_df
+                else:
+                    continue
+                merge(sym, interval, frame_to_bars(sym_df.dropna(how="all")), root)
+        except Exception as e:
+            logging.warning(f"History batch update failed for {len(need)} symbol(s) {interval}: {e}")
+    return {sym: read(sym, interval, root) for sym in symbols}
+
+
+def to_epoch(when) -> int:
+    """Epoch seconds from an int/float, date, datetime/Timestamp (naive = UTC) or 'YYYY-MM-DD[ HH:MM]' string."""
+    if isinstance(when, (int, float, np.integer, np.floating)):
+        return int(when)
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when)
+    if isinstance(when, date) and not isinstance(when, datetime):
+        when = datetime(when.year, when.month, when.day)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp())
+
+
+def _bound(when, interval: str) -> int:
+    """to_epoch() for a query bound. A date-only bound on daily bars means that calendar date
+    (as day_number() counts it), so bars stamped at an exchange's local midnight east of UTC,
+    i.e. on the previous UTC day, fall on the right side of it."""
+    ts = to_epoch(when)
+    date_only = ((isinstance(when, str) and len(when.strip()) <= 10)
+                 or (isinstance(when, date) and not isinstance(when, datetime)))
+    return ts - DAY_SHIFT_SEC if date_only and interval in DAILY_INTERVALS else ts
+
+
+def bar_date(ts: int, interval: str = "1d") -> str:
+    """Display date of a bar: the calendar date for daily bars, else UTC date and time."""
+    if interval in DAILY_INTERVALS:
+        return datetime.fromtimestamp(int(day_number(ts)) * 86400, tz=timezone.utc).strftime("%Y-%m-%d")
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+def _mapped(symbol: str, interval: str, root: str) -> tuple[np.ndarray, np.ndarray]:
+    """(bars, ts) over the file's mapping, kept open between queries until the file changes on disk.
+
+    Plain ndarray views of the memmap: slicing them skips the np.memmap subclass overhead.
+    """
+    path = bar_path(symbol, interval, root)
+    try:
+        st = os.stat(path)
+    except OSError:
+        _maps.pop(path, None)
+        empty = np.empty(0, dtype=BAR_DTYPE)
+        return empty, empty["ts"]
+    hit = _maps.get(path)
+    if hit is not None and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+        return hit[2], hit[3]
+    bars = np.asarray(read(symbol, interval, root))
+    _maps[path] = (st.st_size, st.st_mtime_ns, bars, bars["ts"])
+    return bars, bars["ts"]
+
+
+def query(symbol: str, start=None, end=None, fields=None, interval: str = "1d",
+          root: str = HISTORY_DIR) -> np.ndarray:
+    """Bars with start <= ts < end as a view over the memory-mapped file (no pandas, no copy).
+
+    start/end: anything to_epoch() accepts, or None for open-ended. A date-only bound on
+    daily bars is a calendar date, whatever the exchange's UTC offset. The range is found by
+    binary search on ts. fields: None for full BAR_DTYPE records, one name (e.g. "close")
+    for a plain float64 view, or a sequence of names for a structured view of those columns.
+    """
+    bars, ts = _mapped(symbol, interval, root)
+    lo = 0 if start is None else int(np.searchsorted(ts, _bound(start, interval), side="left"))
+    hi = len(bars) if end is None else int(np.searchsorted(ts, _bound(end, interval), side="left"))
+    window = bars[lo:max(lo, hi)]
+    if fields is None:
+        return window
+    if isinstance(fields, str):
+        return window[fields]
+    return window[list(fields)]
+
+
+# ----------------------------- Backfill -----------------------------
+def load_watchlist(yaml_file: str = "tickers.yaml") -> list[str]:
+    """Symbols from tickers.yaml (dict with 'tickers' or a bare list), upper-cased, de-duplicated."""
+    try:
+        with open(yaml_file, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return []
+    src = data.get("tickers", []) if isinstance(data, dict) else data
+    out: list[str] = []
+    for t in src or []:
+        s = str(t).strip().upper() if t else ""
+        if s and s not in out:
+            out.append(s)
+    return out
+
+
+def plan_backfill(symbols: list[str], interval: str, start: datetime, end: datetime,
+                  chunk_size: int = BACKFILL_CHUNK_SIZE) -> list[tuple[list[str], str, str]]:
+    """Work units (symbol chunk, start date, end date): every chunk crossed with every date window."""
+    lookback = MAX_LOOKBACK_DAYS.get(interval)
+    if lookback is not None:
+        start = max(start, end - timedelta(days=lookback))
+    step = timedelta(days=BACKFILL_WINDOW_DAYS.get(interval, BACKFILL_DEFAULT_WINDOW_DAYS))
+    windows = []
+    w_start = start
+    while w_start < end:
+        w_end = min(w_start + step, end)
+        windows.append((w_start.strftime("%Y-%m-%d"), w_end.strftime("%Y-%m-%d")))
+        w_start = w_end
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+    return [(chunk, w0, w1) for chunk in chunks for (w0, w1) in windows]
+
+
+def _unit_key(chunk: list[str], w0: str, w1: str) -> str:
+    return f"{','.join(chunk)}|{w0}|{w1}"
+
+
+def first_trade_ts(symbol: str) -> int | None:
+    """Epoch seconds of the symbol's first trade per Yahoo's history metadata (cached).
+
+    None if Yahoo doesn't know it; raises if the lookup itself fails, so the caller can't
+    mistake a network error for "not listed yet".
+    """
+    with _locks_guard:
+        if symbol in _first_trades:
+            return _first_trades[symbol]
+    market_data.throttle()
+    meta = market_data.get_ticker(symbol).get_history_metadata() or {}
+    first = meta.get("firstTradeDate")
+    ts = int(first) if first is not None else None
+    with _locks_guard:
+        _first_trades[symbol] = ts
+    return ts
+
+
+def _backfill_unit(chunk: list[str], interval: str, w0: str, w1: str, root: str) -> int:
+    """Download one chunk x window and merge each symbol's bars into the store.
+
+    yf.download logs per-symbol errors instead of raising, so a requested symbol with no
+    bars in the frame fails the whole unit (keeping it out of the checkpoint), unless the
+    window ends before the symbol's first trade.
+    """
+    import pandas as pd
+    batch_df = market_data.download(
+        chunk,
+        start=w0,
+        end=w1,
+        interval=interval,
+        progress=False,
+        group_by="ticker",
+        auto_adjust=True,
+        threads=False,
+    )
+    written = 0
+    missing = []
+    empty = batch_df is None or batch_df.empty
+    is_multi = not empty and isinstance(batch_df.columns, pd.MultiIndex)
+    for symbol in chunk:
+        sym_df = None
+        if is_multi:
+            if symbol in batch_df.columns.get_level_values(0):
+                sym_df = batch_df[symbol].dropna(how="all")
+        elif not empty and len(chunk) == 1:
+            sym_df = batch_df.dropna(how="all")
+        if sym_df is None or sym_df.empty:
+            missing.append(symbol)
+            continue
+        written += merge(symbol, interval, frame_to_bars(sym_df), root)
+    end = _bound(w1, interval)
+    missing = [s for s in missing if (first_trade_ts(s) or 0) < end]
+    if missing:
+        raise ValueError(f"no bars for {', '.join(missing)}")
+    return written
+
+
+def backfill(symbols: list[str], interval: str = "1d", years: float = 10.0, root: str = HISTORY_DIR,
+             workers: int = BACKFILL_WORKERS, chunk_size: int = BACKFILL_CHUNK_SIZE) -> tuple[int, int]:
+    """Fill the store for symbols over the last `years`, resumable.
+
+    Finished units are recorded in <root>/backfill_checkpoint.json after their bars are
+    written, so a killed run repeats at most the units that were in flight. Requests go
+    through market_data.download, so they share the process-wide rate limit and run one at
+    a time; extra workers only overlap one unit's download with another's merge.
+    Returns (units done this run, units failed).
+    """
+    # A resumed run reuses the interrupted run's end date, so its date windows (and unit keys) match
+    plan_id = f"{interval}|{years}"
+    ckpt_path = os.path.join(root, BACKFILL_CHECKPOINT)
+    end = datetime.now(timezone.utc) + timedelta(days=1)
+    done: set[str] = set()
+    try:
+        with open(ckpt_path, "r", encoding="utf-8") as f:
+            ckpt = json.load(f)
+        if ckpt.get("plan") == plan_id:
+            end = datetime.strptime(ckpt["end"], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            done = set(ckpt.get("done", []))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable backfill checkpoint {ckpt_path}: {e}")
+    start = end - timedelta(days=int(years * 365.25))
+    units = plan_backfill(symbols, interval, start, end, chunk_size)
+
+    todo = [u for u in units if _unit_key(*u) not in done]
+    logging.info(f"Backfill {interval}: {len(units)} unit(s), {len(units) - len(todo)} already done, {len(todo)} to go")
+    os.makedirs(root, exist_ok=True)
+    ckpt_lock = threading.Lock()
+
+    def save_checkpoint():
+        tmp = f"{ckpt_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"v": 1, "plan": plan_id, "end": f"{end:%Y-%m-%d}", "done": sorted(done)}, f,
+                      separators=(",", ":"))
+        os.replace(tmp, ckpt_path)
+
+    completed = failed = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Backfill") as pool:
+        futures = {pool.submit(_backfill_unit, chunk, interval, w0, w1, root): (chunk, w0, w1)
+                   for chunk, w0, w1 in todo}
+        try:
+            for fut in as_completed(futures):
+                chunk, w0, w1 = futures[fut]
+                try:
+                    written = fut.result()
+                except Exception as e:
+                    failed += 1
+                    logging.error(f"Backfill failed for {len(chunk)} symbol(s) {w0}..{w1}: {e}")
+                    continue
+                completed += 1
+                with ckpt_lock:
+                    done.add(_unit_key(chunk, w0, w1))
+                    save_checkpoint()
+                logging.info(f"Backfill [{completed + failed}/{len(todo)}] {chunk[0]}..{chunk[-1]} {w0}..{w1}: {written} bar(s)")
+        except KeyboardInterrupt:
+            # Drop the queued units; only the `workers` already running finish (and are redone on resume)
+            pool.shutdown(wait=False, cancel_futures=True)
+            logging.warning(f"Backfill interrupted after {completed} unit(s); run it again to resume")
+            raise
+    if not failed and os.path.exists(ckpt_path):
+        os.remove(ckpt_path)  # plan complete; the next run starts a fresh one
+    return completed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OHLCV history store")
+    parser.add_argument("--root", default=HISTORY_DIR, help=f"History directory (default: {HISTORY_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bf = sub.add_parser("backfill", help="Download years of bars for the watchlist (resumable)")
+    bf.add_argument("--yaml", default="tickers.yaml", help="Watchlist YAML (default: tickers.yaml)")
+    bf.add_argument("--symbols", nargs="*", default=None, help="Symbols to backfill instead of the watchlist")
+    bf.add_argument("--interval", default="1d", help="Bar interval, e.g. 1d, 1h, 5m (default: 1d)")
+    bf.add_argument("--years", type=float, default=10.0, help="How far back to fill (default: 10)")
+    bf.add_argument("--workers", type=int, default=BACKFILL_WORKERS, help=f"Units in flight; downloads still run one at a time (default: {BACKFILL_WORKERS})")
+    bf.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE, help=f"Symbols per request (default: {BACKFILL_CHUNK_SIZE})")
+
+    q = sub.add_parser("query", help="Print stored bars for a symbol over [start, end)")
+    q.add_argument("symbol")
+    q.add_argument("--start", default=None, help="Inclusive start, e.g. 2024-01-01 or epoch seconds")
+    q.add_argument("--end", default=None, help="Exclusive end, e.g. 2025-01-01 or epoch seconds")
+    q.add_argument("--fields", nargs="*", default=None, choices=FIELDS, help="Columns to print (default: all)")
+    q.add_argument("--interval", default="1d", help="Bar interval (default: 1d)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.command == "backfill":
+        symbols = [s.strip().upper() for s in args.symbols] if args.symbols else load_watchlist(args.yaml)
+        if not symbols:
+            parser.error("no symbols to backfill")
+        try:
+            completed, failed = backfill(symbols, args.interval, args.years, args.root,
+                                         max(1, args.workers), max(1, args.chunk_size))
+        except KeyboardInterrupt:
+            logging.info("Backfill interrupted; re-run the same command to resume")
+            raise SystemExit(130)
+        finally:
+            market_data.shutdown()
+        logging.info(f"Backfill finished: {completed} unit(s) done, {failed} failed")
+        raise SystemExit(1 if failed else 0)
+
+    if args.command == "query":
+        def bound(v):
+            return int(v) if v is not None and v.lstrip("-").isdigit() else v
+
+        fields = tuple(args.fields) if args.fields else FIELDS
+        t0 = time.perf_counter()
+        bars = query(args.symbol.upper(), bound(args.start), bound(args.end), fields + ("ts",), args.interval, args.root)
+        elapsed_us = (time.perf_counter() - t0) * 1e6
+        print(",".join(("date",) + fields))
+        for row in bars:
+            print(",".join([bar_date(row["ts"], args.interval)] + [f"{row[f]:.6g}" for f in fields]))
+        logging.info(f"{len(bars)} bar(s) for {args.symbol.upper()} {args.interval} in {elapsed_us:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+indicators.py - Streaming technical indicators with O(1) updates
+
+SMA, EMA, RSI, MACD, Bollinger bands and ATR as small state machines:
+
+- push(...)  folds in one CLOSED bar and returns the new value.
+- peek(...)  returns what the value would be if the next bar closed at these prices. The
+             forming bar (every tick of the fetch cycle) gets a live value without touching
+             state.
+
+Both are O(1) whatever the length of the history. Seeding over stored bars is one pass of
+push() (IndicatorSet.seed), and after that each new bar or tick costs a few float ops.
+compute() runs the same classes over whole arrays for chart overlays, so the chart and the
+live values always agree.
+
+BarFeed wraps an IndicatorSet for a stream of (bucket ts, high, low, close) updates, such
+as intraday.BarAggregator's forming 1m bar. It pushes a bar once its bucket has closed and
+peeks while it is still forming.
+
+Warm-up: a value is None (NaN in compute()) until enough bars have been seen.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+
+
+# ----------------------------- Tunable Constants -----------------------------
+SMA_FAST = 20
+SMA_SLOW = 50
+EMA_PERIOD = 20
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLL_PERIOD, BOLL_K = 20, 2.0
+ATR_PERIOD = 14
+RSI_OVERBOUGHT = 70.0
+RSI_OVERSOLD = 30.0
+
+
+class SMA:
+    """Simple moving average over a fixed ring with a running sum."""
+
+    __slots__ = ("n", "buf", "head", "count", "total")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.buf = [0.0] * n
+        self.head = 0
+        self.count = 0
+        self.total = 0.0
+
+    def push(self, x: float) -> Optional[float]:
+        if self.count == self.n:
+            self.total -= self.buf[self.head]
+        else:
+            self.count += 1
+        self.buf[self.head] = x
+        self.total += x
+        self.head = (self.head + 1) % self.n
+        return self.value
+
+    def peek(self, x: float) -> Optional[float]:
+        if self.count < self.n - 1:
+            return None
+        evicted = self.buf[self.head] if self.count == self.n else 0.0
+        return (self.total - evicted + x) / self.n
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.total / self.n if self.count == self.n else None
+
+
+class EMA:
+    """Exponential moving average seeded with the SMA of its first n values."""
+
+    __slots__ = ("n", "alpha", "count", "value", "_seed")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.alpha = 2.0 / (n + 1.0)
+        self.count = 0
+        self.value: Optional[float] = None
+        self._seed = 0.0
+
+    def push(self, x: float) -> Optional[float]:
+        self.value = self.peek(x)
+        if self.count < self.n:
+            self.count += 1
+            self._seed += x
+        return self.value
+
+    def peek(self, x: float) -> Optional[float]:
+        if self.count < self.n - 1:
+            return None
+        if self.count == self.n - 1:
+            return (self._seed + x) / self.n
+        return self.value + self.alpha * (x - self.value)
+
+
+class RSI:
+    """Wilder's RSI: simple average of the first n gains/losses, then Wilder smoothing."""
+
+    __slots__ = ("n", "prev", "count", "avg_gain", "avg_loss")
+
+    def __init__(self, n: int = RSI_PERIOD):
+        self.n = n
+        self.prev: Optional[float] = None
+        self.count = 0          # price changes seen (capped at n)
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _step(self, x: float) -> tuple[int, float, float]:
+        change = x - self.prev
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if self.count < self.n:
+            k = self.count + 1
+            return k, self.avg_gain + (gain - self.avg_gain) / k, self.avg_loss + (loss - self.avg_loss) / k
+        return self.n, (self.avg_gain * (self.n - 1) + gain) / self.n, (self.avg_loss * (self.n - 1) + loss) / self.n
+
+    @staticmethod
+    def _rsi(count: int, n: int, gain: float, loss: float) -> Optional[float]:
+        if count < n:
+            return None
+        if loss == 0.0:
+            return 100.0 if gain > 0.0 else 50.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def push(self, x: float) -> Optional[float]:
+        if self.prev is not None:
+            self.count, self.avg_gain, self.avg_loss = self._step(x)
+        self.prev = x
+        return self.value
+
+    def peek(self, x: float) -> Optional[float]:
+        if self.prev is None:
+            return None
+        count, gain, loss = self._step(x)
+        return self._rsi(count, self.n, gain, loss)
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._rsi(self.count, self.n, self.avg_gain, self.avg_loss)
+
+
+class MACD:
+    """MACD line (fast EMA - slow EMA), its signal EMA and the histogram."""
+
+    __slots__ = ("fast", "slow", "signal")
+
+    def __init__(self, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL):
+        self.fast, self.slow, self.signal = EMA(fast), EMA(slow), EMA(signal)
+
+    def push(self, x: float) -> Optional[tuple[float, float, float]]:
+        f, s = self.fast.push(x), self.slow.push(x)
+        if f is None or s is None:
+            return None
+        line = f - s
+        sig = self.signal.push(line)
+        return None if sig is None else (line, sig, line - sig)
+
+    def peek(self, x: float) -> Optional[tuple[float, float, float]]:
+        f, s = self.fast.peek(x), self.slow.peek(x)
+        if f is None or s is None:
+            return None
+        line = f - s
+        sig = self.signal.peek(line)
+        return None if sig is None else (line, sig, line - sig)
+
+
+class Bollinger:
+    """Middle band = SMA(n); upper/lower = middle +/- k population standard deviations."""
+
+    __slots__ = ("k", "sma", "sumsq")
+
+    def __init__(self, n: int = BOLL_PERIOD, k: float = BOLL_K):
+        self.k = k
+        self.sma = SMA(n)
+        self.sumsq = 0.0
+
+    def _bands(self, total: float, sumsq: float) -> tuple[float, float, float]:
+        n = self.sma.n
+        mid = total / n
+        sd = math.sqrt(max(sumsq / n - mid * mid, 0.0))
+        return mid, mid + self.k * sd, mid - self.k * sd
+
+    def push(self, x: float) -> Optional[tuple[float, float, float]]:
+        s = self.sma
+        if s.count == s.n:
+            self.sumsq -= s.buf[s.head] ** 2
+        s.push(x)
+        self.sumsq += x * x
+        return self._bands(s.total, self.sumsq) if s.count == s.n else None
+
+    def peek(self, x: float) -> Optional[tuple[float, float, float]]:
+        s = self.sma
+        if s.count < s.n - 1:
+            return None
+        evicted = s.buf[s.head] if s.count == s.n else 0.0
+        return self._bands(s.total - evicted + x, self.sumsq - evicted * evicted + x * x)
+
+
+class ATR:
+    """Wilder's average true range."""
+
+    __slots__ = ("n", "prev_close", "count", "value_")
+
+    def __init__(self, n: int = ATR_PERIOD):
+        self.n = n
+        self.prev_close: Optional[float] = None
+        self.count = 0
+        self.value_ = 0.0
+
+    def _step(self, high: float, low: float) -> tuple[int, float]:
+        tr = high - low if self.prev_close is None else max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        if self.count < self.n:
+            k = self.count + 1
+            return k, self.value_ + (tr - self.value_) / k
+        return self.n, (self.value_ * (self.n - 1) + tr) / self.n
+
+    def push(self, high: float, low: float, close: float) -> Optional[float]:
+        self.count, self.value_ = self._step(high, low)
+        self.prev_close = close
+        return self.value
+
+    def peek(self, high: float, low: float, close: float) -> Optional[float]:
+        count, value = self._step(high, low)
+        return value if count >= self.n else None
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.value_ if self.count >= self.n else None
+
+
+class IndicatorSet:
+    """The standard indicators for one symbol/timeframe, fed bar by bar."""
+
+    __slots__ = ("sma_fast", "sma_slow", "ema", "rsi", "macd", "boll", "atr", "last")
+
+    def __init__(self):
+        self.sma_fast, self.sma_slow = SMA(SMA_FAST), SMA(SMA_SLOW)
+        self.ema = EMA(EMA_PERIOD)
+        self.rsi = RSI(RSI_PERIOD)
+        self.macd = MACD()
+        self.boll = Bollinger()
+        self.atr = ATR()
+        self.last: dict = {}
+
+    def push(self, high: float, low: float, close: float) -> dict:
+        self.last = {
+            "sma_fast": self.sma_fast.push(close), "sma_slow": self.sma_slow.push(close),
+            "ema": self.ema.push(close), "rsi": self.rsi.push(close), "macd": self.macd.push(close),
+            "boll": self.boll.push(close), "atr": self.atr.push(high, low, close),
+        }
+        return self.last
+
+    def peek(self, high: float, low: float, close: float) -> dict:
+        return {
+            "sma_fast": self.sma_fast.peek(close), "sma_slow": self.sma_slow.peek(close),
+            "ema": self.ema.peek(close), "rsi": self.rsi.peek(close), "macd": self.macd.peek(close),
+            "boll": self.boll.peek(close), "atr": self.atr.peek(high, low, close),
+        }
+
+    def seed(self, bars: np.ndarray) -> dict:
+        """One pass over stored BAR_DTYPE bars (oldest first); NaN closes are skipped."""
+        for h, lo, c in zip(bars["high"].tolist(), bars["low"].tolist(), bars["close"].tolist()):
+            if c == c:
+                self.push(h if h == h else c, lo if lo == lo else c, c)
+        return self.last
+
+
+class BarFeed:
+    """Turns repeated updates of a forming bar into push (when its bucket closes) + peek (while forming)."""
+
+    __slots__ = ("ind", "bar")
+
+    def __init__(self, ind: Optional[IndicatorSet] = None):
+        self.ind = ind or IndicatorSet()
+        self.bar: Optional[tuple[int, float, float, float]] = None
+
+    def update(self, ts: int, high: float, low: float, close: float) -> dict:
+        if self.bar is not None and ts != self.bar[0]:
+            if ts < self.bar[0]:
+                return self.ind.last
+            self.ind.push(*self.bar[1:])
+        self.bar = (ts, high, low, close)
+        return self.ind.peek(high, low, close)
+
+
+def compute(closes: np.ndarray, highs: Optional[np.ndarray] = None, lows: Optional[np.ndarray] = None) -> dict[str, np.ndarray]:
+    """Whole-series values (NaN during warm-up) using the streaming classes, for chart overlays."""
+    n = len(closes)
+    highs = closes if highs is None else highs
+    lows = closes if lows is None else lows
+    out = {k: np.full(n, np.nan) for k in ("sma_fast", "sma_slow", "ema", "rsi", "macd", "macd_signal",
+                                           "boll_mid", "boll_upper", "boll_lower", "atr")}
+    ind = IndicatorSet()
+    for i, (h, lo, c) in enumerate(zip(highs.tolist(), lows.tolist(), closes.tolist())):
+        if c != c:
+            continue
+        v = ind.push(h if h == h else c, lo if lo == lo else c, c)
+        for key in ("sma_fast", "sma_slow", "ema", "rsi", "atr"):
+            if v[key] is not None:
+                out[key][i] = v[key]
+        if v["macd"] is not None:
+            out["macd"][i], out["macd_signal"][i] = v["macd"][0], v["macd"][1]
+        if v["boll"] is not None:
+            out["boll_mid"][i], out["boll_upper"][i], out["boll_lower"][i] = v["boll"]
+    return out
@@ -0,0 +1,180 @@
+"""
+intraday.py - Streaming 1m/5m/15m OHLC bars built from polled quotes
+
+tickerV3 gets a fresh price per symbol every fetch cycle (and partial deltas in between).
+BarAggregator folds each price into the current bar of every timeframe. Closed bars live in
+fixed-size ring buffers (BAR_DTYPE records, the same layout as history_store), so memory
+stays bounded however long the tape runs. Intraday charts and indicators read from here
+instead of downloading again.
+
+Bars only know what was polled: open/high/low/close are the first/max/min/last price seen
+in the bucket (volume stays NaN), and a bucket with no poll has no bar. Polls are stamped
+with fetch time, so a quote repeating the symbol's previous price and change (a closed
+market, polled every cycle) is skipped: closed sessions leave no flat bars behind.
+
+PriceRing is the lighter sibling used for the tape's sparklines: the last N prices of one
+symbol plus canvas coordinates recomputed only when a price is pushed.
+
+Not thread-safe by design: tickerV3 feeds and reads it on the Tk thread only.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+from history_store import BAR_DTYPE
+
+
+# ----------------------------- Tunable Constants -----------------------------
+TIMEFRAMES = {"1m": 60, "5m": 300, "15m": 900}   # name -> bucket seconds
+RING_CAPACITY = {"1m": 720, "5m": 576, "15m": 384}  # 12 h of 1m, 2 days of 5m, 4 days of 15m
+SPARK_POINTS = 60           # prices kept per symbol for its sparkline
+
+
+class BarRing:
+    """Preallocated ring of BAR_DTYPE bars; the newest bar is updated in place until its bucket closes."""
+
+    __slots__ = ("seconds", "buf", "count", "head")
+
+    def __init__(self, seconds: int, capacity: int):
+        self.seconds = seconds
+        self.buf = np.zeros(capacity, dtype=BAR_DTYPE)
+        self.count = 0      # bars stored (<= capacity)
+        self.head = 0       # index of the newest bar
+
+    def add(self, price: float, ts: float) -> bool:
+        """Fold one price in. Returns False for prices older than the current bar (ignored)."""
+        start = int(ts) // self.seconds * self.seconds
+        if self.count:
+            bar = self.buf[self.head]
+            if start == bar["ts"]:
+                if price > bar["high"]:
+                    bar["high"] = price
+                if price < bar["low"]:
+                    bar["low"] = price
+                bar["close"] = price
+                return True
+            if start < bar["ts"]:
+                return False
+            self.head = (self.head + 1) % len(self.buf)
+        self.count = min(self.count + 1, len(self.buf))
+        self.buf[self.head] = (start, price, price, price, price, np.nan)
+        return True
+
+    def bars(self, last: Optional[int] = None) -> np.ndarray:
+        """Oldest-to-newest bars (a view when the ring hasn't wrapped, else one copy)."""
+        n = self.count if last is None else min(last, self.count)
+        end = self.head + 1
+        if n <= end:
+            return self.buf[end - n:end]
+        return np.concatenate((self.buf[len(self.buf) - (n - end):], self.buf[:end]))
+
+
+class BarAggregator:
+    """Per-symbol BarRings for every timeframe in TIMEFRAMES."""
+
+    def __init__(self, timeframes: Optional[dict[str, int]] = None,
+                 capacity: Optional[dict[str, int]] = None):
+        self.timeframes = dict(TIMEFRAMES if timeframes is None else timeframes)
+        self.capacity = dict(RING_CAPACITY if capacity is None else capacity)
+        self._rings: dict[str, dict[str, BarRing]] = {}
+        self._last: dict[str, tuple[float, Optional[float]]] = {}  # symbol -> (price, change) last folded
+
+    def add(self, symbol: str, price: float, ts: float):
+        rings = self._rings.get(symbol)
+        if rings is None:
+            rings = self._rings[symbol] = {
+                name: BarRing(sec, self.capacity.get(name, 500)) for name, sec in self.timeframes.items()
+            }
+        for ring in rings.values():
+            ring.add(price, ts)
+
+    def add_quotes(self, quotes: Iterable) -> int:
+        """Fold in fresh quotes (anything with .symbol/.price/.as_of); stale, empty or unchanged ones are skipped."""
+        n = 0
+        for q in quotes:
+            if q.price is None or q.as_of is None or getattr(q, "stale", False):
+                continue
+            key = (float(q.price), getattr(q, "change_pct", None))
+            if self._last.get(q.symbol) == key:
+                continue
+            self._last[q.symbol] = key
+            self.add(q.symbol, key[0], q.as_of)
+            n += 1
+        return n
+
+    def bars(self, symbol: str, timeframe: str = "1m", last: Optional[int] = None) -> np.ndarray:
+        """Bars for symbol oldest-to-newest (the newest may still be forming); empty if none."""
+        ring = self._rings.get(symbol, {}).get(timeframe)
+        if ring is None:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return ring.bars(last)
+
+    def drop(self, symbol: str):
+        self._rings.pop(symbol, None)
+        self._last.pop(symbol, None)
+
+    def symbols(self) -> list[str]:
+        return list(self._rings)
+
+
+class PriceRing:
+    """Preallocated ring of the last `capacity` prices with cached sparkline coordinates.
+
+    coords(w, h) returns a flat [x0, y0, x1, y1, ...] list scaled into a w x h box and is
+    rebuilt only after push() or a size change; rendering the same ring again is a lookup.
+    """
+
+    __slots__ = ("buf", "count", "head", "last_ts", "_coords", "_coords_key", "_version")
+
+    def __init__(self, capacity: int = SPARK_POINTS):
+        self.buf = np.empty(capacity, dtype=np.float64)
+        self.count = 0
+        self.head = -1
+        self.last_ts: Optional[float] = None
+        self._version = 0
+        self._coords: list[float] = []
+        self._coords_key: tuple = ()
+
+    def push(self, price: float, ts: Optional[float] = None) -> bool:
+        """Append a price; a repeat of the last timestamp is ignored. Returns True if stored."""
+        if ts is not None and ts == self.last_ts:
+            return False
+        self.head = (self.head + 1) % len(self.buf)
+        self.buf[self.head] = price
+        self.count = min(self.count + 1, len(self.buf))
+        self.last_ts = ts
+        self._version += 1
+        return True
+
+    def values(self) -> np.ndarray:
+        """Prices oldest-to-newest (a view when the ring hasn't wrapped, else one copy)."""
+        end = self.head + 1
+        if self.count <= end:
+            return self.buf[end - self.count:end]
+        return np.concatenate((self.buf[end:], self.buf[:end]))
+
+    def trend(self) -> float:
+        """Last price minus first price in the window (0.0 with fewer than two points)."""
+        if self.count < 2:
+            return 0.0
+        return float(self.buf[self.head] - self.buf[(self.head - self.count + 1) % len(self.buf)])
+
+    def coords(self, width: float, height: float) -> list[float]:
+        """Flat polyline coordinates in a width x height box (top-left origin); [] with < 2 points."""
+        key = (self._version, width, height)
+        if key != self._coords_key:
+            self._coords_key = key
+            if self.count < 2:
+                self._coords = []
+            else:
+                prices = self.values()
+                lo, hi = float(prices.min()), float(prices.max())
+                span = hi - lo
+                xy = np.empty(2 * self.count, dtype=np.float64)
+                xy[0::2] = np.linspace(0.0, width, self.count)
+                xy[1::2] = height / 2.0 if span <= 0 else height - (prices - lo) * (height / span)
+                self._coords = xy.tolist()
+        return self._coords
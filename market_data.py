@@ -0,0 +1,226 @@
+"""
+market_data.py - Shared yfinance plumbing for tickerV3.py and w_share_main.py
+
+One long-lived HTTP session (keep-alive connection pool) and one long-lived worker pool,
+created lazily on first use and shared by every fetch path in the process:
+- get_session(): curl_cffi browser-impersonating session when available (what yfinance
+  prefers), otherwise a requests.Session with a pooled HTTPAdapter.
+- get_executor(): thread pool for *leaf* requests (download / history / info calls).
+  Tasks submitted here must not block on other tasks in the same pool.
+- get_ticker(): cached yf.Ticker objects bound to the shared session. yf.Ticker caches
+  .info internally, so callers that need fresh fundamentals pass max_age.
+- download(): yf.download with the shared session injected, paced by the shared rate limit
+  and serialized per process (yf.download keeps its results in module globals).
+- throttle(): token-bucket rate limit every bulk fetch path waits on (RATE_LIMIT_PER_SEC);
+  set_rate_limit() re-sizes it (per-process share in shard_fetch workers).
+- load_quote_snapshot() / save_quote_snapshot(): compact last-known quote board on disk,
+  so either app can paint real prices (marked with their age) before the first fetch.
+
+Nothing here touches Tk; safe to call from any thread. yfinance (and with it pandas) is
+imported on first use, so importing this module is cheap for start-up paths.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import yfinance as yf
+
+
+# ----------------------------- Tunable Constants -----------------------------
+FETCH_WORKERS = 16          # leaf request threads shared by all fetch paths
+HTTP_POOL_SIZE = 32         # keep-alive connections (requests backend only)
+TICKER_TTL_SEC = 300        # max age of a cached yf.Ticker when the caller doesn't say
+SNAPSHOT_FILE = "quotes_snapshot.json"
+RATE_LIMIT_PER_SEC = 5.0    # sustained Yahoo requests/second across the process
+RATE_LIMIT_BURST = 10       # requests allowed back-to-back before pacing kicks in
+
+
+_lock = threading.Lock()
+_download_lock = threading.Lock()   # one yf.download at a time per process
+_session: Any = None
+_executor: ThreadPoolExecutor | None = None
+_tickers: dict[str, tuple[float, yf.Ticker]] = {}
+
+
+class RateLimiter:
+    """Thread-safe token bucket: acquire() blocks until a request may go out."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_rate_limiter = RateLimiter(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
+
+
+def _yf():
+    """yfinance, imported lazily (first call pays the pandas/yfinance import cost)."""
+    import yfinance
+    return yfinance
+
+
+def new_http_session():
+    """Build a pooled keep-alive session for the backend yfinance supports."""
+    try:
+        from curl_cffi import requests as curl_requests
+        return curl_requests.Session(impersonate="chrome")
+    except ImportError:
+        pass
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def get_session():
+    """Process-wide HTTP session (created on first use)."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = new_http_session()
+            logging.debug(f"Created shared HTTP session ({type(_session).__module__})")
+        return _session
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool for leaf requests (created on first use)."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="MarketData")
+        return _executor
+
+
+def get_ticker(symbol: str, max_age: float | None = None) -> yf.Ticker:
+    """Cached yf.Ticker on the shared session.
+
+    max_age (seconds, default TICKER_TTL_SEC) bounds how long the object - and therefore the
+    .info it caches internally - is reused. history() is never cached by yfinance.
+    """
+    symbol = symbol.strip().upper()
+    ttl = TICKER_TTL_SEC if max_age is None else max_age
+    now = time.time()
+    with _lock:
+        hit = _tickers.get(symbol)
+        if hit is not None and now - hit[0] < ttl:
+            return hit[1]
+    t = _yf().Ticker(symbol, session=get_session())
+    with _lock:
+        _tickers[symbol] = (now, t)
+    return t
+
+
+def set_rate_limit(rate: float, burst: int):
+    """Replace this process's limiter (shard_fetch worker processes each get a share of the budget)."""
+    global _rate_limiter
+    _rate_limiter = RateLimiter(rate, burst)
+
+
+def throttle():
+    """Wait for a slot under the process-wide rate limit."""
+    _rate_limiter.acquire()
+
+
+def download(tickers: list[str] | str, **kwargs):
+    """yf.download on the shared session (same arguments otherwise), under the shared rate limit.
+
+    Serialized: every yf.download call resets and refills yfinance's module-global result
+    dicts (shared._DFS / _ERRORS), so two concurrent calls can drop or mix each other's
+    symbols. Parallel batch downloads need separate processes (shard_fetch); per-symbol
+    Ticker.history calls are safe to run concurrently.
+    """
+    throttle()
+    kwargs.setdefault("session", get_session())
+    with _download_lock:
+        return _yf().download(tickers=tickers, **kwargs)
+
+
+def shutdown():
+    """Drop queued work and release the pool (in-flight requests finish in the background)."""
+    global _executor
+    with _lock:
+        ex, _executor = _executor, None
+    if ex is not None:
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+# ----------------------------- Quote snapshot -----------------------------
+# {"v": 1, "saved_at": epoch, "quotes": {"AIA.NZ": [price, change_pct | null, as_of], ...}}
+def load_quote_snapshot(path: str = SNAPSHOT_FILE) -> dict[str, tuple[float, float | None, float]]:
+    """symbol -> (price, change_pct, as_of epoch) from the last saved board ({} if none/bad)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        out: dict[str, tuple[float, float | None, float]] = {}
+        for sym, (price, change, as_of) in data.get("quotes", {}).items():
+            if price is not None:
+                out[sym] = (float(price), None if change is None else float(change), float(as_of))
+        return out
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable quote snapshot {path}: {e}")
+        return {}
+
+
+def save_quote_snapshot(quotes: dict[str, tuple[float, float | None, float]], path: str = SNAPSHOT_FILE):
+    """Merge quotes into the snapshot file (newest as_of wins per symbol), atomically.
+
+    Merging lets tickerV3 and w_share_main share one file without clobbering each other.
+    """
+    merged = load_quote_snapshot(path)
+    for sym, q in quotes.items():
+        if q[0] is not None and (sym not in merged or q[2] >= merged[sym][2]):
+            merged[sym] = q
+    payload = {
+        "v": 1,
+        "saved_at": round(time.time(), 1),
+        "quotes": {s: [round(p, 4), None if c is None else round(c, 2), round(t, 1)]
+                   for s, (p, c, t) in merged.items()},
+    }
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except Exception as e:
+        logging.warning(f"Quote snapshot save failed ({path}): {e}")
+
+
+def format_age(seconds: float) -> str:
+    """Short age label for stale quotes: 45s, 12m, 3h, 2d."""
+    seconds = max(0.0, seconds)
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 36 * 3600:
+        return f"{seconds / 3600:.0f}h"
+    return f"{seconds / 86400:.0f}d"
@@ -0,0 +1,375 @@
+"""
+portfolio.py - Holdings, cached FX and vectorized multi-currency valuation
+
+holdings.yaml lists positions in their listing currency:
+
+    base_currency: NZD
+    holdings:
+      - symbol: SPK.NZ
+        quantity: 1000
+        cost: 4.80          # per share, listing currency (optional)
+      - symbol: NVDA
+        quantity: 20
+        cost: 95.10
+      - symbol: VOD.L
+        quantity: 500
+        currency: GBp       # optional override; otherwise inferred from the suffix
+
+Several lots of one symbol are merged (quantity summed, cost quantity-weighted).
+
+Portfolio keeps one NumPy row per symbol: quantity, cost, minor-unit factor (pence ->
+pounds), FX rate to the base currency, price and previous close. revalue() values every
+position in one vectorized pass, and value_board() does the same from a whole quote board.
+apply() folds a quote delta in incrementally: for each changed row it subtracts the old
+contribution from the running totals and adds the new one. So a tickerV3 delta costs
+O(changed rows), not O(holdings).
+
+FxCache holds <CCY><BASE>=X rates fetched in one batch download through market_data and
+refreshed after FX_MAX_AGE_SEC. Portfolio.sync_fx() picks up new rates with a full
+revalue(), which also clears any drift in the running totals.
+
+PortfolioWindow is a small ttk.Treeview view, shared by tickerV3 and w_share_main.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+import tkinter as tk
+from dataclasses import dataclass
+from tkinter import ttk
+from typing import Iterable, Optional
+
+import numpy as np
+import yaml
+
+import market_data
+
+
+# ----------------------------- Tunable Constants -----------------------------
+HOLDINGS_FILE = "holdings.yaml"
+BASE_CURRENCY = "NZD"
+FX_MAX_AGE_SEC = 3600
+FX_RETRY_SEC = 300          # wait after a failed FX fetch before asking again
+SUFFIX_CURRENCY = {         # Yahoo suffix -> listing currency ('' = no suffix)
+    "": "USD", "NZ": "NZD", "AX": "AUD", "L": "GBp", "TO": "CAD", "V": "CAD", "HK": "HKD",
+    "T": "JPY", "SI": "SGD", "DE": "EUR", "F": "EUR", "PA": "EUR", "AS": "EUR", "MI": "EUR",
+    "SW": "CHF", "JO": "ZAc", "TA": "ILA",
+}
+MINOR_UNITS = {"GBp": ("GBP", 0.01), "GBX": ("GBP", 0.01), "ZAc": ("ZAR", 0.01), "ILA": ("ILS", 0.01)}
+COLUMNS = ("symbol", "quantity", "currency", "price", "value", "day", "pnl", "pnl_pct")
+
+
+def listing_currency(symbol: str) -> str:
+    """Currency Yahoo quotes symbol in, inferred from its suffix (indices/FX/unknown: USD)."""
+    suffix = symbol.rsplit(".", 1)[1].upper() if "." in symbol else ""
+    return SUFFIX_CURRENCY.get(suffix, SUFFIX_CURRENCY.get(suffix.title(), "USD"))
+
+
+def major_currency(currency: str) -> tuple[str, float]:
+    """(ISO currency, factor) for a quote currency, e.g. 'GBp' -> ('GBP', 0.01)."""
+    return MINOR_UNITS.get(currency, (currency.upper(), 1.0))
+
+
+@dataclass
+class Holding:
+    symbol: str
+    quantity: float
+    cost: float = math.nan      # per share in the listing currency; NaN = unknown
+    currency: str = ""          # listing currency; '' = infer from the suffix
+
+
+def load_holdings(path: str = HOLDINGS_FILE) -> tuple[str, list[Holding]]:
+    """(base currency, holdings) from path; (BASE_CURRENCY, []) if it is missing or unreadable."""
+    if not os.path.exists(path):
+        return BASE_CURRENCY, []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        src = data if isinstance(data, list) else data.get("holdings") or []
+        base = str(data.get("base_currency", BASE_CURRENCY)).upper() if isinstance(data, dict) else BASE_CURRENCY
+        holdings = []
+        for h in src:
+            try:
+                symbol = str(h["symbol"]).strip().upper()
+                cost = h.get("cost")
+                holdings.append(Holding(symbol, float(h["quantity"]), math.nan if cost is None else float(cost),
+                                        str(h.get("currency") or "")))
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning(f"Skipping holding {h!r} in {path}: {e}")
+        return base, holdings
+    except Exception as e:
+        logging.warning(f"Holdings load warning ({path}): {e}")
+        return BASE_CURRENCY, []
+
+
+def _last_closes(batch_df, symbols: list[str]) -> dict[str, tuple[float, Optional[float]]]:
+    """symbol -> (last close, previous close or None) from a group_by='ticker' download."""
+    import pandas as pd
+    out: dict[str, tuple[float, Optional[float]]] = {}
+    if batch_df is None or batch_df.empty:
+        return out
+    is_multi = isinstance(batch_df.columns, pd.MultiIndex)
+    for sym in symbols:
+        if is_multi and sym in batch_df.columns.get_level_values(0):
+            closes = batch_df[sym]["Close"].dropna()
+        elif not is_multi and len(symbols) == 1:
+            closes = batch_df["Close"].dropna()
+        else:
+            continue
+        if len(closes):
+            out[sym] = (float(closes.iloc[-1]), float(closes.iloc[-2]) if len(closes) > 1 else None)
+    return out
+
+
+@dataclass
+class PortfolioQuote:
+    """Quote shape Portfolio.apply() accepts (tickerV3.Quote works too)."""
+    symbol: str
+    price: Optional[float]
+    change_pct: Optional[float]
+    stale: bool = False
+
+
+def fetch_quotes(symbols: list[str]) -> list[PortfolioQuote]:
+    """Blocking: last price and % change vs previous close for symbols, in one batch download."""
+    if not symbols:
+        return []
+    df = market_data.download(symbols, period="5d", interval="1d", progress=False, group_by="ticker",
+                              auto_adjust=False, threads=False)
+    quotes = []
+    for sym, (price, prev) in _last_closes(df, symbols).items():
+        quotes.append(PortfolioQuote(sym, price, (price / prev - 1.0) * 100.0 if prev else None))
+    return quotes
+
+
+class FxCache:
+    """Rates to one base currency, fetched in one batch and reused for FX_MAX_AGE_SEC (any thread)."""
+
+    def __init__(self, base: str = BASE_CURRENCY, max_age: float = FX_MAX_AGE_SEC):
+        self.base = base.upper()
+        self.max_age = float(max_age)
+        self.rates: dict[str, float] = {self.base: 1.0}
+        self.fetched_at: dict[str, float] = {}
+        self.version = 0            # bumped whenever a rate changes
+        self._lock = threading.Lock()
+
+    def rate(self, currency: str) -> Optional[float]:
+        """Base units per one unit of the (major) currency; None if not fetched yet."""
+        return self.rates.get(currency.upper())
+
+    def stale(self, currencies: Iterable[str], now: Optional[float] = None) -> list[str]:
+        now = time.time() if now is None else now
+        return sorted({c.upper() for c in currencies if c.upper() != self.base
+                       and now - self.fetched_at.get(c.upper(), 0.0) >= self.max_age})
+
+    def refresh(self, currencies: Iterable[str], force: bool = False) -> bool:
+        """Blocking: fetch stale (or all, with force) rates in one download. Returns True if any changed."""
+        with self._lock:
+            need = self.stale(currencies, math.inf if force else None)
+            if not need:
+                return False
+            pairs = {f"{c}{self.base}=X": c for c in need}
+            try:
+                df = market_data.download(list(pairs), period="5d", interval="1d", progress=False,
+                                          group_by="ticker", auto_adjust=False, threads=False)
+                closes = _last_closes(df, list(pairs))
+            except Exception as e:
+                logging.warning(f"FX refresh failed for {', '.join(need)}: {e}")
+                closes = {}
+            now = time.time()
+            changed = False
+            for pair, ccy in pairs.items():
+                if pair in closes:
+                    rate = closes[pair][0]
+                    changed = changed or self.rates.get(ccy) != rate
+                    self.rates[ccy] = rate
+                    self.fetched_at[ccy] = now
+                else:
+                    logging.warning(f"No FX rate for {pair}")
+                    self.fetched_at[ccy] = now - self.max_age + FX_RETRY_SEC
+            if changed:
+                self.version += 1
+            return changed
+
+
+class Portfolio:
+    """Columnar holdings valued in the base currency; totals kept up to date incrementally."""
+
+    def __init__(self, holdings: list[Holding], base: str = BASE_CURRENCY, fx: Optional[FxCache] = None):
+        merged: dict[str, list] = {}
+        for h in holdings:
+            q, c, ccy = merged.setdefault(h.symbol, [0.0, 0.0, h.currency or listing_currency(h.symbol)])
+            merged[h.symbol] = [q + h.quantity, c + h.quantity * h.cost, ccy]  # any unknown cost -> NaN
+        self.symbols = list(merged)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.currency = [m[2] for m in merged.values()]
+        majors = [major_currency(c) for c in self.currency]
+        self.major = [m[0] for m in majors]
+        self.qty = np.array([m[0] for m in merged.values()], dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.cost = np.array([m[1] for m in merged.values()], dtype=np.float64) / self.qty
+        self.unit = np.array([m[1] for m in majors], dtype=np.float64)
+        self.fx = FxCache(base) if fx is None else fx
+        self.base = self.fx.base
+        n = len(self.symbols)
+        self.rate = np.full(n, np.nan)
+        self.price = np.full(n, np.nan)
+        self.prev = np.full(n, np.nan)
+        self.value = np.full(n, np.nan)     # base currency
+        self.day = np.full(n, np.nan)       # base currency, vs previous close
+        self.pnl = np.full(n, np.nan)       # base currency, vs cost
+        self.totals = {"value": 0.0, "day": 0.0, "pnl": 0.0, "cost": 0.0}
+        self._fx_version = -1
+        self._load_rates()
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def currencies(self) -> list[str]:
+        return sorted(set(self.major))
+
+    def _load_rates(self):
+        self.rate = np.array([self.fx.rate(c) or np.nan for c in self.major], dtype=np.float64)
+        self._fx_version = self.fx.version
+
+    def revalue(self):
+        """Value every row and the totals in one vectorized pass."""
+        scale = self.qty * self.unit * self.rate
+        self.value = scale * self.price
+        self.day = scale * (self.price - self.prev)
+        cost = scale * self.cost
+        self.pnl = self.value - cost
+        self.totals = {
+            "value": float(np.nansum(self.value)),
+            "day": float(np.nansum(self.day)),
+            "pnl": float(np.nansum(self.pnl)),
+            "cost": float(np.nansum(np.where(np.isnan(self.pnl), np.nan, cost))),
+        }
+
+    def value_board(self, quotes: Iterable):
+        """Take prices for every holding from a full quote board, then revalue()."""
+        for q in quotes:
+            row = self.index.get(q.symbol)
+            if row is not None and q.price is not None:
+                self.price[row], self.prev[row] = self._price_prev(q)
+        self.revalue()
+
+    @staticmethod
+    def _price_prev(q) -> tuple[float, float]:
+        price = float(q.price)
+        chg = q.change_pct
+        return price, price / (1.0 + chg / 100.0) if chg is not None and chg > -100.0 else math.nan
+
+    def sync_fx(self) -> bool:
+        """Pick up rates the FxCache fetched since the last call (full revalue); O(1) otherwise."""
+        if self.fx.version == self._fx_version:
+            return False
+        self._load_rates()
+        self.revalue()
+        return True
+
+    def apply(self, quotes: Iterable) -> list[int]:
+        """Fold a quote delta into the rows and running totals. Returns the rows that changed."""
+        changed = []
+        t = self.totals
+        for q in quotes:
+            row = self.index.get(q.symbol)
+            if row is None or q.price is None:
+                continue
+            price, prev = self._price_prev(q)
+            if price == self.price[row] and (prev == self.prev[row] or math.isnan(prev)):
+                continue
+            scale = self.qty[row] * self.unit[row] * self.rate[row]
+            value, day = scale * price, scale * (price - prev)
+            cost = scale * self.cost[row]
+            pnl = value - cost
+            old_value, old_day, old_pnl = self.value[row], self.day[row], self.pnl[row]
+            t["value"] += _z(value) - _z(old_value)
+            t["day"] += _z(day) - _z(old_day)
+            t["pnl"] += _z(pnl) - _z(old_pnl)
+            if math.isnan(old_pnl) != math.isnan(pnl):
+                t["cost"] += _z(cost) if math.isnan(old_pnl) else -_z(cost)
+            self.price[row], self.prev[row] = price, prev
+            self.value[row], self.day[row], self.pnl[row] = value, day, pnl
+            changed.append(row)
+        return changed
+
+    def row(self, i: int) -> dict:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cost = self.value[i] - self.pnl[i]
+            pct = self.pnl[i] / cost * 100.0 if cost else math.nan
+        return {"symbol": self.symbols[i], "quantity": self.qty[i], "currency": self.currency[i],
+                "price": self.price[i], "value": self.value[i], "day": self.day[i], "pnl": self.pnl[i],
+                "pnl_pct": pct}
+
+
+def _z(x: float) -> float:
+    return 0.0 if math.isnan(x) else float(x)
+
+
+def _fmt(x: float, spec: str = ",.2f") -> str:
+    return "" if x is None or (isinstance(x, float) and math.isnan(x)) else format(x, spec)
+
+
+class PortfolioWindow:
+    """Holdings table with base-currency value, day and total P&L; refresh() after each update."""
+
+    def __init__(self, master: tk.Misc, portfolio: Portfolio, on_refresh=None):
+        self.portfolio = portfolio
+        self.top = tk.Toplevel(master)
+        self.top.title(f"Portfolio ({portfolio.base})")
+        self.top.geometry("720x360")
+
+        bar = tk.Frame(self.top)
+        bar.pack(fill="x")
+        self.summary = tk.Label(bar, text="", anchor="w", font=("Consolas", 10))
+        self.summary.pack(side="left", padx=6, pady=4)
+        if on_refresh is not None:
+            tk.Button(bar, text="Refresh", command=on_refresh).pack(side="right", padx=6, pady=2)
+
+        frame = tk.Frame(self.top)
+        frame.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(frame, columns=COLUMNS, show="headings")
+        headings = {"symbol": "Symbol", "quantity": "Qty", "currency": "Ccy", "price": "Price",
+                    "value": f"Value {portfolio.base}", "day": "Day P&L", "pnl": "Total P&L", "pnl_pct": "P&L %"}
+        for col in COLUMNS:
+            self.tree.heading(col, text=headings[col])
+            self.tree.column(col, width=70 if col in ("currency", "quantity", "pnl_pct") else 95,
+                             anchor="w" if col == "symbol" else "e")
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+        for sym in portfolio.symbols:
+            self.tree.insert("", "end", iid=sym)
+        self.refresh()
+
+    def alive(self) -> bool:
+        try:
+            return bool(self.top.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def lift(self):
+        self.top.lift()
+
+    def refresh(self, rows: Optional[Iterable[int]] = None):
+        """Rewrite the given rows (default: all) and the totals line."""
+        p = self.portfolio
+        for i in range(len(p)) if rows is None else rows:
+            r = p.row(i)
+            self.tree.item(r["symbol"], values=(
+                r["symbol"], _fmt(r["quantity"], ",g"), r["currency"], _fmt(r["price"], ",.3f"),
+                _fmt(r["value"]), _fmt(r["day"], "+,.2f"), _fmt(r["pnl"], "+,.2f"), _fmt(r["pnl_pct"], "+.1f")))
+        t = p.totals
+        missing = [s for s, ok in zip(p.symbols, ~np.isnan(p.value)) if not ok]
+        pct = t["pnl"] / t["cost"] * 100.0 if t["cost"] else math.nan
+        text = (f"Value {p.base} {t['value']:,.2f}   Day {t['day']:+,.2f}   "
+                f"P&L {t['pnl']:+,.2f} ({_fmt(pct, '+.1f') or 'n/a'}%)")
+        if missing:
+            text += f"   (no price/FX: {', '.join(missing[:4])}{'...' if len(missing) > 4 else ''})"
+        self.summary.config(text=text)
@@ -0,0 +1,145 @@
+"""
+ranking.py - Weighted multi-factor ranking over the fundamentals table
+
+Replaces w_share_main's old "daily recommendations". The old code sorted 10 hard-coded
+tickers by -recommendationMean ascending, so it surfaced the worst-rated names (Yahoo's
+scale is 1 = Strong Buy ... 5 = Sell). RankingEngine scores the whole configured universe
+on several factors:
+
+    rec        analyst recommendation mean   (lower is better)
+    upside     % to targetMeanPrice          (higher is better)
+    pe         trailing P/E, positive only   (lower is better)
+    div_yield  dividend yield %              (higher is better)
+    mom        6-month price return %        (higher is better)
+
+Each factor becomes a z-score across the universe, clipped to +/-Z_CLIP so one outlier
+can't dominate, and signed so that higher is always better. A symbol's score is the
+weighted mean over the factors it has; missing data lowers the weight, not the score.
+
+Incremental: the engine keeps running count/sum/sum-of-squares per factor. sync() only
+revisits rows the table changed since the last call: it subtracts each row's old
+contribution and adds the new one. Refreshing one symbol is O(factors), and scores() is a
+single vectorized pass.
+
+Weights come from DEFAULT_WEIGHTS, optionally overridden by a 'weights' mapping in
+ranking.yaml next to the script.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+
+import numpy as np
+import yaml
+
+from screener import FundamentalsTable
+
+
+# ----------------------------- Tunable Constants -----------------------------
+FACTORS = {                 # factor -> +1 if higher is better, -1 if lower is better
+    "rec": -1.0,
+    "upside": 1.0,
+    "pe": -1.0,
+    "div_yield": 1.0,
+    "mom": 1.0,
+}
+DEFAULT_WEIGHTS = {"rec": 0.30, "upside": 0.25, "pe": 0.15, "div_yield": 0.15, "mom": 0.15}
+WEIGHTS_FILE = "ranking.yaml"
+Z_CLIP = 3.0
+MIN_FACTORS = 2             # symbols with fewer usable factors are not ranked
+
+
+def load_weights(path: str = WEIGHTS_FILE) -> dict[str, float]:
+    """DEFAULT_WEIGHTS overridden by {'weights': {factor: weight}} from path, if present."""
+    weights = dict(DEFAULT_WEIGHTS)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+            for name, w in (data.get("weights") or {}).items():
+                if name in FACTORS:
+                    weights[name] = max(0.0, float(w))
+                else:
+                    logging.warning(f"Ignoring unknown ranking factor '{name}' in {path}")
+        except Exception as e:
+            logging.warning(f"Ranking weights load warning ({path}): {e}")
+    return weights
+
+
+class RankingEngine:
+    """Incremental factor scores over a FundamentalsTable (call sync() before reading scores)."""
+
+    def __init__(self, table: FundamentalsTable, weights: dict[str, float] | None = None):
+        self.table = table
+        self.factors = list(FACTORS)
+        self.sign = np.array([FACTORS[f] for f in self.factors])
+        self.set_weights(weights or load_weights())
+        self._lock = threading.Lock()
+        self._values = np.full((0, len(self.factors)), np.nan)  # factor values as of the last sync, per row
+        self._seen = np.zeros(0, dtype=np.int64)                  # table.row_version as of the last sync
+        self._count = np.zeros(len(self.factors))
+        self._sum = np.zeros(len(self.factors))
+        self._sumsq = np.zeros(len(self.factors))
+
+    def set_weights(self, weights: dict[str, float]):
+        self.weights = np.array([float(weights.get(f, 0.0)) for f in self.factors])
+
+    def _factor_rows(self, rows: np.ndarray, cols: dict[str, np.ndarray]) -> np.ndarray:
+        """Factor matrix (len(rows) x factors) read from the table's columns."""
+        out = np.column_stack([cols[f][rows] for f in self.factors])
+        pe = out[:, self.factors.index("pe")]
+        pe[pe <= 0] = np.nan  # negative earnings: P/E is meaningless, not "cheap"
+        return out
+
+    def sync(self) -> int:
+        """Fold rows the table changed since the last sync into the running moments. Returns rows updated."""
+        with self._lock:
+            versions, cols = self.table.snapshot()
+            n = len(versions)
+            if n > len(self._seen):
+                grow = n - len(self._seen)
+                self._values = np.vstack([self._values, np.full((grow, len(self.factors)), np.nan)])
+                self._seen = np.concatenate([self._seen, np.full(grow, -1, dtype=np.int64)])
+            changed = np.flatnonzero(versions != self._seen[:n])
+            if not len(changed):
+                return 0
+            old = self._values[changed]
+            new = self._factor_rows(changed, cols)
+            old_ok, new_ok = ~np.isnan(old), ~np.isnan(new)
+            self._count += new_ok.sum(axis=0) - old_ok.sum(axis=0)
+            self._sum += np.where(new_ok, new, 0.0).sum(axis=0) - np.where(old_ok, old, 0.0).sum(axis=0)
+            self._sumsq += np.where(new_ok, new * new, 0.0).sum(axis=0) - np.where(old_ok, old * old, 0.0).sum(axis=0)
+            self._values[changed] = new
+            self._seen[changed] = versions[changed]
+            return len(changed)
+
+    def scores(self, symbols: list[str] | None = None) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """(symbols, score, per-factor signed z matrix); NaN score = too little data to rank."""
+        with self._lock:
+            names = list(self.table.symbols[:len(self._values)])
+            values = self._values.copy()
+            count, total, sumsq = self._count.copy(), self._sum.copy(), self._sumsq.copy()
+        if symbols is not None:
+            rows = [self.table.index[s] for s in symbols if s in self.table.index and self.table.index[s] < len(values)]
+            names = [names[r] for r in rows]
+            values = values[rows]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            std = np.sqrt(np.maximum(sumsq / count - mean * mean, 0.0))
+            z = np.clip((values - mean) / np.where(std > 0, std, np.nan), -Z_CLIP, Z_CLIP) * self.sign
+            have = ~np.isnan(z)
+            w = np.where(have, self.weights, 0.0)
+            score = np.where(have, z, 0.0) @ self.weights / w.sum(axis=1)
+        score[(have & (self.weights > 0)).sum(axis=1) < MIN_FACTORS] = np.nan
+        return names, score, z
+
+    def top(self, n: int = 3, symbols: list[str] | None = None) -> list[tuple[str, float, dict[str, float]]]:
+        """Best n as (symbol, score, {factor: signed z}) among symbols (default: every row)."""
+        names, score, z = self.scores(symbols)
+        order = [i for i in np.argsort(-score, kind="stable") if not np.isnan(score[i])][:n]
+        return [(names[i], float(score[i]),
+                 {f: float(z[i, j]) for j, f in enumerate(self.factors) if not np.isnan(z[i, j])})
+                for i in order]
@@ -0,0 +1,312 @@
+"""
+screener.py - Columnar fundamentals table + vectorized screens for w_share_main
+
+FundamentalsTable keeps the fields StockApp.fetch_stock_data already extracts as one
+float64 NumPy column per field (NaN = not available), one row per symbol. Upserts are
+O(1), so every fetch keeps the table current.
+
+A screen is a small expression over column names, e.g.
+
+    pe < 15 and div_yield > 4 and from_low < 10
+
+It is parsed with ast and only names, numbers, comparisons, and/or/not and + - * / are
+allowed. It is then compiled into NumPy predicates over whole columns, so a screen costs a
+handful of array operations whatever the number of symbols. A comparison against a
+missing value (NaN) is False, so incomplete rows simply don't match.
+
+ScreenerWindow shows the result in a ttk.Treeview; click a heading to sort by it.
+"""
+
+from __future__ import annotations
+
+import ast
+import operator
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Optional
+
+import numpy as np
+
+
+# ----------------------------- Tunable Constants -----------------------------
+# column -> fetch_stock_data key (values are parsed to float; 'N/A' becomes NaN)
+SOURCE_FIELDS = {
+    "price": "Current Price",
+    "change": "Daily Change (%)",
+    "mcap": "Market Cap (Billion)",   # listing currency
+    "pe": "P/E Ratio",
+    "fpe": "Forward P/E",
+    "div_yield": "Dividend Yield (%)",
+    "high52": "52-Week High",
+    "low52": "52-Week Low",
+    "target": "Average Analyst Price Target",
+    "rec": "Recommendation Mean",
+}
+# Columns filled from other sources via FundamentalsTable.set_field (e.g. local price history)
+EXTRA_FIELDS = {
+    "mom": "6-month price return (%)",
+    "rsi": "14-day RSI",
+    "sma50_gap": "% above the 50-day SMA",
+}
+# Derived columns, computed vectorized from the source columns at screen time
+DERIVED_FIELDS = {
+    "from_low": "% above 52-week low",
+    "from_high": "% below 52-week high",
+    "upside": "% upside to analyst target",
+}
+DISPLAY_COLUMNS = ("price", "change", "pe", "fpe", "div_yield", "mcap", "from_low", "from_high", "upside", "rec", "rsi")
+DEFAULT_SCREEN = "pe < 15 and div_yield > 4 and from_low < 10"
+INITIAL_CAPACITY = 64
+
+
+def to_float(value) -> float:
+    """fetch_stock_data value -> float (NaN for 'N/A', None, or anything unparsable)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class FundamentalsTable:
+    """symbol x field float64 columns, grown by doubling; rows are never moved once assigned.
+
+    Upserts may come from fetch worker threads; they and columns() serialize on one lock.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._lock = threading.Lock()
+        self.symbols: list[str] = []
+        self.index: dict[str, int] = {}
+        self.updated = np.zeros(capacity)   # time.time() of each row's last upsert
+        self.row_version = np.zeros(capacity, dtype=np.int64)  # self.version at each row's last change
+        self._cols = {name: np.full(capacity, np.nan) for name in list(SOURCE_FIELDS) + list(EXTRA_FIELDS)}
+        self.version = 0                    # bumps on every upsert (lets consumers cache)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def upsert(self, symbol: str, stock_data: dict) -> int:
+        """Store one fetch_stock_data result; returns the symbol's row."""
+        values = {name: to_float(stock_data.get(key)) for name, key in SOURCE_FIELDS.items()}
+        with self._lock:
+            row = self._row(symbol)
+            for name, value in values.items():
+                self._cols[name][row] = value
+            self.updated[row] = time.time()
+            self.version += 1
+            self.row_version[row] = self.version
+        return row
+
+    def set_field(self, symbol: str, name: str, value) -> int:
+        """Set one EXTRA_FIELDS value for symbol (adds the row if needed); returns the row."""
+        if name not in EXTRA_FIELDS:
+            raise KeyError(name)
+        with self._lock:
+            row = self._row(symbol)
+            self._cols[name][row] = to_float(value)
+            self.updated[row] = time.time()
+            self.version += 1
+            self.row_version[row] = self.version
+        return row
+
+    def _row(self, symbol: str) -> int:
+        """Row for symbol, appending one if new (caller holds the lock)."""
+        row = self.index.get(symbol)
+        if row is None:
+            row = len(self.symbols)
+            if row == len(self.updated):
+                self._grow()
+            self.symbols.append(symbol)
+            self.index[symbol] = row
+        return row
+
+    def _grow(self):
+        cap = 2 * len(self.updated)
+        self.updated = np.concatenate([self.updated, np.zeros(cap - len(self.updated))])
+        self.row_version = np.concatenate([self.row_version, np.zeros(cap - len(self.row_version), dtype=np.int64)])
+        for name, col in self._cols.items():
+            self._cols[name] = np.concatenate([col, np.full(cap - len(col), np.nan)])
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Source + derived columns, each of length len(self) (source columns are views)."""
+        with self._lock:
+            n = len(self.symbols)
+            cols = {name: col[:n] for name, col in self._cols.items()}
+        return self._derive(cols)
+
+    def snapshot(self) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """(row_version, columns) copied together under the lock, so each version matches its values."""
+        with self._lock:
+            n = len(self.symbols)
+            versions = self.row_version[:n].copy()
+            cols = {name: col[:n].copy() for name, col in self._cols.items()}
+        return versions, self._derive(cols)
+
+    @staticmethod
+    def _derive(cols: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        price = cols["price"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cols["from_low"] = (price / cols["low52"] - 1.0) * 100.0
+            cols["from_high"] = (1.0 - price / cols["high52"]) * 100.0
+            cols["upside"] = (cols["target"] / price - 1.0) * 100.0
+        return cols
+
+
+# ----------------------------- Screen expressions -----------------------------
+_COMPARE = {ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+            ast.Eq: operator.eq, ast.NotEq: operator.ne}
+_ARITH = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+
+def compile_screen(expr: str) -> Callable[[dict[str, np.ndarray]], np.ndarray]:
+    """Expression -> function(columns) -> boolean mask. Raises ValueError on anything not allowed."""
+    try:
+        tree = ast.parse(expr.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Syntax error in screen: {e.msg}") from None
+    known = set(SOURCE_FIELDS) | set(EXTRA_FIELDS) | set(DERIVED_FIELDS)
+
+    def build(node):
+        if isinstance(node, ast.BoolOp):
+            parts = [build(v) for v in node.values]
+            op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda c: _reduce(op, [p(c) for p in parts])
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            inner = build(node.operand)
+            return lambda c: np.logical_not(inner(c))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            inner = build(node.operand)
+            return lambda c: -inner(c)
+        if isinstance(node, ast.Compare):
+            terms = [build(node.left)] + [build(n) for n in node.comparators]
+            ops = [_COMPARE[type(o)] for o in node.ops if type(o) in _COMPARE]
+            if len(ops) != len(node.ops):
+                raise ValueError("Only < <= > >= == != comparisons are allowed")
+            return lambda c: _reduce(np.logical_and, [op(terms[i](c), terms[i + 1](c)) for i, op in enumerate(ops)])
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITH:
+            left, right, op = build(node.left), build(node.right), _ARITH[type(node.op)]
+            return lambda c: op(left(c), right(c))
+        if isinstance(node, ast.Name):
+            if node.id not in known:
+                raise ValueError(f"Unknown field '{node.id}'. Fields: {', '.join(sorted(known))}")
+            return lambda c: c[node.id]
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = float(node.value)
+            return lambda c: value
+        raise ValueError(f"Not allowed in a screen: {ast.unparse(node)}")
+
+    fn = build(tree)
+
+    def run(cols: dict[str, np.ndarray]) -> np.ndarray:
+        n = len(next(iter(cols.values()))) if cols else 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mask = np.broadcast_to(np.asarray(fn(cols)), (n,))
+        if mask.dtype != bool:
+            raise ValueError("A screen must be a condition, e.g. 'pe < 15'")
+        return mask
+
+    return run
+
+
+def _reduce(op, arrays):
+    out = arrays[0]
+    for a in arrays[1:]:
+        out = op(out, a)
+    return out
+
+
+def screen(table: FundamentalsTable, expr: str, sort_by: Optional[str] = None,
+           descending: bool = False) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Row indices matching expr (optionally sorted, NaN last) plus the columns they index."""
+    cols = table.columns()
+    rows = np.flatnonzero(compile_screen(expr)(cols)) if expr.strip() else np.arange(len(table))
+    if sort_by:
+        key = cols[sort_by][rows]
+        order = np.argsort(-key if descending else key, kind="stable")  # NaN sorts last either way
+        rows = rows[order]
+    return rows, cols
+
+
+# ----------------------------- UI -----------------------------
+class ScreenerWindow:
+    """Expression entry + sortable results table over a FundamentalsTable."""
+
+    def __init__(self, master: tk.Misc, table: FundamentalsTable, on_open: Optional[Callable[[str], None]] = None):
+        self.table = table
+        self.on_open = on_open
+        self.sort_by: Optional[str] = None
+        self.descending = False
+
+        self.top = tk.Toplevel(master)
+        self.top.title("Stock Screener")
+        self.top.geometry("980x460")
+
+        bar = tk.Frame(self.top)
+        bar.pack(side="top", fill="x", padx=6, pady=4)
+        tk.Label(bar, text="Screen:").pack(side="left")
+        self.expr = tk.Entry(bar, width=60, font=("Consolas", 10))
+        self.expr.insert(0, DEFAULT_SCREEN)
+        self.expr.pack(side="left", padx=4, fill="x", expand=True)
+        self.expr.bind("<Return>", lambda _e: self.refresh())
+        tk.Button(bar, text="Run", command=self.refresh).pack(side="left", padx=2)
+        tk.Button(bar, text="Clear", command=lambda: (self.expr.delete(0, tk.END), self.refresh())).pack(side="left", padx=2)
+
+        fields = ", ".join(list(SOURCE_FIELDS) + list(EXTRA_FIELDS) + list(DERIVED_FIELDS))
+        tk.Label(self.top, text=f"Fields: {fields}   (and / or / not, + - * /)", anchor="w",
+                 font=("Arial", 8), fg="#555555").pack(side="top", fill="x", padx=8)
+
+        frame = tk.Frame(self.top)
+        frame.pack(fill="both", expand=True, padx=6, pady=4)
+        columns = ("symbol",) + DISPLAY_COLUMNS
+        self.tree = ttk.Treeview(frame, columns=columns, show="headings")
+        for col in columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort(c))
+            self.tree.column(col, width=90 if col == "symbol" else 80, anchor="w" if col == "symbol" else "e")
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+        self.tree.bind("<Double-1>", self._open_selected)
+
+        self.status = tk.Label(self.top, text="", anchor="w", font=("Arial", 8))
+        self.status.pack(side="bottom", fill="x", padx=6)
+
+    def alive(self) -> bool:
+        try:
+            return bool(self.top.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def sort(self, column: str):
+        if column == "symbol":
+            return
+        self.descending = not self.descending if self.sort_by == column else column in ("div_yield", "upside", "change")
+        self.sort_by = column
+        self.refresh()
+
+    def refresh(self, loading: Optional[str] = None):
+        """Re-run the screen over the table's current contents and repaint the results."""
+        t0 = time.perf_counter()
+        try:
+            rows, cols = screen(self.table, self.expr.get(), self.sort_by, self.descending)
+        except ValueError as e:
+            self.status.config(text=str(e), fg="#c00000")
+            return
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        self.tree.delete(*self.tree.get_children())
+        shown = np.column_stack([cols[c][rows] for c in DISPLAY_COLUMNS]) if len(rows) else np.empty((0, 0))
+        for sym_row, values in zip(rows, shown):
+            self.tree.insert("", "end", values=[self.table.symbols[sym_row]] +
+                             ["" if np.isnan(v) else f"{v:,.2f}" for v in values])
+        text = f"{len(rows)} of {len(self.table)} symbols matched in {elapsed_ms:.2f} ms"
+        if loading:
+            text += f"   ({loading})"
+        self.status.config(text=text, fg="#000000")
+
+    def _open_selected(self, _event):
+        sel = self.tree.selection()
+        if sel and self.on_open:
+            self.on_open(str(self.tree.item(sel[0], "values")[0]))
@@ -0,0 +1,166 @@
+"""
+shard_fetch.py - Optional process-pool quote fetching for very large tickerV3 universes
+
+With thousands of symbols, parsing yf.download frames is CPU-bound. In-process it runs
+under the GIL on one core, competing with the Tk thread. ShardPool moves the whole
+download + parse of each shard (one tickerV3 chunk) into worker processes:
+
+- The parent allocates one shared-memory block per cycle: float64 rows of
+  (price, change %) for every symbol in the cycle, NaN = no data.
+- Each worker downloads its shard, reduces the frame to its Close/Open matrices, finds
+  each column's last and previous valid close with array ops, and writes its rows straight
+  into the block at the shard's offset. Only a (rows with data, seconds) tuple is pickled
+  back.
+- The parent just reads its slice of the block and merges it into the quote board.
+
+Worker functions live here, not in tickerV3, so they pickle by reference to a small importable
+module. The pool uses the spawn start method (the parent has Tk and asyncio threads, which fork
+would copy mid-flight), so scripts using it need the usual `if __name__ == "__main__"` guard. Each worker gets an equal share of
+market_data's request rate limit, so N processes don't multiply the load on Yahoo.
+
+Prices match tickerV3.compute_quote_from_history: last close and % change vs the previous
+close, both rounded to 2 dp, falling back to the first open and then 0.0.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+import market_data
+
+
+# ----------------------------- Tunable Constants -----------------------------
+DEFAULT_PROCESSES = max(1, min(4, (os.cpu_count() or 2) - 1))
+ROW_FIELDS = 2              # price, change %
+
+
+# ----------------------------- Worker side -----------------------------
+def _init_worker(rate_share: float):
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s shard %(process)d] %(levelname)s: %(message)s",
+                        datefmt="%H:%M:%S")
+    market_data.set_rate_limit(market_data.RATE_LIMIT_PER_SEC * rate_share,
+                               max(1, int(market_data.RATE_LIMIT_BURST * rate_share)))
+
+
+def quote_arrays(batch_df, symbols: list[str]) -> np.ndarray:
+    """(len(symbols), 2) float64 [price, change %] from a group_by='ticker' frame; NaN rows = no data."""
+    import pandas as pd
+    out = np.full((len(symbols), ROW_FIELDS), np.nan)
+    if batch_df is None or batch_df.empty:
+        return out
+    if isinstance(batch_df.columns, pd.MultiIndex):
+        pos = {sym: i for i, sym in enumerate(symbols)}
+        cols = [sym for sym in dict.fromkeys(batch_df.columns.get_level_values(0)) if sym in pos]
+        if not cols:
+            return out
+        fields = set(batch_df.columns.get_level_values(1))
+
+        def field(name):
+            if name not in fields:
+                return np.full((len(batch_df), len(cols)), np.nan)
+            return batch_df.xs(name, axis=1, level=1).reindex(columns=cols).to_numpy(dtype=np.float64, na_value=np.nan)
+        rows = np.array([pos[sym] for sym in cols])
+    elif len(symbols) == 1:
+        def field(name):
+            if name not in batch_df.columns:
+                return np.full((len(batch_df), 1), np.nan)
+            return batch_df[name].to_numpy(dtype=np.float64, na_value=np.nan).reshape(-1, 1)
+        rows = np.array([0])
+    else:
+        return out
+
+    close, open_ = field("Close"), field("Open")
+    t = np.arange(len(close))[:, None]
+    valid = ~np.isnan(close)
+    has = valid.any(axis=0)
+    last = np.where(valid, t, -1).max(axis=0)
+    prev_idx = np.where(valid & (t < last), t, -1).max(axis=0)
+    k = np.arange(close.shape[1])
+    price = np.round(close[np.maximum(last, 0), k], 2)
+    prev = np.where(prev_idx >= 0, close[np.maximum(prev_idx, 0), k], np.nan)
+    # open of the first row that has any data for the symbol (compute_quote_from_history's fallback)
+    any_data = valid | ~np.isnan(open_)
+    first = np.where(any_data, t, len(close)).min(axis=0)
+    first_open = open_[np.minimum(first, len(close) - 1), k]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change = np.where((prev_idx >= 0) & (prev != 0), np.round((price - prev) / prev * 100.0, 2),
+                          np.where(~np.isnan(first_open) & (first_open != 0),
+                                   np.round((price - first_open) / first_open * 100.0, 2), 0.0))
+    out[rows[has], 0] = price[has]
+    out[rows[has], 1] = change[has]
+    return out
+
+
+def fetch_shard(symbols: list[str], shm_name: str, offset: int, timeout: float) -> tuple[int, float]:
+    """Worker: download + parse one shard into rows [offset, offset + len(symbols)) of the block."""
+    t0 = time.monotonic()
+    batch_df = market_data.download(symbols, period="5d", progress=False, group_by="ticker",
+                                    timeout=timeout, auto_adjust=False, threads=False)
+    rows = quote_arrays(batch_df, symbols)
+    try:
+        shm = shared_memory.SharedMemory(name=shm_name)  # spawned workers share the parent's resource tracker
+    except FileNotFoundError:
+        return 0, time.monotonic() - t0  # the parent abandoned this cycle
+    try:
+        board = np.ndarray((offset + len(symbols), ROW_FIELDS), dtype=np.float64, buffer=shm.buf)
+        board[offset:offset + len(symbols)] = rows
+        del board
+    finally:
+        shm.close()
+    return int((~np.isnan(rows[:, 0])).sum()), time.monotonic() - t0
+
+
+# ----------------------------- Parent side -----------------------------
+class QuoteBlock:
+    """One cycle's shared (symbols x [price, change]) block; read slices as shards finish."""
+
+    def __init__(self, n: int):
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, n) * ROW_FIELDS * 8)
+        self.board = np.ndarray((max(1, n), ROW_FIELDS), dtype=np.float64, buffer=self.shm.buf)
+        self.board[:] = np.nan
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def read(self, symbols: list[str], offset: int) -> dict[str, tuple[float, Optional[float]]]:
+        rows = self.board[offset:offset + len(symbols)]
+        return {s: (float(p), float(c)) for s, (p, c) in zip(symbols, rows.tolist()) if p == p}
+
+    def release(self):
+        del self.board
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ShardPool:
+    """Spawned worker processes for fetch_shard; created on first use, shut down with close()."""
+
+    def __init__(self, processes: int = DEFAULT_PROCESSES):
+        self.processes = max(1, int(processes))
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=mp.get_context("spawn"),
+                                             initializer=_init_worker, initargs=(1.0 / self.processes,))
+        return self._pool
+
+    def submit(self, symbols: list[str], block: QuoteBlock, offset: int, timeout: float) -> Future:
+        return self._get().submit(fetch_shard, symbols, block.name, offset, timeout)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
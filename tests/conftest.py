@@ -0,0 +1,6 @@
+"""Offline tests for the pure cores of the shared modules (no network, no display)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+
+import alerts
+
+
+def quote(symbol, price, change=None, stale=False):
+    return SimpleNamespace(symbol=symbol, price=price, change_pct=change, stale=stale)
+
+
+def fired(engine, *quotes):
+    return [a.rule.text for a in engine.check(quotes)]
+
+
+def test_parse_rule_grammar():
+    assert alerts.parse_rule("spk.nz below 4.50") == alerts.Rule("spk.nz below 4.50", "SPK.NZ", "below", 4.5)
+    assert alerts.parse_rule("NVDA above $150").kind == "above"
+    assert alerts.parse_rule("any .NZ symbol moves more than 3%").scope == ".NZ"
+    assert alerts.parse_rule("any symbol moves 5").scope == "*"
+    for bad in ("any symbol above 5", "NVDA sideways 3", "below 4"):
+        with pytest.raises(ValueError):
+            alerts.parse_rule(bad)
+
+
+def test_levels_bisect_crossings():
+    levels = alerts.Levels()
+    for text in ("X above 10", "X above 20", "X above 30"):
+        levels.add(alerts.parse_rule(text))
+    assert [r.level for r in levels.crossed_up(15, 30)] == [20, 30]
+    assert [r.level for r in levels.crossed_up(None, 20)] == [10, 20]
+    assert levels.crossed_up(30, 40) == []
+    assert [r.level for r in levels.crossed_down(25, 10)] == [10, 20]
+    assert [r.level for r in levels.crossed_down(None, 25)] == [30]
+    assert levels.remove(alerts.parse_rule("X above 20")) and levels.levels == [10, 30]
+
+
+def test_level_rules_are_edge_triggered_and_re_arm():
+    engine = alerts.AlertEngine(["SPK.NZ below 4.50", "SPK.NZ above 5"])
+    assert fired(engine, quote("SPK.NZ", 4.40)) == ["SPK.NZ below 4.50"]     # first price already past
+    assert fired(engine, quote("SPK.NZ", 4.30)) == []                        # still below: no repeat
+    assert fired(engine, quote("SPK.NZ", 4.30, stale=True)) == []
+    assert fired(engine, quote("SPK.NZ", 4.80)) == []                        # back above: re-armed
+    assert fired(engine, quote("SPK.NZ", 4.50)) == ["SPK.NZ below 4.50"]
+    assert fired(engine, quote("SPK.NZ", 5.20)) == ["SPK.NZ above 5"]
+
+
+def test_move_rules_merge_scopes_per_symbol():
+    engine = alerts.AlertEngine(["any .NZ symbol moves more than 3%", "any symbol moves more than 5%",
+                                 "FPH.NZ moves more than 2%"])
+    assert fired(engine, quote("FPH.NZ", 30.0, -2.5)) == ["FPH.NZ moves more than 2%"]
+    assert sorted(fired(engine, quote("FPH.NZ", 29.0, -6.0))) == [
+        "any .NZ symbol moves more than 3%", "any symbol moves more than 5%"]
+    assert fired(engine, quote("AAPL", 200.0, 4.0)) == []
+    assert fired(engine, quote("AIR.NZ", 0.6, 3.5)) == ["any .NZ symbol moves more than 3%"]
+    engine.remove_rule(engine.rules[0])
+    assert fired(engine, quote("AIR.NZ", 0.6, 1.0), quote("AIR.NZ", 0.6, 4.0)) == []
+
+
+def test_hooks_receive_alerts_and_failures_are_contained():
+    seen = []
+    engine = alerts.AlertEngine(["X above 1"], hooks=[lambda a: 1 / 0, seen.append])
+    engine.check([quote("X", 2.0)])
+    assert [a.message for a in seen] == ["X at 2.00: X above 1"]
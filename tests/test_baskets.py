@@ -0,0 +1,72 @@
+import random
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import baskets
+
+
+def quote(symbol, price, prev=None):
+    change = None if prev is None else (price / prev - 1.0) * 100.0
+    return SimpleNamespace(symbol=symbol, price=price, change_pct=change)
+
+
+def weights(basket):
+    return basket.units * basket.price / basket.level
+
+
+def test_incremental_levels_match_a_full_recompute():
+    rng = random.Random(7)
+    syms = ["A", "B", "C", "D", "E"]
+    basket = baskets.Basket("T", syms, rebalance="daily")
+    book = baskets.BasketBook([basket])
+    prev = {s: rng.uniform(5, 50) for s in syms}
+    book.apply([quote(s, prev[s] * 1.01, prev[s]) for s in syms])
+    assert basket.rebalance()
+    assert basket.level == pytest.approx(baskets.BASE_LEVEL)
+    for step in range(500):
+        sym = rng.choice(syms)
+        if step % 100 == 99:
+            prev[sym] = rng.uniform(5, 50)      # a new session's previous close
+        book.apply([quote(sym, prev[sym] * rng.uniform(0.9, 1.1), prev[sym])])
+        assert basket.level == pytest.approx(float(np.sum(basket.units * basket.price)))
+        assert basket.prev_level == pytest.approx(float(np.sum(basket.units * basket.prev)))
+    assert basket.change_pct == pytest.approx((basket.level / basket.prev_level - 1.0) * 100.0)
+
+
+def test_mcap_weights_follow_the_fetched_caps():
+    basket = baskets.Basket("CAP", ["A", "B", "C"], weighting="mcap", rebalance="daily")
+    book = baskets.BasketBook([basket])
+    book.apply([quote("A", 10.0), quote("B", 20.0), quote("C", 40.0)])
+    requested = []
+    now = time.time()
+    # A new basket starts at equal weight while its caps are fetched
+    assert book.rebalance_due(now, fetch_caps=requested.append) == [basket]
+    assert requested == [basket] and weights(basket) == pytest.approx([1 / 3] * 3)
+    assert book.rebalance_due(now, fetch_caps=requested.append) == [] and len(requested) == 1
+
+    book.set_caps(basket, {"A": 300.0, "B": 100.0, "C": 0.0})   # C has no usable cap
+    assert book.rebalance_due(now + 1, fetch_caps=requested.append) == [basket]
+    assert weights(basket) == pytest.approx([0.75, 0.25, 0.0])
+    assert basket.level == pytest.approx(baskets.BASE_LEVEL)   # the level stays continuous
+
+
+def test_unpriced_basket_stays_due_until_members_are_priced():
+    basket = baskets.Basket("EQ", ["A", "B"], rebalance="monthly")
+    book = baskets.BasketBook([basket])
+    now = time.time()
+    assert book.rebalance_due(now) == []
+    assert book.due(now) == [basket]
+
+    book.apply([quote("A", 10.0)])
+    assert book.rebalance_due(now) == [basket]
+    assert basket.unpriced == {1} and basket.units[1] == 0.0 and weights(basket)[0] == pytest.approx(1.0)
+    assert book.due(now) == []
+
+    # B's first price brings the next rebalance forward instead of waiting a month
+    assert not book.apply([quote("B", 5.0)])
+    assert book.due(time.time()) == [basket]
+    assert book.rebalance_due(time.time()) == [basket]
+    assert basket.unpriced == set() and weights(basket) == pytest.approx([0.5, 0.5])
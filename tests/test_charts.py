@@ -0,0 +1,55 @@
+import numpy as np
+
+import charts
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.sin(x / 500.0)
+    y[4321] = 5.0    # a spike plain striding would step over
+    y[7777] = -5.0
+    keep = charts.lttb_indices(x, y, 200)
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep and 7777 in keep
+    dx, dy = charts.lttb(x, y, 200)
+    assert np.array_equal(dx, x[keep]) and np.array_equal(dy, y[keep])
+
+
+def test_lttb_short_series_unchanged():
+    x = np.arange(5, dtype=np.float64)
+    assert charts.lttb_indices(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+    assert charts.lttb_indices(x, x, 2).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_minmax_columns_keeps_every_columns_extremes():
+    rng = np.random.default_rng(0)
+    x = np.arange(1000, dtype=np.float64)
+    m = rng.normal(size=(1000, 3))
+    m[500:, 2] = np.nan
+    out_x, out = charts.minmax_columns(x, m, 50)
+    assert out_x.shape == (100,) and out.shape == (100, 3)
+    assert np.all(np.diff(out_x) >= 0)
+    for col in range(2):
+        assert np.nanmax(out[:, col]) == m[:, col].max()
+        assert np.nanmin(out[:, col]) == m[:, col].min()
+    assert np.nanmax(out[:, 2]) == np.nanmax(m[:, 2])
+    assert np.isnan(out[-2:, 2]).all()       # an all-NaN bucket stays NaN
+    short = m[:80]
+    assert charts.minmax_columns(x[:80], short, 50)[1] is short   # already small enough: untouched
+
+
+def test_rebase_to_100_aligns_days_and_forward_fills():
+    day = 86400
+    series = {
+        "A.NZ": (np.array([0, 1, 2, 3]) * day, np.array([10.0, 11.0, 12.0, 9.0])),
+        "B": (np.array([1, 3]) * day, np.array([50.0, 75.0])),      # misses days 0 and 2
+        "EMPTY": (np.array([], dtype=np.int64), np.array([])),
+    }
+    grid, m, symbols = charts.rebase_to_100(series)
+    assert symbols == ["A.NZ", "B"]
+    assert (grid // day).tolist() == [0, 1, 2, 3]
+    np.testing.assert_allclose(m[:, 0], [100.0, 110.0, 120.0, 90.0])
+    assert np.isnan(m[0, 1])                 # before B's first price
+    np.testing.assert_allclose(m[1:, 1], [100.0, 100.0, 150.0])
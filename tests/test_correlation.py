@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import correlation
+import history_store
+
+DAY = 86400
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)              # history_store's default root is relative ('history')
+    return history_store.HISTORY_DIR
+
+
+def write_closes(symbol, days, close):
+    bars = np.zeros(len(days), dtype=history_store.BAR_DTYPE)
+    bars["ts"] = np.asarray(days) * DAY
+    for field in ("open", "high", "low", "close"):
+        bars[field] = close
+    history_store.merge(symbol, "1d", bars)
+
+
+def reference(symbols, closes, window):
+    """np.corrcoef of the last `window` log returns (all symbols trade every day)."""
+    returns = np.diff(np.log(np.column_stack([closes[s] for s in symbols])), axis=0)[-window:]
+    return np.corrcoef(returns, rowvar=False)
+
+
+def test_matches_corrcoef_and_incremental_equals_rebuild(store, monkeypatch):
+    today = 20_000
+    monkeypatch.setattr(correlation.time, "time", lambda: (today + 1) * DAY)
+    rng = np.random.default_rng(7)
+    symbols = ["A.NZ", "B.AX", "C", "D"]
+    days = np.arange(today - 99, today - 9)
+    common = rng.normal(0, 0.01, 100)
+    closes = {s: 50.0 * np.exp(np.cumsum(common + rng.normal(0, 0.01 * (i + 1), 100)))
+              for i, s in enumerate(symbols)}
+    for s in symbols:
+        write_closes(s, days, closes[s][:90])
+
+    corr = correlation.RollingCorrelation(symbols, window=30, min_overlap=10)
+    corr.update(fetch=False)
+    _, m = corr.matrix()
+    np.testing.assert_allclose(m, reference(symbols, {s: c[:90] for s, c in closes.items()}, 30), atol=1e-12)
+
+    # Ten more days, with today's bar first written and then revised
+    for s in symbols:
+        write_closes(s, np.arange(today - 9, today), closes[s][90:99])
+        write_closes(s, [today], [closes[s][99] * 1.05])
+    corr.update(fetch=False)
+    for s in symbols:
+        write_closes(s, [today], [closes[s][99]])
+    corr.update(fetch=False)
+    _, m = corr.matrix()
+    np.testing.assert_allclose(m, reference(symbols, closes, 30), atol=1e-10)
+    assert corr.days() == 30
+
+    rebuilt = correlation.RollingCorrelation(symbols, window=30, min_overlap=10)
+    rebuilt.update(fetch=False)
+    np.testing.assert_allclose(m, rebuilt.matrix()[1], atol=1e-10)
+    top = corr.most_correlated(1, m)[0]
+    assert top[2] == pytest.approx(np.max(m[np.triu_indices(4, 1)]))
+
+
+def test_short_overlap_is_nan(store, monkeypatch):
+    monkeypatch.setattr(correlation.time, "time", lambda: 20_001 * DAY)
+    write_closes("A", np.arange(19_950, 20_000), np.linspace(10, 20, 50))
+    write_closes("B", np.arange(19_990, 20_000), np.linspace(5, 6, 10))
+    corr = correlation.RollingCorrelation(["A", "B"], window=60, min_overlap=20)
+    corr.update(fetch=False)
+    _, m = corr.matrix()
+    assert m[0, 0] == 1.0 and np.isnan(m[0, 1]) and np.isnan(m[1, 1])
@@ -0,0 +1,58 @@
+import pytest
+
+import tickerV3
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tickerV3.time, "time", clock)
+    return clock
+
+
+def retry_in(tracker, symbol, clock):
+    benched = dict(tracker.quarantined())
+    return benched[symbol].retry_at - clock.now if symbol in benched else None
+
+
+def test_quarantine_backs_off_exponentially_up_to_the_cap(clock):
+    tracker = tickerV3.FailureTracker(threshold=2, base_sec=120, max_sec=1000)
+    tracker.record_failure("BAD.NZ")
+    assert retry_in(tracker, "BAD.NZ", clock) is None       # one failure is not enough
+    assert tracker.partition(["BAD.NZ", "OK.NZ"]) == (["BAD.NZ", "OK.NZ"], [])
+
+    waits = []
+    for _ in range(5):
+        tracker.record_failure("BAD.NZ")
+        waits.append(retry_in(tracker, "BAD.NZ", clock))
+        assert tracker.partition(["BAD.NZ", "OK.NZ"]) == (["OK.NZ"], ["BAD.NZ"])
+        clock.now += waits[-1]                              # retry time reached: fetched again
+        assert tracker.partition(["BAD.NZ"]) == (["BAD.NZ"], [])
+    assert waits == [120, 240, 480, 960, 1000]
+
+
+def test_success_and_release_clear_the_quarantine(clock):
+    tracker = tickerV3.FailureTracker(threshold=2, base_sec=120, max_sec=1000)
+    for _ in range(4):
+        tracker.record_failure("BAD.NZ")
+    tracker.record_success("BAD.NZ")
+    assert tracker.quarantined() == []
+    # The count starts over: a single new failure does not bench it again
+    tracker.record_failure("BAD.NZ")
+    assert tracker.partition(["BAD.NZ"]) == (["BAD.NZ"], [])
+
+    for sym in ("A.NZ", "B.NZ"):
+        tracker.record_failure(sym)
+        tracker.record_failure(sym)
+    tracker.release("A.NZ")
+    assert [s for s, _ in tracker.quarantined()] == ["B.NZ"]
+    tracker.release()
+    assert tracker.quarantined() == []
@@ -0,0 +1,107 @@
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+import history_store
+
+
+def make_bars(ts, close):
+    bars = np.zeros(len(ts), dtype=history_store.BAR_DTYPE)
+    bars["ts"] = ts
+    for field in ("open", "high", "low", "close"):
+        bars[field] = close
+    bars["volume"] = 1.0
+    return bars
+
+
+def test_append_keeps_only_newer_bars_and_refreshes_the_tail(tmp_path):
+    root = str(tmp_path)
+    assert history_store.append("X.NZ", "1d", make_bars([100, 200, 300], [1.0, 2.0, 3.0]), root) == 3
+    # 300 is the (partial) tail bar: rewritten in place; 200 is older and ignored
+    assert history_store.append("X.NZ", "1d", make_bars([200, 300, 400], [9.0, 3.5, 4.0]), root) == 2
+    bars = history_store.read("X.NZ", "1d", root)
+    assert bars["ts"].tolist() == [100, 200, 300, 400]
+    assert bars["close"].tolist() == [1.0, 2.0, 3.5, 4.0]
+    assert history_store.last_timestamp("X.NZ", "1d", root) == 400
+
+
+def test_merge_backfills_older_bars_and_new_values_win(tmp_path):
+    root = str(tmp_path)
+    history_store.append("X.NZ", "1d", make_bars([300, 400], [3.0, 4.0]), root)
+    history_store.merge("X.NZ", "1d", make_bars([100, 200, 300], [1.0, 2.0, 30.0]), root)
+    bars = history_store.read("X.NZ", "1d", root)
+    assert bars["ts"].tolist() == [100, 200, 300, 400]
+    assert bars["close"].tolist() == [1.0, 2.0, 30.0, 4.0]
+
+
+def test_query_range_and_fields(tmp_path):
+    root = str(tmp_path)
+    ts = np.arange(10) * 86400
+    history_store.append("X.NZ", "1d", make_bars(ts, np.arange(10.0)), root)
+    bars = history_store.query("X.NZ", start=2 * 86400, end=5 * 86400, root=root)
+    assert bars["ts"].tolist() == [2 * 86400, 3 * 86400, 4 * 86400]
+    close = history_store.query("X.NZ", start=8 * 86400, fields="close", root=root)
+    assert close.dtype == np.float64 and close.tolist() == [8.0, 9.0]
+    pair = history_store.query("X.NZ", end=86400, fields=("ts", "close"), root=root)
+    assert pair.dtype.names == ("ts", "close") and len(pair) == 1
+    assert len(history_store.query("MISSING", root=root)) == 0
+
+
+def test_query_sees_writes_after_a_cached_mapping(tmp_path):
+    root = str(tmp_path)
+    history_store.append("X.NZ", "1d", make_bars([100, 200], [1.0, 2.0]), root)
+    assert len(history_store.query("X.NZ", root=root)) == 2
+    history_store.merge("X.NZ", "1d", make_bars([50], [0.5]), root)
+    history_store.append("X.NZ", "1d", make_bars([300], [3.0]), root)
+    assert history_store.query("X.NZ", root=root)["ts"].tolist() == [50, 100, 200, 300]
+
+
+def local_midnights(tz: str, start: str, days: int) -> np.ndarray:
+    import pandas as pd
+    return np.array([int(t.timestamp()) for t in pd.date_range(start, periods=days, freq="D", tz=tz)])
+
+
+def test_date_bounds_on_daily_bars_follow_the_exchange_calendar(tmp_path):
+    root = str(tmp_path)
+    # NZ bars are stamped at Auckland midnight, i.e. on the previous UTC day; US ones after UTC midnight
+    history_store.append("AIA.NZ", "1d", make_bars(local_midnights("Pacific/Auckland", "2023-12-31", 5),
+                                                   np.arange(5.0)), root)
+    history_store.append("AAPL", "1d", make_bars(local_midnights("America/New_York", "2023-12-31", 5),
+                                                 np.arange(5.0)), root)
+    for sym in ("AIA.NZ", "AAPL"):
+        bars = history_store.query(sym, "2024-01-01", "2024-01-03", root=root)
+        assert [history_store.bar_date(ts) for ts in bars["ts"]] == ["2024-01-01", "2024-01-02"], sym
+    from datetime import date
+    assert len(history_store.query("AIA.NZ", date(2024, 1, 3), root=root)) == 2
+
+
+def batch_frame(symbols: list[str], days: list[str]):
+    import pandas as pd
+    cols = pd.MultiIndex.from_product([symbols, ["Open", "High", "Low", "Close", "Volume"]])
+    return pd.DataFrame(1.0, index=pd.DatetimeIndex(days), columns=cols)
+
+
+def test_backfill_does_not_checkpoint_a_unit_missing_a_symbol(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    # Two date windows; Yahoo drops B from the one ending tomorrow although B listed in 2000
+    today = f"{datetime.now(timezone.utc):%Y-%m-%d}"
+
+    def download(chunk, start, end, **kw):
+        return batch_frame(chunk if end <= today else ["A"], [start])
+    monkeypatch.setattr(history_store.market_data, "download", download)
+    monkeypatch.setitem(history_store._first_trades, "B", 946684800)
+    assert history_store.backfill(["A", "B"], "1d", years=3, root=root) == (1, 1)
+    ckpt = json.loads((tmp_path / history_store.BACKFILL_CHECKPOINT).read_text())
+    assert len(ckpt["done"]) == 1 and ckpt["done"][0].split("|")[2] <= today
+    assert len(history_store.read("A", "1d", root)) == 2
+
+
+def test_backfill_unit_allows_symbols_not_listed_yet(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store.market_data, "download",
+                        lambda chunk, **kw: batch_frame(["A"], ["2024-01-02"]))
+    monkeypatch.setitem(history_store._first_trades, "B", 1735689600)  # 2025-01-01
+    assert history_store._backfill_unit(["A", "B"], "1d", "2024-01-01", "2025-01-01", str(tmp_path)) == 1
+    with pytest.raises(ValueError, match="B"):
+        history_store._backfill_unit(["A", "B"], "1d", "2024-01-01", "2025-01-02", str(tmp_path))
@@ -0,0 +1,77 @@
+import copy
+
+import numpy as np
+
+import indicators
+
+
+def random_bars(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    high = close * (1 + rng.uniform(0, 0.01, n))
+    low = close * (1 - rng.uniform(0, 0.01, n))
+    return high, low, close
+
+
+def flatten(v: dict) -> dict:
+    out = {}
+    for key, value in v.items():
+        if isinstance(value, tuple):
+            out.update({f"{key}{i}": x for i, x in enumerate(value)})
+        else:
+            out[key] = value
+    return out
+
+
+def assert_same(a: dict, b: dict):
+    a, b = flatten(a), flatten(b)
+    assert a.keys() == b.keys()
+    for key in a:
+        if a[key] is None or b[key] is None:
+            assert a[key] is None and b[key] is None, key
+        else:
+            assert abs(a[key] - b[key]) < 1e-9 * max(1.0, abs(a[key])), key
+
+
+def test_peek_matches_push_and_does_not_mutate():
+    high, low, close = random_bars()
+    ind = indicators.IndicatorSet()
+    for h, lo, c in zip(high, low, close):
+        before = copy.deepcopy(ind)
+        peeked = ind.peek(h, lo, c)
+        ind.peek(h * 1.1, lo * 0.9, c * 1.05)          # a forming bar revised twice
+        assert_same(ind.peek(h, lo, c), peeked)
+        assert_same(before.push(h, lo, c), peeked)
+        assert_same(ind.push(h, lo, c), peeked)
+
+
+def test_compute_matches_streaming_and_reference_formulas():
+    high, low, close = random_bars()
+    out = indicators.compute(close, high, low)
+    ind = indicators.IndicatorSet()
+    for i, (h, lo, c) in enumerate(zip(high, low, close)):
+        v = ind.push(h, lo, c)
+        if v["rsi"] is None:
+            assert np.isnan(out["rsi"][i])
+        else:
+            assert abs(out["rsi"][i] - v["rsi"]) < 1e-9
+    n = indicators.SMA_SLOW
+    sma = np.convolve(close, np.ones(n) / n, mode="valid")
+    np.testing.assert_allclose(out["sma_slow"][n - 1:], sma, rtol=1e-9)
+    assert np.isnan(out["sma_slow"][:n - 1]).all()
+    rsi = out["rsi"][~np.isnan(out["rsi"])]
+    assert len(rsi) and rsi.min() >= 0.0 and rsi.max() <= 100.0
+    band = ~np.isnan(out["boll_upper"])
+    assert np.all(out["boll_upper"][band] >= out["boll_lower"][band])
+
+
+def test_bar_feed_pushes_a_bar_only_when_its_bucket_closes():
+    high, low, close = random_bars(40)
+    feed = indicators.BarFeed()
+    ref = indicators.IndicatorSet()
+    for i, (h, lo, c) in enumerate(zip(high, low, close)):
+        feed.update(60 * i, h * 1.2, lo * 0.8, c * 1.1)      # early tick of the forming bar
+        got = feed.update(60 * i, h, lo, c)                   # its final value
+        assert_same(got, ref.peek(h, lo, c))
+        ref.push(h, lo, c)
+    assert feed.update(0, 1.0, 1.0, 1.0) is feed.ind.last     # out-of-order bar ignored
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import intraday
+
+
+def quote(symbol, price, as_of, change=None, stale=False):
+    return SimpleNamespace(symbol=symbol, price=price, change_pct=change, as_of=as_of, stale=stale)
+
+
+def ohlc(bars):
+    return [(int(b["ts"]), b["open"], b["high"], b["low"], b["close"]) for b in bars]
+
+
+def test_bars_roll_over_at_bucket_boundaries():
+    agg = intraday.BarAggregator({"1m": 60, "5m": 300})
+    t0 = 1_700_000_100      # a 5m boundary (and so a 1m one)
+    for offset, price in ((0, 10.0), (20, 12.0), (59, 9.0), (60, 11.0), (299, 13.0), (300, 8.0)):
+        agg.add_quotes([quote("X.NZ", price, t0 + offset, change=price)])
+    assert ohlc(agg.bars("X.NZ", "1m")) == [
+        (t0, 10.0, 12.0, 9.0, 9.0),
+        (t0 + 60, 11.0, 11.0, 11.0, 11.0),
+        (t0 + 240, 13.0, 13.0, 13.0, 13.0),     # no poll in minutes 2-3: no bars for them
+        (t0 + 300, 8.0, 8.0, 8.0, 8.0),
+    ]
+    assert ohlc(agg.bars("X.NZ", "5m")) == [(t0, 10.0, 13.0, 9.0, 13.0), (t0 + 300, 8.0, 8.0, 8.0, 8.0)]
+    # A late quote for a closed bucket is ignored rather than reopening it
+    agg.add("X.NZ", 50.0, t0 + 10)
+    assert agg.bars("X.NZ", "5m")[0]["high"] == 13.0
+
+
+def test_ring_keeps_the_newest_bars_once_full():
+    agg = intraday.BarAggregator({"1m": 60}, {"1m": 3})
+    t0 = 1_700_000_100
+    for i in range(5):
+        agg.add("X.NZ", float(i), t0 + 60 * i)
+    assert [b["close"] for b in agg.bars("X.NZ")] == [2.0, 3.0, 4.0]
+    assert [b["close"] for b in agg.bars("X.NZ", last=2)] == [3.0, 4.0]
+
+
+def test_repeated_closed_market_polls_leave_no_flat_bars():
+    agg = intraday.BarAggregator({"1m": 60})
+    t0 = 1_700_000_100
+    assert agg.add_quotes([quote("X.NZ", 10.0, t0, change=1.5)]) == 1
+    # Market closed: the same price and change comes back every cycle for an hour
+    for i in range(1, 60):
+        assert agg.add_quotes([quote("X.NZ", 10.0, t0 + 60 * i, change=1.5)]) == 0
+    assert len(agg.bars("X.NZ")) == 1
+    assert agg.add_quotes([quote("X.NZ", 10.0, t0 + 3600, change=0.0)]) == 1     # next session's first poll
+    assert agg.add_quotes([quote("X.NZ", 11.0, t0 + 3660, stale=True),
+                           quote("X.NZ", None, t0 + 3660)]) == 0
+    assert [int(b["ts"]) for b in agg.bars("X.NZ")] == [t0, t0 + 3600]
@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+import pytest
+
+import portfolio
+
+
+def fx_cache():
+    fx = portfolio.FxCache("NZD")
+    fx.rates.update({"USD": 1.65, "GBP": 2.10})     # cached rates; no network
+    fx.version += 1
+    return fx
+
+
+HOLDINGS = [
+    portfolio.Holding("SPK.NZ", 1000, 4.80),
+    portfolio.Holding("NVDA", 20, 95.10),
+    portfolio.Holding("NVDA", 10, 120.0),          # second lot, merged
+    portfolio.Holding("VOD.L", 500, 70.0),         # quoted in pence
+    portfolio.Holding("AIR.PA", 5, 150.0),         # EUR: no cached rate
+    portfolio.Holding("AAPL", 3),                  # unknown cost
+]
+
+
+def test_apply_deltas_end_equal_to_a_full_revalue():
+    rng = random.Random(11)
+    live = portfolio.Portfolio(HOLDINGS, fx=fx_cache())
+    board = {s: portfolio.PortfolioQuote(s, rng.uniform(2, 200), rng.uniform(-3, 3)) for s in live.symbols}
+    live.value_board(board.values())
+    for _ in range(300):
+        sym = rng.choice(live.symbols)
+        change = None if rng.random() < 0.1 else rng.uniform(-5, 5)
+        board[sym] = portfolio.PortfolioQuote(sym, rng.uniform(2, 200), change)
+        live.apply([board[sym]])
+
+    fresh = portfolio.Portfolio(HOLDINGS, fx=fx_cache())
+    fresh.price[:], fresh.prev[:] = live.price, live.prev
+    fresh.revalue()
+    for key, total in fresh.totals.items():
+        assert live.totals[key] == pytest.approx(total), key
+    for arr in ("value", "day", "pnl"):
+        np.testing.assert_allclose(getattr(live, arr), getattr(fresh, arr))
+
+
+def test_minor_units_and_fx_rates_scale_values():
+    p = portfolio.Portfolio(HOLDINGS, fx=fx_cache())
+    p.apply([portfolio.PortfolioQuote("VOD.L", 80.0, None), portfolio.PortfolioQuote("NVDA", 100.0, 0.0),
+             portfolio.PortfolioQuote("AIR.PA", 160.0, 1.0)])
+    vod, nvda, air = (p.index[s] for s in ("VOD.L", "NVDA", "AIR.PA"))
+    assert p.value[vod] == pytest.approx(500 * 80.0 * 0.01 * 2.10)
+    assert p.pnl[vod] == pytest.approx(500 * (80.0 - 70.0) * 0.01 * 2.10)
+    assert p.value[nvda] == pytest.approx(30 * 100.0 * 1.65)
+    assert p.cost[nvda] == pytest.approx((20 * 95.10 + 10 * 120.0) / 30)
+    assert np.isnan(p.value[air]) and p.totals["value"] == pytest.approx(p.value[vod] + p.value[nvda])
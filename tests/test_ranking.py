@@ -0,0 +1,43 @@
+import numpy as np
+
+import ranking
+import screener
+
+
+def full_sums(table, engine):
+    cols = table.columns()
+    values = np.column_stack([cols[f] for f in engine.factors])
+    values[:, engine.factors.index("pe")][values[:, engine.factors.index("pe")] <= 0] = np.nan
+    ok = ~np.isnan(values)
+    return ok.sum(axis=0), np.where(ok, values, 0.0).sum(axis=0)
+
+
+def test_sync_folds_every_change_even_within_one_clock_tick(monkeypatch):
+    monkeypatch.setattr(screener.time, "time", lambda: 1_700_000_000.0)   # every upsert in the same tick
+    table = screener.FundamentalsTable(capacity=2)
+    engine = ranking.RankingEngine(table, weights=ranking.DEFAULT_WEIGHTS)
+    for i in range(6):
+        table.upsert(f"S{i}", {"P/E Ratio": 10.0 + i, "Recommendation Mean": 2.0, "Dividend Yield (%)": i})
+    assert engine.sync() == 6
+    table.set_field("S1", "mom", 12.0)
+    table.upsert("S2", {"P/E Ratio": -5.0, "Recommendation Mean": 1.5})
+    table.set_field("S1", "mom", 3.0)
+    assert engine.sync() == 2
+    assert engine.sync() == 0
+    count, total = full_sums(table, engine)
+    np.testing.assert_array_equal(engine._count, count)
+    np.testing.assert_allclose(engine._sum, total)
+
+
+def test_top_prefers_better_factors():
+    table = screener.FundamentalsTable()
+    table.upsert("GOOD", {"Current Price": 10.0, "Average Analyst Price Target": 15.0, "P/E Ratio": 8.0,
+                          "Recommendation Mean": 1.5, "Dividend Yield (%)": 5.0})
+    table.upsert("MID", {"Current Price": 10.0, "Average Analyst Price Target": 11.0, "P/E Ratio": 15.0,
+                         "Recommendation Mean": 2.5, "Dividend Yield (%)": 2.0})
+    table.upsert("BAD", {"Current Price": 10.0, "Average Analyst Price Target": 9.0, "P/E Ratio": 40.0,
+                         "Recommendation Mean": 4.0, "Dividend Yield (%)": 0.0})
+    table.upsert("THIN", {"Recommendation Mean": 1.0})            # one factor: not ranked
+    engine = ranking.RankingEngine(table, weights=ranking.DEFAULT_WEIGHTS)
+    engine.sync()
+    assert [sym for sym, _, _ in engine.top(4)] == ["GOOD", "MID", "BAD"]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+import screener
+
+
+def make_table():
+    table = screener.FundamentalsTable(capacity=2)   # forces a grow
+    rows = {
+        "CHEAP.NZ": {"Current Price": 10.0, "P/E Ratio": 9.0, "Dividend Yield (%)": 6.0, "52-Week Low": 9.5},
+        "DEAR": {"Current Price": 100.0, "P/E Ratio": 40.0, "Dividend Yield (%)": 0.5, "52-Week Low": 50.0},
+        "NA.AX": {"Current Price": "N/A", "P/E Ratio": "N/A"},
+    }
+    for sym, data in rows.items():
+        table.upsert(sym, data)
+    return table
+
+
+def test_screen_filters_with_derived_columns_and_nan_fails():
+    table = make_table()
+    rows, cols = screener.screen(table, "pe < 15 and div_yield > 4 and from_low < 10")
+    assert [table.symbols[r] for r in rows] == ["CHEAP.NZ"]
+    rows, _ = screener.screen(table, "not pe < 15")
+    assert [table.symbols[r] for r in rows] == ["DEAR", "NA.AX"]   # NaN compares False, so 'not' keeps it
+    rows, _ = screener.screen(table, "", sort_by="price", descending=True)
+    assert [table.symbols[r] for r in rows] == ["DEAR", "CHEAP.NZ", "NA.AX"]
+
+
+@pytest.mark.parametrize("expr", [
+    "__import__('os').system('echo hi')",
+    "pe.__class__",
+    "price[0] > 1",
+    "[pe for pe in price]",
+    "lambda: 1",
+    "pe < 'x'",
+    "price ** 2 > 1",
+    "pe in (1, 2)",
+    "unknown_field > 1",
+    "pe < 15 if True else 0",
+])
+def test_compile_screen_rejects_anything_outside_the_whitelist(expr):
+    with pytest.raises(ValueError):
+        screener.compile_screen(expr)
+
+
+def test_compile_screen_requires_a_condition():
+    cols = {"pe": np.array([1.0, 2.0])}
+    with pytest.raises(ValueError):
+        screener.compile_screen("pe + 1")(cols)
+    with pytest.raises(ValueError):
+        screener.compile_screen("pe <")
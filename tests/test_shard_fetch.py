@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+import shard_fetch
+import tickerV3
+
+
+def batch_frame(data: dict[str, np.ndarray], index) -> pd.DataFrame:
+    """group_by='ticker' yf.download layout: (symbol, field) columns."""
+    cols = {}
+    for sym, close in data.items():
+        cols[(sym, "Open")] = close * 0.99
+        cols[(sym, "High")] = cols[(sym, "Low")] = cols[(sym, "Close")] = close
+        cols[(sym, "Volume")] = np.where(np.isnan(close), np.nan, 1000.0)
+    return pd.DataFrame(cols, index=index, columns=pd.MultiIndex.from_tuples(cols))
+
+
+def as_dict(rows: np.ndarray, symbols: list[str]) -> dict:
+    return {s: (float(p), float(c)) for s, (p, c) in zip(symbols, rows.tolist()) if p == p}
+
+
+def test_quote_arrays_matches_parse_batch():
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2025-01-06", periods=5, freq="D")
+    data = {f"S{i}.NZ": rng.uniform(1, 100, 5).round(3) for i in range(12)}
+    data["S0.NZ"][-1] = np.nan                          # last close missing: previous valid one is used
+    data["S1.NZ"][:] = np.nan                           # no data at all
+    data["S2.NZ"][:4] = np.nan                          # one bar: change vs that bar's open
+    data["S3.NZ"][1:4] = np.nan                         # gap between the two valid closes
+    data["S4.NZ"][-2] = 0.0                             # zero previous close
+    symbols = list(data) + ["NOT.IN.FRAME"]
+    frame = batch_frame(data, index)
+    rows = shard_fetch.quote_arrays(frame, symbols)
+    assert rows.shape == (len(symbols), shard_fetch.ROW_FIELDS)
+    assert as_dict(rows, symbols) == tickerV3.parse_batch(frame, symbols)
+
+
+def test_quote_arrays_single_symbol_and_empty_frames():
+    index = pd.date_range("2025-01-06", periods=3, freq="D")
+    frame = batch_frame({"AAPL": np.array([100.0, 102.0, 101.0])}, index)["AAPL"]
+    rows = shard_fetch.quote_arrays(frame, ["AAPL"])
+    assert as_dict(rows, ["AAPL"]) == tickerV3.parse_batch(frame, ["AAPL"]) == {"AAPL": (101.0, -0.98)}
+    assert np.isnan(shard_fetch.quote_arrays(pd.DataFrame(), ["A", "B"])).all()
+    assert np.isnan(shard_fetch.quote_arrays(None, ["A"])).all()
+
+
+def test_quote_block_round_trip():
+    block = shard_fetch.QuoteBlock(3)
+    try:
+        block.board[1:3] = [[10.0, 1.5], [np.nan, np.nan]]
+        assert block.read(["A", "B"], 1) == {"A": (10.0, 1.5)}
+        assert block.read(["X"], 0) == {}
+    finally:
+        block.release()
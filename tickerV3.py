@@ -26,16 +26,68 @@ Key improvements in V3:
 - Added "Reset to Defaults" menu action.
 - Initial display primes with "SYM: N/A" for all configured tickers immediately (no mysterious
   "Loading market data..." wait; prices populate on first fetch).
+- Warm start: the quote board is saved to a compact snapshot (--snapshot, shared with
+  w_share_main) every few minutes and on exit, and painted before the first fetch in gray with
+  its age, e.g. "FPH.NZ: $35.10 (+0.4%) [14h]".
 - More type hints, from __future__ annotations, minor robustness tweaks.
+- Failure quarantine: symbols that keep failing (delisted / typo in tickers.yaml) are skipped
+  with exponential backoff instead of burning batch + fallback requests every cycle. They show
+  stale (gray) or N/A on the tape and are listed under "Quarantined Symbols...".
+- Chunked batch downloads: the universe is split by exchange suffix and size (--chunk-size,
+  --chunk-by), each chunk with its own deadline + retry (--chunk-timeout), so large watchlists
+  finish in bounded time and one slow venue can't stall the whole tape. yf.download isn't
+  thread-safe, so in-process chunks run one at a time; --processes runs them in parallel.
+- Hedged requests: a single-symbol request still running past the p90 (--hedge-pct) of its
+  exchange's recent latency gets one duplicate; first usable answer wins. Capped per cycle
+  (--hedge-budget) so hedging can't double the load. Batch chunks are never hedged, since
+  yf.download runs one at a time per process.
+- asyncio fetch engine (FetchEngine) on its own loop thread: bounded concurrency, per-request
+  deadlines + cancellation and a cycle-wide budget (--cycle-budget). Exit and Refresh Now cancel
+  the cycle in flight immediately instead of waiting out a 30 s download.
+- Long-lived fetch plumbing (market_data.py): one worker pool and one keep-alive HTTP session
+  shared by every fetch path, and cached yf.Ticker objects - no per-cycle thread start-up or
+  TLS handshakes.
+- Progressive updates: each chunk / individual retry streams its quotes to the UI as soon as
+  it lands; the drain merges deltas into the board and keeps the scroll position.
+- Intraday bars (intraday.py): every fresh quote is folded into rolling 1m/5m/15m OHLC bars per
+  symbol, kept in fixed-size ring buffers (TickerTape.bars), so intraday views need no downloads.
+- Sparklines: each entry can show a tiny line of its recent cycle prices (--sparkline-width),
+  from a preallocated per-symbol NumPy ring whose coordinates are only recomputed when it
+  changes - animation cost per frame is unchanged apart from the extra canvas items.
+- RSI colouring: a streaming RSI per symbol (indicators.py, O(1) per quote) runs over the
+  intraday bars; entries turn amber when overbought and blue when oversold (--no-rsi-colours).
+- Price alerts (alerts.py, --alerts): rules like "SPK.NZ below 4.50" or "any .NZ symbol moves
+  more than 3%" are indexed in sorted per-symbol arrays and checked by bisection against every
+  delta the engine publishes. Hits go to notification hooks (log + bell + Recent Alerts by
+  default; pass alert_hook= to add your own). Add rules from the right-click menu.
+- Portfolio (portfolio.py, --holdings): positions from holdings.yaml are fetched along with the
+  tape (without being shown on it) and valued in the base currency with cached FX rates. P&L is
+  updated incrementally from each delta; right-click → Portfolio... shows the table.
+- Baskets (baskets.py, --baskets): equal / market-cap / fixed-weight baskets over tape symbols
+  appear as extra entries at the head of the tape. Each quote moves a basket level in O(1)
+  (units x price change), and weights rebalance on each basket's daily/weekly/monthly schedule.
+- Process-pool mode (shard_fetch.py, --processes N): for universes of thousands of symbols, each
+  chunk is downloaded and parsed in a worker process, which writes compact (price, change)
+  rows into a shared-memory block. The engine only merges the rows into the board, so
+  parsing no longer competes with the Tk thread for the GIL. Off by default.
+- Multi-monitor tapes (--tapes tapes.yaml): one process hosts several tape windows, each with its
+  own tickers file, dock, speed and screen position, all on one shared fetch engine (SharedFeed).
+  The engine fetches the union of their symbols once per cycle and each window only receives
+  its own quotes, so a symbol shown on two tapes is fetched once.
+- Event-driven UI: no 120 ms queue polling. The engine posts a <<TickerData>> virtual event
+  when it publishes; bursts of deltas and add/remove renders coalesce into one render per frame.
 - All V2 strengths preserved: queue+thread safety, efficient move-only animation (no churn),
   batch+parallel fallback, stale data resilience, hover-to-pause, argparse overrides, etc.
 
 Usage:
   python tickerV3.py
   python tickerV3.py --dock bottom --speed 1.5 --config tickers.yaml --interval 45
+  python tickerV3.py --tapes tapes.yaml
 
-Requirements: yfinance pandas pyyaml (tkinter stdlib)
-  pip install yfinance pyyaml pandas
+Requirements: yfinance pandas numpy pyyaml (tkinter stdlib); market_data.py, history_store.py,
+  intraday.py, indicators.py, alerts.py, portfolio.py, baskets.py and shard_fetch.py alongside
+  this script
+  pip install yfinance pyyaml pandas numpy
 
 V2 and original w_ticker.py are left unchanged.
 """
@@ -43,19 +95,32 @@ V2 and original w_ticker.py are left unchanged.
 from __future__ import annotations
 
 import argparse
+import asyncio
 import logging
+import math
 import os
 import queue
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass
 from tkinter import simpledialog, messagebox
 import tkinter as tk
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 
 import pandas as pd
 import yaml
-import yfinance as yf
+
+import alerts
+import baskets
+import indicators
+import intraday
+import market_data
+import portfolio
+import shard_fetch
+
+
+T = TypeVar("T")
 
 
 # ----------------------------- Logging -----------------------------
@@ -81,8 +146,34 @@ RED = "#ff6666"
 GRAY = "#888888"
 WHITE = "#cccccc"
 LOADING_COLOR = "#ffcc66"
+DATA_EVENT = "<<TickerData>>"   # posted by the fetch engine when new quotes are queued
 SEPARATOR = "•"
 BOTTOM_TASKBAR_MARGIN = 40  # helps avoid Windows taskbar on bottom dock
+SNAPSHOT_INTERVAL_SEC = 300     # also save the quote board this often while running (and on exit)
+QUARANTINE_AFTER_FAILURES = 2   # consecutive failed cycles before a symbol is benched
+QUARANTINE_BASE_SEC = 120       # first quarantine period; doubles on every further failure
+QUARANTINE_MAX_SEC = 6 * 3600   # cap so a fixed symbol is picked up again the same day
+CHUNK_SIZE = 50             # max symbols per yf.download request
+CHUNK_BY = "exchange"       # "exchange": group by suffix (.NZ, .AX, US, ^index) then size; "size": size only
+CHUNK_WORKERS = 4           # chunks in flight at once in process-pool mode (in-process: one, see market_data.download)
+CHUNK_TIMEOUT_SEC = 25.0    # wall-clock deadline per chunk, including its retry
+CHUNK_RETRIES = 1
+SYMBOL_TIMEOUT_SEC = 15.0   # deadline for one single-symbol fallback request
+CYCLE_BUDGET_SEC = 45.0     # hard cap on a whole fetch cycle; whatever hasn't arrived stays stale
+STOP_JOIN_SEC = 2.0         # on exit, wait this long for the engine loop before shutting the pool down
+MAX_INFLIGHT = market_data.FETCH_WORKERS  # concurrent requests awaited by the engine
+HEDGE_PERCENTILE = 90.0     # duplicate a per-symbol request still running past this latency percentile (0 = off)
+HEDGE_BUDGET = 0.10         # hedges per cycle as a fraction of primary requests (never all of them)
+HEDGE_MIN_DELAY_SEC = 1.0   # don't hedge requests that are merely "not instant"
+LATENCY_WINDOW = 64         # recent samples kept per (exchange, kind)
+LATENCY_MIN_SAMPLES = 8     # no hedging for an exchange until we know what normal looks like
+SPARKLINE_WIDTH = 48        # px per tape sparkline (0 = off); shows the last intraday.SPARK_POINTS cycles
+SPARKLINE_HEIGHT = 14       # px, vertically centred on the tape
+SPARKLINE_GAP = 6           # px between an entry's text and its sparkline
+RSI_TIMEFRAME = "1m"        # intraday bars the tape RSI runs on (one per 60 s cycle while the price moves, none when shut)
+OVERBOUGHT_COLOR = "#ffd166"    # RSI >= indicators.RSI_OVERBOUGHT
+OVERSOLD_COLOR = "#66ccff"      # RSI <= indicators.RSI_OVERSOLD
+RECENT_ALERTS = 50          # fired alerts kept for the Recent Alerts dialog
 
 
 @dataclass
@@ -91,6 +182,652 @@ class Quote:
     symbol: str
     price: Optional[float]
     change_pct: Optional[float]
+    stale: bool = False     # last-known value carried over (failed / quarantined / warm start)
+    as_of: Optional[float] = None   # epoch seconds the price was observed
+
+
+@dataclass
+class SymbolHealth:
+    """Consecutive-failure bookkeeping for one symbol."""
+    failures: int = 0
+    retry_at: float = 0.0   # epoch seconds; 0 = not quarantined
+    last_error: str = ""
+
+
+def exchange_of(symbol: str) -> str:
+    """Rough listing venue from the Yahoo symbol: 'NZ', 'AX', 'INDEX', 'FX', or 'US' (no suffix)."""
+    if symbol.startswith("^"):
+        return "INDEX"
+    if symbol.endswith("=X"):
+        return "FX"
+    if "." in symbol:
+        return symbol.rsplit(".", 1)[1]
+    return "US"
+
+
+def chunk_symbols(symbols: list[str], size: int = CHUNK_SIZE, by: str = CHUNK_BY) -> list[list[str]]:
+    """Split symbols into download chunks of at most `size`, optionally grouped by exchange first."""
+    size = max(1, int(size))
+    if by == "exchange":
+        groups: dict[str, list[str]] = {}
+        for s in symbols:
+            groups.setdefault(exchange_of(s), []).append(s)
+        ordered = list(groups.values())
+    else:
+        ordered = [list(symbols)]
+    return [g[i:i + size] for g in ordered for i in range(0, len(g), size)]
+
+
+def chunk_exchange(symbols: list[str]) -> str:
+    """Exchange key for a chunk: its single exchange, or 'MIXED' for size-only chunks."""
+    venues = {exchange_of(s) for s in symbols}
+    return venues.pop() if len(venues) == 1 else "MIXED"
+
+
+class LatencyStats:
+    """Rolling request latencies per (exchange, kind) with cheap percentile lookups.
+
+    kind is "chunk" (batch download attempt) or "symbol" (single-symbol history call); the
+    two have very different normal latencies, so they are tracked separately.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = LATENCY_MIN_SAMPLES):
+        self.window = int(window)
+        self.min_samples = int(min_samples)
+        self._samples: dict[tuple[str, str], deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, exchange: str, kind: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault((exchange, kind), deque(maxlen=self.window)).append(float(seconds))
+
+    def percentile(self, exchange: str, kind: str, pct: float) -> float | None:
+        """pct-th percentile of recent latency, or None while there are too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get((exchange, kind), ()))
+        if len(samples) < self.min_samples:
+            return None
+        idx = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[idx]
+
+    def summary(self) -> list[tuple[str, str, int, float, float]]:
+        """(exchange, kind, n, p50, p90) rows for display."""
+        with self._lock:
+            items = {k: sorted(v) for k, v in self._samples.items() if v}
+        rows = []
+        for (ex, kind), v in sorted(items.items()):
+            rows.append((ex, kind, len(v), v[(len(v) - 1) // 2], v[int(round(0.9 * (len(v) - 1)))]))
+        return rows
+
+
+class HedgeBudget:
+    """Per-cycle cap on duplicate requests: at most ceil(fraction * primaries), and always
+    fewer hedges than primaries, so hedging can never double the load."""
+
+    def __init__(self, fraction: float = HEDGE_BUDGET):
+        self.fraction = max(0.0, float(fraction))
+        self.primaries = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def add_primary(self):
+        with self._lock:
+            self.primaries += 1
+
+    def take(self) -> bool:
+        with self._lock:
+            allowed = min(self.primaries - 1, math.ceil(self.fraction * self.primaries))
+            if self.hedges < allowed:
+                self.hedges += 1
+                return True
+            return False
+
+
+class FailureTracker:
+    """Per-symbol failure tracking with exponential backoff quarantine.
+
+    Symbols that come back empty from both the batch download and the individual
+    fallback are counted as failed for that cycle. After QUARANTINE_AFTER_FAILURES
+    consecutive failures the symbol is skipped until ``retry_at``; every further
+    failed retry doubles the wait (capped at QUARANTINE_MAX_SEC). One success clears it.
+    Shared between the fetch thread and the Tk thread, hence the lock.
+    """
+
+    def __init__(
+        self,
+        threshold: int = QUARANTINE_AFTER_FAILURES,
+        base_sec: float = QUARANTINE_BASE_SEC,
+        max_sec: float = QUARANTINE_MAX_SEC,
+    ):
+        self.threshold = max(1, int(threshold))
+        self.base_sec = float(base_sec)
+        self.max_sec = float(max_sec)
+        self._health: dict[str, SymbolHealth] = {}
+        self._lock = threading.Lock()
+
+    def partition(self, symbols: list[str], now: float | None = None) -> tuple[list[str], list[str]]:
+        """Split symbols into (to_fetch, quarantined) preserving order."""
+        now = time.time() if now is None else now
+        active: list[str] = []
+        benched: list[str] = []
+        with self._lock:
+            for s in symbols:
+                h = self._health.get(s)
+                if h is not None and h.retry_at > now:
+                    benched.append(s)
+                else:
+                    active.append(s)
+        return active, benched
+
+    def record_success(self, symbol: str):
+        with self._lock:
+            h = self._health.pop(symbol, None)
+        if h is not None and h.retry_at:
+            logging.info(f"{symbol} is returning data again; released from quarantine.")
+
+    def record_failure(self, symbol: str, reason: str = "no data", now: float | None = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            h = self._health.setdefault(symbol, SymbolHealth())
+            h.failures += 1
+            h.last_error = reason
+            if h.failures < self.threshold:
+                return
+            delay = min(self.max_sec, self.base_sec * (2 ** (h.failures - self.threshold)))
+            h.retry_at = now + delay
+            failures = h.failures
+        logging.info(f"{symbol} failed {failures}x in a row ({reason}); quarantined for {delay:.0f}s.")
+
+    def release(self, symbol: str | None = None):
+        """Forget failures for one symbol (or all), so it is fetched on the next cycle."""
+        with self._lock:
+            if symbol is None:
+                self._health.clear()
+            else:
+                self._health.pop(symbol, None)
+
+    def quarantined(self, now: float | None = None) -> list[tuple[str, SymbolHealth]]:
+        """(symbol, health) for currently benched symbols, soonest retry first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            items = [(s, SymbolHealth(h.failures, h.retry_at, h.last_error))
+                     for s, h in self._health.items() if h.retry_at > now]
+        return sorted(items, key=lambda it: it[1].retry_at)
+
+
+def compute_quote_from_history(hist: pd.DataFrame) -> tuple[Optional[float], Optional[float]]:
+    """Extract latest price and % change vs previous close (preferred) or open fallback.
+
+    Using 5d history gives us the prior trading day's close for a proper "change from prev close".
+    """
+    if hist is None or hist.empty or "Close" not in hist.columns:
+        return None, None
+    try:
+        closes = hist["Close"].dropna()
+        if len(closes) < 1:
+            return None, None
+        price = round(float(closes.iloc[-1]), 2)
+        if len(closes) >= 2:
+            prev = float(closes.iloc[-2])
+            if prev != 0.0:
+                ch = round((price - prev) / prev * 100.0, 2)
+                return price, ch
+        # Fallback for very new symbols or single-bar results: use open if present
+        if "Open" in hist.columns:
+            o = hist["Open"].iloc[0]
+            if pd.notna(o) and float(o) != 0:
+                ch = round((price - float(o)) / float(o) * 100.0, 2)
+                return price, ch
+        return price, 0.0
+    except Exception as e:
+        logging.debug(f"compute_quote_from_history error: {e}")
+        return None, None
+
+
+def parse_batch(batch_df: pd.DataFrame | None, symbols: list[str]) -> dict[str, tuple[Optional[float], Optional[float]]]:
+    """Pull (price, change) per symbol out of a group_by='ticker' yf.download frame."""
+    parsed: dict[str, tuple[Optional[float], Optional[float]]] = {}
+    if batch_df is None or batch_df.empty:
+        return parsed
+    is_multi = isinstance(getattr(batch_df, "columns", None), pd.MultiIndex)
+    for symbol in symbols:
+        price = change = None
+        try:
+            if is_multi:
+                if symbol in batch_df.columns.get_level_values(0):
+                    sym_df = batch_df[symbol].dropna(how="all")
+                else:
+                    sym_df = pd.DataFrame()
+            else:
+                sym_df = batch_df.dropna(how="all") if len(symbols) <= 1 else pd.DataFrame()
+
+            if not sym_df.empty:
+                price, change = compute_quote_from_history(sym_df)
+        except Exception:
+            pass
+
+        if price is not None:
+            parsed[symbol] = (price, change)
+    return parsed
+
+
+class FetchEngine:
+    """asyncio fetch engine on its own event-loop thread.
+
+    Blocking yfinance calls run on the shared market_data pool, awaited under a semaphore
+    (bounded concurrency) and asyncio.wait_for (per-request deadline). Cancelling the awaiting
+    task abandons the request immediately: a not-yet-started call is dropped from the pool queue,
+    a running one finishes in the background and is ignored. Each cycle additionally runs under
+    a cycle-wide budget, so stop() and refresh() take effect at once instead of after the
+    slowest in-flight download.
+
+    Results are handed to ``publish(quotes, final)`` from the loop thread: partial deltas as
+    chunks / individual retries land, then the full board (final=True) to close the cycle.
+    """
+
+    def __init__(
+        self,
+        symbols: Callable[[], list[str]],
+        publish: Callable[[list[Quote], bool], None],
+        fetch_interval: float = FETCH_INTERVAL_SEC,
+        chunk_size: int = CHUNK_SIZE,
+        chunk_by: str = CHUNK_BY,
+        chunk_timeout: float = CHUNK_TIMEOUT_SEC,
+        hedge_pct: float = HEDGE_PERCENTILE,
+        hedge_budget: float = HEDGE_BUDGET,
+        cycle_budget: float = CYCLE_BUDGET_SEC,
+        max_inflight: int = MAX_INFLIGHT,
+        processes: int = 0,
+    ):
+        self._symbols = symbols
+        self._publish = publish
+        self.fetch_interval = float(fetch_interval)
+        self.chunk_size = max(1, int(chunk_size))
+        self.chunk_by = chunk_by
+        self.chunk_timeout = float(chunk_timeout)
+        self.hedge_pct = float(hedge_pct)
+        self.hedge_budget = float(hedge_budget)
+        self.cycle_budget = float(cycle_budget)
+        self.max_inflight = max(1, int(max_inflight))
+        # Optional worker processes for chunk download + parse (0 = in-process threads)
+        self.shards = shard_fetch.ShardPool(processes) if processes > 0 else None
+
+        self.health = FailureTracker()
+        self.latency = LatencyStats()
+        self._last_good: dict[str, tuple[float, Optional[float], float]] = {}   # price, change, as_of
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._main: asyncio.Task | None = None
+        self._cycle: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._stopping = False
+
+    # ---- lifecycle (any thread) ----
+    def seed(self, quotes: dict[str, tuple[float, Optional[float], float]]):
+        """Prime the stale fallback (e.g. from the warm-start snapshot). Call before start()."""
+        for sym, q in quotes.items():
+            self._last_good.setdefault(sym, q)
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name="TickerFetchV3")
+        self._thread.start()
+
+    def refresh(self):
+        """Abandon the cycle in flight (if any) and start a new one now."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._on_refresh)
+
+    def stop(self, wait: float = 0.0):
+        """Cancel everything in flight; the loop thread exits right after (joined for up to wait s)."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._on_stop)
+        if wait > 0 and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(wait)
+
+    # ---- loop thread ----
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_inflight)
+        self._main = self._loop.create_task(self._run())
+        try:
+            self._loop.run_until_complete(self._main)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+            if self.shards is not None:
+                self.shards.close()
+
+    def _on_refresh(self):
+        self._wake.set()
+        if self._cycle is not None and not self._cycle.done():
+            self._cycle.cancel()
+
+    def _on_stop(self):
+        self._stopping = True
+        if self._main is not None:
+            self._main.cancel()
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            symbols = list(self._symbols())
+            self._cycle = asyncio.ensure_future(self._perform_fetch(symbols))
+            try:
+                await self._cycle
+            except asyncio.CancelledError:
+                if self._stopping:
+                    raise
+                logging.info("Fetch cycle abandoned for a forced refresh.")
+                continue
+            except Exception as e:
+                logging.warning(f"Fetch cycle failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.fetch_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _call(self, fn: Callable[[], T], timeout: float) -> T:
+        """Run one blocking request on the shared pool with a deadline (bounded concurrency)."""
+        async with self._slots:
+            fut = asyncio.get_running_loop().run_in_executor(market_data.get_executor(), fn)
+            return await asyncio.wait_for(fut, timeout=timeout)
+
+    async def _hedged(self, fn: Callable[[], T], venue: str, kind: str, budget: HedgeBudget,
+                      usable: Callable[[T], bool], timeout: float) -> T:
+        """Run fn; if it is still running after the venue's HEDGE_PERCENTILE latency, fire one
+        duplicate (budget permitting) and return whichever usable result arrives first."""
+        budget.add_primary()
+        primary = asyncio.ensure_future(self._call(fn, timeout))
+        backup: asyncio.Future | None = None
+        try:
+            delay = self.latency.percentile(venue, kind, self.hedge_pct) if self.hedge_pct > 0 else None
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=max(HEDGE_MIN_DELAY_SEC, delay))
+            if done or not budget.take():
+                return await primary
+            logging.debug(f"Hedging slow {kind} request on {venue} (> {delay:.1f}s)")
+            backup = asyncio.ensure_future(self._call(fn, timeout))
+            result = None
+            error: BaseException | None = None
+            for fut in asyncio.as_completed({primary, backup}):
+                try:
+                    result = await fut
+                except Exception as e:
+                    error = e
+                    continue
+                if usable(result):
+                    return result
+            if result is None and error is not None:
+                raise error
+            return result
+        finally:
+            primary.cancel()
+            if backup is not None:
+                backup.cancel()
+
+    def _download_once(self, chunk: list[str], timeout: float) -> dict[str, tuple[Optional[float], Optional[float]]]:
+        """Blocking: one batch download attempt for a chunk (runs on the shared pool)."""
+        t0 = time.monotonic()
+        batch_df = market_data.download(
+            chunk,
+            period="5d",
+            progress=False,
+            group_by="ticker",
+            timeout=timeout,
+            auto_adjust=False,
+        )
+        self.latency.record(chunk_exchange(chunk), "chunk", time.monotonic() - t0)
+        return parse_batch(batch_df, chunk)
+
+    def _history_once(self, sym: str) -> tuple[Optional[float], Optional[float]]:
+        """Blocking: single-symbol 5d history fallback (runs on the shared pool)."""
+        t0 = time.monotonic()
+        h = market_data.get_ticker(sym).history(period="5d", timeout=SYMBOL_TIMEOUT_SEC)
+        self.latency.record(exchange_of(sym), "symbol", time.monotonic() - t0)
+        return compute_quote_from_history(h)
+
+    async def _download_chunk(self, chunk: list[str]) -> dict[str, tuple[Optional[float], Optional[float]]] | None:
+        """Batch-download one chunk within its own deadline (retrying if time allows).
+
+        Never hedged: a duplicate yf.download would only queue behind the first on its lock.
+
+        Returns parsed results ({} if Yahoo answered but had nothing for these symbols),
+        or None if every attempt errored or the deadline ran out.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.chunk_timeout
+        parsed: dict[str, tuple[Optional[float], Optional[float]]] | None = None
+        for attempt in range(CHUNK_RETRIES + 1):
+            remaining = deadline - loop.time()
+            if remaining < 1.0:
+                break
+            limit = min(30.0, remaining)
+            try:
+                parsed = await self._call(lambda: self._download_once(chunk, limit), remaining)
+            except asyncio.TimeoutError:
+                logging.warning(f"Chunk {chunk[0]}.. x{len(chunk)} timed out (try {attempt + 1}).")
+                continue
+            except Exception as e:
+                logging.warning(f"yfinance batch download error ({chunk[0]}.. x{len(chunk)}, try {attempt + 1}): {e}")
+                continue
+            if parsed:
+                break
+        return parsed
+
+    async def _download_shard(self, chunk: list[str], offset: int, block: shard_fetch.QuoteBlock) -> int | None:
+        """Process-pool counterpart of _download_chunk: same deadline, retry and concurrency slot,
+        no hedging. Returns rows written into block (0 = answered with nothing), None on failure."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.chunk_timeout
+        rows: int | None = None
+        for attempt in range(CHUNK_RETRIES + 1):
+            remaining = deadline - loop.time()
+            if remaining < 1.0:
+                break
+            try:
+                async with self._slots:
+                    fut = self.shards.submit(chunk, block, offset, min(30.0, remaining))
+                    rows, seconds = await asyncio.wait_for(asyncio.wrap_future(fut), timeout=remaining)
+            except asyncio.TimeoutError:
+                logging.warning(f"Shard {chunk[0]}.. x{len(chunk)} timed out (try {attempt + 1}).")
+                continue
+            except Exception as e:
+                logging.warning(f"Shard download error ({chunk[0]}.. x{len(chunk)}, try {attempt + 1}): {e}")
+                continue
+            self.latency.record(chunk_exchange(chunk), "shard", seconds)
+            if rows:
+                break
+        return rows
+
+    def _emit(self, parsed: dict[str, tuple[Optional[float], Optional[float]]]):
+        if not parsed:
+            return
+        try:
+            now = time.time()
+            self._publish([Quote(sym, p, c, as_of=now) for sym, (p, c) in parsed.items()], False)
+        except Exception as e:
+            logging.debug(f"Partial update publish failed: {e}")
+
+    async def _perform_fetch(self, tickers: list[str]) -> list[Quote]:
+        """One fetch cycle; publishes partials as they land and the full board at the end.
+
+        - Batch yf.download (period=5d for prev-close change calc) with group_by='ticker',
+          split into concurrent chunks (by exchange suffix and/or size) with per-chunk deadlines.
+        - Per-symbol fallback for anything a responding chunk didn't cover.
+        - Stale previous good values preserved on transient errors.
+        - Quarantined symbols (repeated failures) are skipped until their retry time.
+        - Slow per-symbol requests are hedged; the whole cycle is capped at cycle_budget seconds, after
+          which whatever arrived is published and the rest stays stale.
+        """
+        if not tickers:
+            self._publish([], True)
+            return []
+
+        requested = tickers
+        tickers, benched = self.health.partition(requested)
+        if benched:
+            logging.debug(f"Skipping {len(benched)} quarantined symbols: {', '.join(benched)}")
+
+        results: dict[str, tuple[Optional[float], Optional[float]]] = {}
+        answered: set[str] = set()
+        individual_success = 0
+        budget = HedgeBudget(self.hedge_budget)
+        # yf.download is serialized per process; queueing chunks here (not on its lock) keeps each
+        # chunk's deadline from running down while it waits its turn
+        chunk_slots = asyncio.Semaphore(CHUNK_WORKERS if self.shards is not None else 1)
+
+        async def one_chunk(chunk: list[str]):
+            async with chunk_slots:
+                parsed = await self._download_chunk(chunk)
+            if parsed is not None:
+                results.update(parsed)
+                answered.update(chunk)
+                self._emit(parsed)
+
+        async def one_shard(chunk: list[str], offset: int, block: shard_fetch.QuoteBlock):
+            async with chunk_slots:
+                rows = await self._download_shard(chunk, offset, block)
+            if rows is None:
+                return
+            parsed = block.read(chunk, offset)
+            results.update(parsed)
+            answered.update(chunk)
+            self._emit(parsed)
+
+        async def one_symbol(sym: str):
+            nonlocal individual_success
+            try:
+                price, ch = await self._hedged(lambda: self._history_once(sym), exchange_of(sym), "symbol",
+                                               budget, usable=lambda r: r[0] is not None,
+                                               timeout=SYMBOL_TIMEOUT_SEC)
+            except Exception:
+                return
+            if price is not None:
+                results[sym] = (price, ch)
+                individual_success += 1
+                self._emit({sym: (price, ch)})
+
+        async def stages():
+            chunks = chunk_symbols(tickers, self.chunk_size, self.chunk_by)
+            if self.shards is None:
+                await asyncio.gather(*(one_chunk(c) for c in chunks))
+            else:
+                block = shard_fetch.QuoteBlock(len(tickers))
+                offsets = [sum(len(c) for c in chunks[:i]) for i in range(len(chunks))]
+                try:
+                    await asyncio.gather(*(one_shard(c, o, block) for c, o in zip(chunks, offsets)))
+                finally:
+                    block.release()
+            # Symbols missing from a chunk that *did* answer are the likely-bad ones: retry those
+            # individually. Chunks that timed out keep stale values and are not blamed, and if
+            # nothing came back at all (offline) there is no point hammering symbols one by one.
+            still_missing = [s for s in tickers if s in answered and s not in results] if results else []
+            if still_missing:
+                logging.info(
+                    f"Batch gave good data for {len(results)}/{len(tickers)} symbols. "
+                    f"Retrying {len(still_missing)} individually..."
+                )
+                await asyncio.gather(*(one_symbol(s) for s in still_missing))
+
+        try:
+            await asyncio.wait_for(stages(), timeout=self.cycle_budget)
+        except asyncio.TimeoutError:
+            logging.warning(f"Fetch cycle hit its {self.cycle_budget:.0f}s budget; publishing what arrived.")
+
+        # Only blame individual symbols when the cycle itself worked; a network outage
+        # (nothing came back at all) must not quarantine the whole list.
+        if results:
+            for symbol in tickers:
+                if symbol not in answered and symbol not in results:
+                    continue
+                if symbol in results:
+                    self.health.record_success(symbol)
+                else:
+                    self.health.record_failure(symbol, "no data from batch or individual retry")
+
+        # Assemble final list in *requested* order, with stale fallback where needed
+        now = time.time()
+        self._last_good = {s: v for s, v in self._last_good.items() if s in requested}
+        for symbol, (price, change) in results.items():
+            self._last_good[symbol] = (price, change, now)
+        new_data: list[Quote] = []
+        for symbol in requested:
+            if symbol in results:
+                price, change = results[symbol]
+                new_data.append(Quote(symbol, price, change, as_of=now))
+            elif symbol in self._last_good:
+                price, change, as_of = self._last_good[symbol]
+                new_data.append(Quote(symbol, price, change, stale=True, as_of=as_of))
+            else:
+                new_data.append(Quote(symbol, None, None))
+
+        still_na = [s for s in tickers if s not in results and s not in self._last_good]
+        if individual_success:
+            logging.info(f"Individual retries succeeded for {individual_success} more symbols.")
+        if still_na:
+            logging.info(f"{len(still_na)} symbols still have no data this cycle (N/A or stale shown).")
+
+        self._publish(new_data, True)
+        return new_data
+
+
+class SharedFeed:
+    """One FetchEngine serving every TickerTape window in the process.
+
+    The engine fetches the union of the attached tapes' symbols (tape, holdings and basket
+    members) once per cycle, so a symbol shown on two monitors costs one request. Each delta
+    is fanned out split per tape: a window only queues, bars and renders the quotes it wants,
+    and every tape still sees final=True to close the cycle.
+    """
+
+    def __init__(self, snapshot_file: str = market_data.SNAPSHOT_FILE, **engine_options):
+        self.tapes: list[TickerTape] = []
+        self.engine = FetchEngine(symbols=self.symbols, publish=self._publish, **engine_options)
+        self.warm = market_data.load_quote_snapshot(snapshot_file)
+        self.engine.seed(self.warm)
+        self._started = False
+        self._cycles = 0
+
+    def attach(self, tape: TickerTape):
+        """Add a tape. One joining after the first cycle finished triggers a refresh for its symbols."""
+        self.tapes.append(tape)
+        if self._started and self._cycles:
+            self.engine.refresh()
+
+    def start(self):
+        """Start the engine (once), after the initial tapes have attached."""
+        if not self._started:
+            self._started = True
+            self.engine.start()
+
+    def detach(self, tape: TickerTape) -> bool:
+        """Drop a closed tape. Returns True if it was the last one; the engine is then stopped
+        and its loop joined, so the shared pool can be shut down safely afterwards."""
+        if tape in self.tapes:
+            self.tapes.remove(tape)
+        if self.tapes:
+            return False
+        self.engine.stop(wait=STOP_JOIN_SEC)
+        return True
+
+    def symbols(self) -> list[str]:
+        return list(dict.fromkeys(s for tape in list(self.tapes) for s in tape.wanted_symbols()))
+
+    def _publish(self, quotes: list[Quote], final: bool):
+        tapes = list(self.tapes)  # loop thread; the Tk thread may attach/detach meanwhile
+        self._cycles += final
+        if len(tapes) == 1:
+            tapes[0]._publish(quotes, final)
+            return
+        for tape in tapes:
+            wanted = set(tape.wanted_symbols())
+            tape._publish([q for q in quotes if q.symbol in wanted], final)
 
 
 class TickerTape:
@@ -98,24 +835,48 @@ class TickerTape:
 
     def __init__(
         self,
-        root: tk.Tk,
+        root: tk.Tk | tk.Toplevel,
         yaml_file: str = DEFAULT_YAML,
         dock_position: str | None = None,
         scroll_speed: float = SCROLL_SPEED,
         fetch_interval: int = FETCH_INTERVAL_SEC,
         window_height: int = WINDOW_HEIGHT,
+        chunk_size: int = CHUNK_SIZE,
+        chunk_by: str = CHUNK_BY,
+        chunk_timeout: float = CHUNK_TIMEOUT_SEC,
+        hedge_pct: float = HEDGE_PERCENTILE,
+        hedge_budget: float = HEDGE_BUDGET,
+        cycle_budget: float = CYCLE_BUDGET_SEC,
+        processes: int = 0,
+        snapshot_file: str = market_data.SNAPSHOT_FILE,
+        sparkline_width: int = SPARKLINE_WIDTH,
+        rsi_colours: bool = True,
+        alerts_file: str = alerts.ALERTS_FILE,
+        alert_hook: Callable[[alerts.Alert], None] | None = None,
+        holdings_file: str = portfolio.HOLDINGS_FILE,
+        baskets_file: str = baskets.BASKETS_FILE,
+        feed: SharedFeed | None = None,
+        x_offset: int = 0,
+        width: int | None = None,
     ):
+        """feed: share another tape's engine (the fetch/engine options are then ignored);
+        x_offset/width place the window on one monitor of a multi-monitor desktop."""
         self.root = root
         self.yaml_file = yaml_file
+        self.snapshot_file = snapshot_file
+        self.sparkline_width = max(0, int(sparkline_width))
+        self.rsi_colours = bool(rsi_colours)
         self._cli_dock = dock_position
         self.dock_position = dock_position or DEFAULT_DOCK
         self.scroll_speed = float(scroll_speed)
         self.fetch_interval = int(fetch_interval)
         self.window_height = int(window_height)
+        self.x_offset = int(x_offset)
+        self.closed = False
 
         # Screen / geometry (detect early for reliable width)
         self.root.update_idletasks()
-        sw = self.root.winfo_screenwidth() or 1920
+        sw = width or self.root.winfo_screenwidth() or 1920
         self.screen_width = max(800, int(sw))
         self.screen_height = self.root.winfo_screenheight() or 1080
 
@@ -127,13 +888,57 @@ class TickerTape:
         self.manual_paused: bool = False
         self.hover_paused: bool = False
         self.last_update_ts: float | None = None
+        self.last_snapshot_ts: float = 0.0
         self.pause_idx: int | None = None
 
         # Threading & comms (all Tk ops stay on main thread)
-        self.stop_event = threading.Event()
-        self.force_refresh = threading.Event()
-        self.data_queue: queue.Queue[list[Quote]] = queue.Queue(maxsize=8)
+        # (quotes, final): partial deltas stream in as chunks finish; final=True closes a cycle.
+        # Unbounded because deltas must not be dropped; every drain empties it.
+        self.data_queue: queue.Queue[tuple[list[Quote], bool]] = queue.Queue()
         self.data_lock = threading.RLock()
+        # Set by the publisher when it has posted DATA_EVENT; cleared by the drain. While set,
+        # further publishes just enqueue, so a burst of partials costs one wakeup.
+        self._wakeup_pending = threading.Event()
+        self._drain_after: str | None = None
+        self._render_after: str | None = None
+        self._render_keep_position = True
+        # Rolling 1m/5m/15m OHLC bars per symbol, folded from every fresh quote (Tk thread only)
+        self.bars = intraday.BarAggregator()
+        # Last SPARK_POINTS cycle prices per symbol; each ring caches its own sparkline coordinates
+        self.sparks: dict[str, intraday.PriceRing] = {}
+        # Streaming indicators over each symbol's RSI_TIMEFRAME bars, and the latest RSI they give
+        self.feeds: dict[str, indicators.BarFeed] = {}
+        self.rsi: dict[str, float] = {}
+        # Price alerts, checked against every delta on the Tk thread (so hooks may touch Tk)
+        self.alerts_file = alerts_file
+        self.alerts = alerts.AlertEngine(alerts.load_rules(alerts_file), hooks=[self._on_alert])
+        if alert_hook is not None:
+            self.alerts.add_hook(alert_hook)
+        self.recent_alerts: deque[tuple[float, str]] = deque(maxlen=RECENT_ALERTS)
+        # Holdings valued from the same quotes; their symbols are fetched even when not on the tape
+        base, holdings = portfolio.load_holdings(holdings_file)
+        self.portfolio = portfolio.Portfolio(holdings, base)
+        self.portfolio_window: portfolio.PortfolioWindow | None = None
+        # Basket levels shown at the head of the tape (members resolved once the config is loaded)
+        self.baskets_file = baskets_file
+        self.baskets = baskets.BasketBook([])
+        self.basket_sparks: dict[str, intraday.PriceRing] = {}
+        # Symbols are read at the start of every cycle (snapshot; reconciled on arrival).
+        # A tape on its own gets a private feed; several windows share one (see SharedFeed),
+        # which the caller starts once every tape has attached.
+        owns_feed = feed is None
+        self.feed = feed or SharedFeed(
+            snapshot_file=self.snapshot_file,
+            fetch_interval=self.fetch_interval,
+            chunk_size=chunk_size,
+            chunk_by=chunk_by,
+            chunk_timeout=chunk_timeout,
+            hedge_pct=hedge_pct,
+            hedge_budget=hedge_budget,
+            cycle_budget=cycle_budget,
+            processes=processes,
+        )
+        self.engine = self.feed.engine
 
         # UI setup
         self._setup_window()
@@ -141,18 +946,31 @@ class TickerTape:
         self._build_menu()
         self._bind_events()
 
-        # Load config (CLI dock wins) then prime display immediately
+        # Load config (CLI dock wins) then prime display immediately from the last snapshot
+        # (gray, age-marked) - N/A only for symbols we have never seen
         self.load_config()
+        self.baskets = baskets.BasketBook(baskets.load_baskets(self.tickers, self.baskets_file))
+        warm = self.feed.warm
+        self.portfolio.value_board(Quote(s, p, c, stale=True) for s, (p, c, _) in warm.items())
         with self.data_lock:
-            self.ticker_data = [Quote(s, None, None) for s in self.tickers]
+            self.ticker_data = [
+                Quote(s, warm[s][0], warm[s][1], stale=True, as_of=warm[s][2]) if s in warm
+                else Quote(s, None, None)
+                for s in self.tickers
+            ]
 
-        # Final geometry + initial render (shows tickers as N/A right away)
+        # Final geometry + initial render (shows last-known prices or N/A right away)
         self.update_geometry()
         self._render_ticker_display()
 
-        # Start background + animation
-        self._start_background_thread()
-        self._schedule_queue_drain()
+        # Start background + animation. No queue polling: the engine posts DATA_EVENT when
+        # it publishes; the after_idle drain picks up anything published before mainloop runs.
+        self.root.bind(DATA_EVENT, self._on_data_event)
+        self.feed.attach(self)
+        if owns_feed:
+            self.feed.start()
+        self._refresh_fx()
+        self.root.after_idle(self._drain_queue)
         self.animate()
 
     # --------------------------- Window & UI ---------------------------
@@ -180,6 +998,10 @@ class TickerTape:
         self.menu.add_command(label="Refresh Now", command=self._force_refresh)
         self.menu.add_command(label="Pause Scroll", command=self._toggle_pause)
         self.menu.add_command(label="List Tickers", command=self._show_ticker_list)
+        self.menu.add_command(label="Quarantined Symbols...", command=self._show_quarantine)
+        self.menu.add_command(label="Portfolio...", command=self._show_portfolio)
+        self.menu.add_command(label="Add Alert...", command=self.add_alert)
+        self.menu.add_command(label="Recent Alerts...", command=self._show_alerts)
         self.menu.add_separator()
         self.menu.add_command(label="Dock to Top", command=lambda: self.set_dock_position("top"))
         self.menu.add_command(label="Dock to Bottom", command=lambda: self.set_dock_position("bottom"))
@@ -258,12 +1080,23 @@ class TickerTape:
         except Exception as e:
             logging.error(f"Config save failed: {e}")
 
+    def save_snapshot(self):
+        """Write the current board (real prices only) to the warm-start snapshot file."""
+        with self.data_lock:
+            board = {
+                q.symbol: (q.price, q.change_pct, q.as_of or time.time())
+                for q in self.ticker_data if q.price is not None
+            }
+        if board:
+            market_data.save_quote_snapshot(board, self.snapshot_file)
+        self.last_snapshot_ts = time.time()
+
     def update_geometry(self):
         if self.dock_position == "top":
             y = 0
         else:
             y = max(0, self.screen_height - self.window_height - BOTTOM_TASKBAR_MARGIN)
-        self.root.geometry(f"{self.screen_width}x{self.window_height}+0+{y}")
+        self.root.geometry(f"{self.screen_width}x{self.window_height}+{self.x_offset}+{y}")
         self.root.update_idletasks()
 
     def set_dock_position(self, position: str):
@@ -275,185 +1108,159 @@ class TickerTape:
         messagebox.showinfo("Ticker", f"Docked to {position}.", parent=self.root)
 
     # --------------------------- Data Fetch (background) ---------------------------
-    def _compute_quote_from_history(self, hist: pd.DataFrame) -> tuple[Optional[float], Optional[float]]:
-        """Extract latest price and % change vs previous close (preferred) or open fallback.
+    def wanted_symbols(self) -> list[str]:
+        """Everything this tape needs fetched: its tickers, holdings and basket members."""
+        return list(dict.fromkeys(self.tickers + self.portfolio.symbols + self.baskets.symbols()))
 
-        Using 5d history gives us the prior trading day's close for a proper "change from prev close".
-        """
-        if hist is None or hist.empty or "Close" not in hist.columns:
-            return None, None
-        try:
-            closes = hist["Close"].dropna()
-            if len(closes) < 1:
-                return None, None
-            price = round(float(closes.iloc[-1]), 2)
-            if len(closes) >= 2:
-                prev = float(closes.iloc[-2])
-                if prev != 0.0:
-                    ch = round((price - prev) / prev * 100.0, 2)
-                    return price, ch
-            # Fallback for very new symbols or single-bar results: use open if present
-            if "Open" in hist.columns:
-                o = hist["Open"].iloc[0]
-                if pd.notna(o) and float(o) != 0:
-                    ch = round((price - float(o)) / float(o) * 100.0, 2)
-                    return price, ch
-            return price, 0.0
-        except Exception as e:
-            logging.debug(f"_compute_quote_from_history error: {e}")
-            return None, None
+    def _publish(self, quotes: list[Quote], final: bool):
+        """Called from the engine's loop thread with a partial delta or the full board.
 
-    def _perform_fetch(self, tickers: list[str] | None = None) -> list[Quote]:
-        """Return list of Quote in the requested ticker order.
-
-        - Batch yf.download (period=5d for prev-close change calc) with group_by='ticker'.
-        - Per-symbol fallback via ThreadPoolExecutor for anything missing.
-        - Stale previous good values preserved on transient errors.
+        Enqueues, then wakes the Tk thread with a virtual event - unless a wakeup is already
+        pending, in which case the upcoming drain will see this delta too.
         """
-        if tickers is None:
-            tickers = list(self.tickers)
-        if not tickers:
-            return []
-
-        # Snapshot previous good values at the *start* of this fetch for stale resilience
-        with self.data_lock:
-            prev_map = {q.symbol: (q.price, q.change_pct) for q in self.ticker_data if q.price is not None}
-
-        batch_df = None
+        self.data_queue.put_nowait((quotes, final))
+        if self._wakeup_pending.is_set():
+            return
+        self._wakeup_pending.set()
         try:
-            batch_df = yf.download(
-                tickers=tickers,
-                period="5d",
-                progress=False,
-                group_by="ticker",
-                timeout=30,
-                auto_adjust=False,
-            )
-        except Exception as e:
-            logging.warning(f"yfinance batch download error: {e}")
+            self.root.event_generate(DATA_EVENT, when="tail")
+        except (RuntimeError, tk.TclError):
+            # mainloop not running (yet, or any more); the start-up after_idle drain covers it
+            self._wakeup_pending.clear()
 
-        results: dict[str, tuple[Optional[float], Optional[float]]] = {}
-        batch_success = 0
-        still_missing: list[str] = []
-
-        if batch_df is not None and not batch_df.empty:
-            is_multi = isinstance(getattr(batch_df, "columns", None), pd.MultiIndex)
-            for symbol in tickers:
-                price = change = None
-                try:
-                    if is_multi:
-                        if symbol in batch_df.columns.get_level_values(0):
-                            sym_df = batch_df[symbol].dropna(how="all")
-                        else:
-                            sym_df = pd.DataFrame()
-                    else:
-                        sym_df = batch_df.dropna(how="all") if len(tickers) <= 1 else pd.DataFrame()
-
-                    if not sym_df.empty:
-                        price, change = self._compute_quote_from_history(sym_df)
-                except Exception:
-                    pass
-
-                if price is not None:
-                    results[symbol] = (price, change)
-                    batch_success += 1
-                else:
-                    still_missing.append(symbol)
-
-        # Fallback individuals (parallel) for symbols batch couldn't satisfy
-        individual_success = 0
-        if still_missing:
-            logging.info(
-                f"Batch gave good data for {batch_success}/{len(tickers)} symbols. "
-                f"Retrying {len(still_missing)} individually..."
-            )
-            from concurrent.futures import ThreadPoolExecutor, as_completed
-
-            def _fetch_one(sym: str):
-                try:
-                    h = yf.Ticker(sym).history(period="5d")
-                    p, c = self._compute_quote_from_history(h)
-                    return sym, p, c
-                except Exception:
-                    return sym, None, None
-
-            with ThreadPoolExecutor(max_workers=8) as ex:
-                futures = {ex.submit(_fetch_one, s): s for s in still_missing}
-                for fut in as_completed(futures):
-                    sym, price, ch = fut.result()
-                    if price is not None:
-                        results[sym] = (price, ch)
-                        individual_success += 1
+    # --------------------------- UI Update (main thread only) ---------------------------
+    def _on_data_event(self, _event=None):
+        """Coalesce wakeups: at most one drain (and so one render) per animation frame."""
+        if self._drain_after is None:
+            self._drain_after = self.root.after(FRAME_INTERVAL_MS, self._drain_queue)
+
+    def _request_render(self, keep_position: bool = False):
+        """Schedule one render for this frame; repeated requests (add/remove bursts, partial
+        deltas) collapse into it. Any request that wants a restart wins over keep_position."""
+        self._render_keep_position = self._render_keep_position and keep_position
+        if self._render_after is None:
+            self._render_after = self.root.after_idle(self._flush_render)
+
+    def _flush_render(self):
+        self._render_after = None
+        keep = self._render_keep_position
+        self._render_keep_position = True
+        self._render_ticker_display(keep_position=keep)
 
-        # Assemble final list in *requested* order, with stale fallback where needed
-        new_data: list[Quote] = []
-        for symbol in tickers:
-            if symbol in results:
-                price, change = results[symbol]
-            elif symbol in prev_map:
-                price, change = prev_map[symbol]
+    def _drain_queue(self):
+        """Merge every queued delta (partial or final) into the current board, then render once."""
+        self._drain_after = None
+        self._wakeup_pending.clear()
+        deltas: list[list[Quote]] = []
+        cycle_done = False
+        while True:
+            try:
+                quotes, final = self.data_queue.get_nowait()
+            except queue.Empty:
+                break
+            deltas.append(quotes)
+            cycle_done = cycle_done or final
+            if final:
+                # One sparkline point per cycle (partials would double-count the same price)
+                for q in quotes:
+                    if q.price is not None and not q.stale:
+                        ring = self.sparks.get(q.symbol)
+                        if ring is None:
+                            ring = self.sparks[q.symbol] = intraday.PriceRing()
+                        ring.push(q.price, q.as_of)
+        if not deltas:
+            return
+        portfolio_rows: set[int] = set()
+        with self.data_lock:
+            # Align whatever arrived (may be from a slightly older snapshot) to the *current* list.
+            # This drops any just-removed tickers and supplies N/A placeholders for just-added ones;
+            # symbols not in this delta keep their current quote.
+            sym_to_q = {q.symbol: q for q in self.ticker_data}
+            for quotes in deltas:
+                for q in quotes:
+                    sym_to_q[q.symbol] = q
+                self.bars.add_quotes(quotes)
+                self._update_indicators(quotes)
+                self.alerts.check(quotes)
+                portfolio_rows.update(self.portfolio.apply(quotes))
+                self.baskets.apply(quotes)
+            self.ticker_data = [
+                sym_to_q.get(s, Quote(s, None, None)) for s in self.tickers
+            ]
+            if cycle_done:
+                self.last_update_ts = time.time()
+        if cycle_done and self.last_update_ts - self.last_snapshot_ts >= SNAPSHOT_INTERVAL_SEC:
+            self.save_snapshot()
+        if cycle_done:
+            self._refresh_fx()
+            self.baskets.rebalance_due(fetch_caps=self._fetch_caps)
+            for b in self.baskets.baskets:
+                if not math.isnan(b.level):
+                    ring = self.basket_sparks.get(b.name)
+                    if ring is None:
+                        ring = self.basket_sparks[b.name] = intraday.PriceRing()
+                    ring.push(b.level, self.last_update_ts)
+        fx_changed = self.portfolio.sync_fx()
+        if (portfolio_rows or fx_changed) and self.portfolio_window is not None and self.portfolio_window.alive():
+            self.portfolio_window.refresh(None if fx_changed else sorted(portfolio_rows))
+        self._request_render(keep_position=True)
+
+    def _update_indicators(self, quotes: list[Quote]):
+        """Feed each quoted symbol's newest RSI_TIMEFRAME bar to its BarFeed (O(1) per symbol)."""
+        for q in quotes:
+            bar = self.bars.bars(q.symbol, RSI_TIMEFRAME, last=1)
+            if not len(bar):
+                continue
+            feed = self.feeds.get(q.symbol)
+            if feed is None:
+                feed = self.feeds[q.symbol] = indicators.BarFeed()
+            b = bar[0]
+            rsi = feed.update(int(b["ts"]), float(b["high"]), float(b["low"]), float(b["close"]))["rsi"]
+            if rsi is None:
+                self.rsi.pop(q.symbol, None)
             else:
-                price = change = None
-            new_data.append(Quote(symbol, price, change))
-
-        still_na = [s for s in tickers if s not in results and s not in prev_map]
-        if individual_success:
-            logging.info(f"Individual retries succeeded for {individual_success} more symbols.")
-        if still_na:
-            logging.info(f"{len(still_na)} symbols still have no data this cycle (N/A or stale shown).")
+                self.rsi[q.symbol] = rsi
 
-        return new_data
+    def _refresh_fx(self):
+        """Fetch stale FX rates for the holdings on the shared pool; sync_fx() applies them on a later drain."""
+        currencies = self.portfolio.currencies()
+        if self.portfolio.fx.stale(currencies):
+            market_data.get_executor().submit(self.portfolio.fx.refresh, currencies)
 
-    def fetch_data(self):
-        """Background worker. Uses snapshots + interruptible sleep for responsiveness."""
-        while not self.stop_event.is_set():
-            tickers_snapshot = list(self.tickers)
-            data = self._perform_fetch(tickers_snapshot)
+    def _fetch_caps(self, basket: baskets.Basket):
+        """Market caps for an mcap basket's rebalance, fetched off the Tk thread (always ends in set_caps)."""
+        def caps_of(sym: str) -> float:
             try:
-                self.data_queue.put_nowait(data)
-            except queue.Full:
-                pass
+                return float(market_data.get_ticker(sym).info.get("marketCap") or 0.0)
+            except Exception as e:
+                logging.debug(f"Market cap for {sym} failed: {e}")
+                return 0.0
 
-            # 0.2s granularity so force-refresh and exit react quickly
-            waited = 0.0
-            while waited < self.fetch_interval and not self.stop_event.is_set():
-                time.sleep(0.2)
-                waited += 0.2
-                if self.force_refresh.is_set():
-                    self.force_refresh.clear()
-                    break
+        def run():
+            caps: dict[str, float] = {}
+            try:
+                caps = dict(zip(basket.members, market_data.get_executor().map(caps_of, basket.members)))
+            except Exception as e:
+                logging.warning(f"Basket {basket.name}: market caps unavailable ({e}); using equal weight")
+            self.baskets.set_caps(basket, caps)
 
-    def _start_background_thread(self):
-        t = threading.Thread(target=self.fetch_data, daemon=True, name="TickerFetchV3")
-        t.start()
+        threading.Thread(target=run, daemon=True, name="BasketCaps").start()
 
-    # --------------------------- UI Update (main thread only) ---------------------------
-    def _schedule_queue_drain(self):
-        self._drain_queue()
-        self.root.after(120, self._schedule_queue_drain)
+    def _on_alert(self, alert: alerts.Alert):
+        logging.warning(f"ALERT {alert.message}")
+        self.recent_alerts.appendleft((time.time(), alert.message))
+        try:
+            self.root.bell()
+        except tk.TclError:
+            pass
 
-    def _drain_queue(self):
-        updated = False
-        last_data: list[Quote] | None = None
-        while True:
-            try:
-                last_data = self.data_queue.get_nowait()
-                updated = True
-            except queue.Empty:
-                break
-        if updated and last_data is not None:
-            with self.data_lock:
-                # Align whatever arrived (may be from a slightly older snapshot) to the *current* list.
-                # This drops any just-removed tickers and supplies N/A placeholders for just-added ones.
-                sym_to_q = {q.symbol: q for q in last_data}
-                self.ticker_data = [
-                    sym_to_q.get(s, Quote(s, None, None)) for s in self.tickers
-                ]
-                self.last_update_ts = time.time()
-            self._render_ticker_display()
+    def _render_ticker_display(self, keep_position: bool = False):
+        """(Re)build ticker items. Only on data change or explicit add/remove.
 
-    def _render_ticker_display(self):
-        """(Re)build ticker items. Only on data change or explicit add/remove."""
+        keep_position=True continues scrolling from the current offset (used for streamed
+        data updates, which may arrive several times per cycle) instead of restarting.
+        """
+        prev_offset = self.offset if keep_position else 0.0
         self.canvas.delete("all")
         self.content_width = 0.0
         self.offset = 0.0
@@ -469,23 +1276,42 @@ class TickerTape:
             )
             return
 
-        entries: list[tuple[str, str]] = []
+        entries: list[tuple[str, str, Optional[intraday.PriceRing], bool]] = []
+        now = time.time()
+        for b in self.baskets.baskets:
+            chg = b.change_pct
+            if math.isnan(b.level):
+                txt, fg = f"{b.name}: N/A", GRAY
+            else:
+                txt = f"{b.name}: {b.level:,.2f}" + ("" if chg is None else f" ({chg:+.2f}%)")
+                fg = GREEN if (chg or 0.0) >= 0 else RED
+            entries.append((txt, fg, self.basket_sparks.get(b.name) if self.sparkline_width else None, False))
         for q in self.ticker_data:
             if q.price is None or q.change_pct is None:
                 txt = f"{q.symbol}: N/A"
                 fg = GRAY
             else:
                 txt = f"{q.symbol}: ${q.price:.2f} ({q.change_pct:+.2f}%)"
-                fg = GREEN if q.change_pct >= 0 else RED
-            entries.append((txt, fg))
+                fg = GRAY if q.stale else (GREEN if q.change_pct >= 0 else RED)
+                rsi = self.rsi.get(q.symbol) if self.rsi_colours and not q.stale else None
+                if rsi is not None and rsi >= indicators.RSI_OVERBOUGHT:
+                    fg = OVERBOUGHT_COLOR
+                elif rsi is not None and rsi <= indicators.RSI_OVERSOLD:
+                    fg = OVERSOLD_COLOR
+                if q.stale and q.as_of:
+                    txt += f" [{market_data.format_age(now - q.as_of)}]"
+            entries.append((txt, fg, self.sparks.get(q.symbol) if self.sparkline_width else None, q.stale))
 
         if not entries:
             return
 
         # TWO copies back-to-back for seamless infinite wrap
+        # Sparklines reuse each ring's cached coordinates (rebuilt only when it got a new price)
+        # and are positioned with canvas.move, so animate() only has a few more items to move.
+        spark_top = (self.window_height - SPARKLINE_HEIGHT) / 2.0
         x = 0.0
         for _ in range(2):
-            for txt, fg in entries:
+            for txt, fg, ring, stale in entries:
                 tid = self.canvas.create_text(
                     x,
                     self.window_height // 2,
@@ -497,7 +1323,16 @@ class TickerTape:
                 )
                 b = self.canvas.bbox(tid)
                 w = float(b[2] - b[0] + 1) if b else 70.0
-                x += w + SPACER_PX
+                x += w
+
+                pts = ring.coords(self.sparkline_width, SPARKLINE_HEIGHT) if ring is not None else None
+                if pts:
+                    x += SPARKLINE_GAP
+                    color = GRAY if stale else (GREEN if ring.trend() >= 0 else RED)
+                    lid = self.canvas.create_line(pts, fill=color, width=1, tags=("ticker",))
+                    self.canvas.move(lid, x, spark_top)
+                    x += self.sparkline_width
+                x += SPACER_PX
 
                 sid = self.canvas.create_text(
                     x,
@@ -517,10 +1352,15 @@ class TickerTape:
         # Shift the 2x block so first item starts just off the right edge
         self.canvas.move("ticker", float(self.screen_width), 0.0)
         self.offset = 0.0
+        if prev_offset < 0.0 and self.content_width > 0.0:
+            self.offset = -((-prev_offset) % self.content_width)
+            self.canvas.move("ticker", self.offset, 0.0)
 
     # --------------------------- Animation (very cheap) ---------------------------
     def animate(self):
         """Move existing tagged items; wrap using tracked logical offset."""
+        if self.closed:
+            return
         if (
             self.manual_paused or self.hover_paused
             or self.content_width < 10.0
@@ -560,12 +1400,13 @@ class TickerTape:
             return
 
         self.tickers.append(symbol)
+        self.engine.health.release(symbol)
         with self.data_lock:
             sym_to_q = {q.symbol: q for q in self.ticker_data}
             self.ticker_data = [sym_to_q.get(s, Quote(s, None, None)) for s in self.tickers]
         self.save_config()
-        self._render_ticker_display()
-        self.force_refresh.set()
+        self._request_render()
+        self.engine.refresh()
         messagebox.showinfo("Ticker", f"Added {symbol}. Fetching price...", parent=self.root)
 
     def remove_ticker(self):
@@ -610,12 +1451,17 @@ class TickerTape:
             sym = str(lb.get(sel[0]))
             if sym in self.tickers:
                 self.tickers.remove(sym)
+                self.engine.health.release(sym)
+                self.bars.drop(sym)
+                self.sparks.pop(sym, None)
+                self.feeds.pop(sym, None)
+                self.rsi.pop(sym, None)
                 with self.data_lock:
                     sym_to_q = {q.symbol: q for q in self.ticker_data}
                     self.ticker_data = [sym_to_q.get(s, Quote(s, None, None)) for s in self.tickers]
                 self.save_config()
-                self._render_ticker_display()
-                self.force_refresh.set()
+                self._request_render()
+                self.engine.refresh()
                 messagebox.showinfo("Ticker", f"Removed {sym}.", parent=self.root)
             top.destroy()
 
@@ -636,7 +1482,7 @@ class TickerTape:
         top.wait_window()
 
     def _force_refresh(self):
-        self.force_refresh.set()
+        self.engine.refresh()
         # Temporary visual; will be replaced quickly by next queue drain + render
         self.canvas.delete("all")
         self.canvas.create_text(
@@ -680,12 +1526,19 @@ class TickerTape:
         if self.tickers == defaults:
             messagebox.showinfo("Ticker", "Already at defaults.", parent=self.root)
             return
+        for sym in self.tickers:
+            if sym not in defaults:
+                self.bars.drop(sym)
+                self.sparks.pop(sym, None)
+                self.feeds.pop(sym, None)
+                self.rsi.pop(sym, None)
         self.tickers = defaults[:]
+        self.engine.health.release()
         with self.data_lock:
             self.ticker_data = [Quote(s, None, None) for s in self.tickers]
         self.save_config()
-        self._render_ticker_display()
-        self.force_refresh.set()
+        self._request_render()
+        self.engine.refresh()
         messagebox.showinfo("Ticker", "Reset to default indices (^GSPC, ^AXJO, ^NZ50).", parent=self.root)
 
     def _show_ticker_list(self):
@@ -694,22 +1547,158 @@ class TickerTape:
         else:
             lines = "\n".join(f"  • {t}" for t in self.tickers)
             msg = f"Tracking {len(self.tickers)} symbols:\n{lines}"
+            benched = self.engine.health.quarantined()
+            if benched:
+                msg += f"\n\n{len(benched)} quarantined (see Quarantined Symbols...)"
+        stats = self.engine.latency.summary()
+        if stats:
+            rows = "\n".join(f"  {ex:<6} {kind:<6} n={n:<3} p50 {p50:.1f}s  p90 {p90:.1f}s"
+                             for ex, kind, n, p50, p90 in stats)
+            msg += f"\n\nRequest latency by exchange:\n{rows}"
         if self.last_update_ts:
             import datetime as _dt
             dt = _dt.datetime.fromtimestamp(self.last_update_ts).strftime("%Y-%m-%d %H:%M:%S")
             msg += f"\n\nLast data update: {dt}"
         messagebox.showinfo("Current Tickers", msg, parent=self.root)
 
+    def _show_quarantine(self):
+        """List symbols benched after repeated failures; allow an early retry."""
+        benched = self.engine.health.quarantined()
+        if not benched:
+            messagebox.showinfo("Quarantine", "No symbols are quarantined.", parent=self.root)
+            return
+
+        top = tk.Toplevel(self.root)
+        top.title("Quarantined Symbols")
+        top.resizable(False, False)
+        top.transient(self.root)
+
+        frm = tk.Frame(top, padx=12, pady=10)
+        frm.pack(fill="both", expand=True)
+        tk.Label(frm, text="Skipped until their retry time (stale or N/A on the tape):").pack(anchor="w", pady=(0, 4))
+
+        lb = tk.Listbox(
+            frm,
+            height=min(14, max(4, len(benched))),
+            width=52,
+            exportselection=False,
+            activestyle="dotbox",
+            font=("Consolas", 10),
+        )
+        now = time.time()
+        for sym, h in benched:
+            mins = max(0.0, h.retry_at - now) / 60.0
+            lb.insert(tk.END, f"{sym:<10} {h.failures:>2} fails  retry in {mins:5.1f} min")
+        lb.pack(fill="both", expand=True, pady=4)
+        lb.selection_set(0)
+
+        def retry_selected():
+            sel = lb.curselection()
+            if sel:
+                self.engine.health.release(benched[sel[0]][0])
+                self.engine.refresh()
+            top.destroy()
+
+        def retry_all():
+            for sym, _ in benched:
+                self.engine.health.release(sym)
+            self.engine.refresh()
+            top.destroy()
+
+        btn_row = tk.Frame(frm)
+        btn_row.pack(pady=(6, 0))
+        tk.Button(btn_row, text="Retry Selected Now", command=retry_selected).pack(side="left", padx=4)
+        tk.Button(btn_row, text="Retry All", command=retry_all).pack(side="left", padx=4)
+        tk.Button(btn_row, text="Close", command=top.destroy).pack(side="left", padx=4)
+
+        try:
+            top.update_idletasks()
+            top.geometry(f"+{self.root.winfo_x() + 120}+{self.root.winfo_y() + 60}")
+        except Exception:
+            pass
+
+    def _show_portfolio(self):
+        if not len(self.portfolio):
+            messagebox.showinfo("Portfolio", "No holdings. List positions in holdings.yaml (see portfolio.py).",
+                                parent=self.root)
+            return
+        if self.portfolio_window is not None and self.portfolio_window.alive():
+            self.portfolio_window.lift()
+            return
+        self.portfolio_window = portfolio.PortfolioWindow(self.root, self.portfolio, on_refresh=self._force_refresh)
+
+    def add_alert(self):
+        text = simpledialog.askstring(
+            "Add Alert",
+            "Alert rule, e.g.\n  SPK.NZ below 4.50\n  NVDA above 150\n  any .NZ symbol moves more than 3%",
+            parent=self.root,
+        )
+        if not text or not text.strip():
+            return
+        try:
+            rule = self.alerts.add_rule(text)
+        except ValueError as e:
+            messagebox.showwarning("Alert", str(e), parent=self.root)
+            return
+        if self.alerts_file:  # "" = this tape's rules aren't persisted (extra tapes of a --tapes session)
+            alerts.save_rules(self.alerts.rules, self.alerts_file)
+        if rule.kind != "move" and rule.scope not in self.tickers:
+            messagebox.showinfo("Alert", f"Added. Note: {rule.scope} is not on the tape, so it isn't fetched.",
+                                parent=self.root)
+
+    def _show_alerts(self):
+        rules = "\n".join(f"  • {r.text}" for r in self.alerts.rules) or "  (none)"
+        fired = "\n".join(f"  {time.strftime('%H:%M:%S', time.localtime(ts))}  {msg}"
+                          for ts, msg in list(self.recent_alerts)[:20]) or "  (none yet)"
+        messagebox.showinfo("Alerts", f"Rules ({self.alerts_file}):\n{rules}\n\nRecently fired:\n{fired}",
+                            parent=self.root)
+
     def exit_app(self):
-        self.stop_event.set()
-        self.force_refresh.set()
+        """Close this window; the last tape to close stops the shared engine and ends the app."""
+        if self.closed:
+            return
+        self.closed = True
+        last = self.feed.detach(self)
+        if last:
+            market_data.shutdown()  # detach() has joined the engine loop, so nothing new lands on the pool
+        self.save_snapshot()
+        for pending in (self._drain_after, self._render_after):
+            if pending is not None:
+                self.root.after_cancel(pending)
         try:
             self.root.destroy()
+            if last and isinstance(self.root, tk.Toplevel):
+                self.root.master.destroy()  # the hidden root of a multi-tape session
         except Exception:
             pass
 
 
 # --------------------------- Entry Point ---------------------------
+TAPE_KEYS = ("config", "dock", "speed", "height", "x", "width", "alerts", "holdings", "baskets")
+
+
+def load_tape_specs(path: str) -> list[dict]:
+    """Window specs for a multi-tape session ({'tapes': [...]} or a bare list), one per monitor:
+
+        tapes:
+          - {config: tickers_nz.yaml, dock: top, x: 0, width: 1920}
+          - {config: tickers_us.yaml, dock: top, speed: 2.0, x: 1920, width: 2560}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    specs = []
+    for spec in data if isinstance(data, list) else data.get("tapes") or []:
+        if isinstance(spec, str):
+            spec = {"config": spec}
+        unknown = set(spec) - set(TAPE_KEYS)
+        if unknown:
+            logging.warning(f"Tape {spec!r} in {path}: ignoring unknown keys {', '.join(sorted(unknown))}")
+        specs.append({k: spec[k] for k in TAPE_KEYS if k in spec})
+    if not specs:
+        raise ValueError(f"No tapes defined in {path}")
+    return specs
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Stock Market Ticker Tape V3 - efficient, thread-safe, feature-rich scrolling display"
@@ -729,17 +1718,101 @@ def main():
     parser.add_argument(
         "--height", type=int, default=WINDOW_HEIGHT, help=f"Window height px (default {WINDOW_HEIGHT})"
     )
+    parser.add_argument(
+        "--chunk-size", type=int, default=CHUNK_SIZE, help=f"Max symbols per batch download (default {CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--chunk-by", choices=["exchange", "size"], default=CHUNK_BY,
+        help=f"Group chunks by exchange suffix or by size only (default {CHUNK_BY})"
+    )
+    parser.add_argument(
+        "--chunk-timeout", type=float, default=CHUNK_TIMEOUT_SEC,
+        help=f"Deadline per chunk in seconds, including retry (default {CHUNK_TIMEOUT_SEC:g})"
+    )
+    parser.add_argument(
+        "--hedge-pct", type=float, default=HEDGE_PERCENTILE,
+        help=f"Send a duplicate single-symbol request when one exceeds this latency percentile; 0 disables (default {HEDGE_PERCENTILE:g})"
+    )
+    parser.add_argument(
+        "--hedge-budget", type=float, default=HEDGE_BUDGET,
+        help=f"Max hedges per cycle as a fraction of requests (default {HEDGE_BUDGET:g})"
+    )
+    parser.add_argument(
+        "--cycle-budget", type=float, default=CYCLE_BUDGET_SEC,
+        help=f"Hard cap on one fetch cycle in seconds; late symbols stay stale (default {CYCLE_BUDGET_SEC:g})"
+    )
+    parser.add_argument(
+        "--sparkline-width", type=int, default=SPARKLINE_WIDTH,
+        help=f"Width in px of the per-symbol sparkline on the tape; 0 hides them (default {SPARKLINE_WIDTH})"
+    )
+    parser.add_argument(
+        "--no-rsi-colours", dest="rsi_colours", action="store_false",
+        help="Don't colour overbought/oversold entries by their intraday RSI"
+    )
+    parser.add_argument(
+        "--alerts", default=alerts.ALERTS_FILE,
+        help=f"Price alert rules file (default {alerts.ALERTS_FILE})"
+    )
+    parser.add_argument(
+        "--holdings", default=portfolio.HOLDINGS_FILE,
+        help=f"Portfolio holdings file (default {portfolio.HOLDINGS_FILE})"
+    )
+    parser.add_argument(
+        "--baskets", default=baskets.BASKETS_FILE,
+        help=f"Basket definitions shown as extra tape entries (default {baskets.BASKETS_FILE})"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=0,
+        help=f"Download and parse chunks in N worker processes (0 = off; e.g. {shard_fetch.DEFAULT_PROCESSES} "
+             f"for thousands of symbols). Chunks keep their deadline and retry but are not hedged"
+    )
+    parser.add_argument(
+        "--snapshot", default=market_data.SNAPSHOT_FILE,
+        help=f"Warm-start quote snapshot file (default {market_data.SNAPSHOT_FILE})"
+    )
+    parser.add_argument(
+        "--tapes",
+        help="YAML list of tape windows (config, dock, speed, height, x, width, ...) to run on one shared "
+             "fetch engine, e.g. one per monitor; the other options become their defaults"
+    )
     args = parser.parse_args()
 
     root = tk.Tk()
-    TickerTape(
-        root,
-        yaml_file=args.config,
-        dock_position=args.dock,
-        scroll_speed=args.speed,
+    if not args.tapes:
+        specs = [{}]
+    else:
+        specs = load_tape_specs(args.tapes)
+        root.withdraw()  # every tape gets its own Toplevel; the root just owns them
+    feed = SharedFeed(
+        snapshot_file=args.snapshot,
         fetch_interval=args.interval,
-        window_height=args.height,
+        chunk_size=args.chunk_size,
+        chunk_by=args.chunk_by,
+        chunk_timeout=args.chunk_timeout,
+        hedge_pct=args.hedge_pct,
+        hedge_budget=args.hedge_budget,
+        cycle_budget=args.cycle_budget,
+        processes=args.processes,
     )
+    for i, spec in enumerate(specs):
+        # Alerts, holdings and baskets default to the first tape only, so they don't fire or list twice
+        TickerTape(
+            tk.Toplevel(root) if args.tapes else root,
+            yaml_file=spec.get("config", args.config),
+            dock_position=spec.get("dock", args.dock),
+            scroll_speed=float(spec.get("speed", args.speed)),
+            window_height=int(spec.get("height", args.height)),
+            snapshot_file=args.snapshot,
+            sparkline_width=args.sparkline_width,
+            rsi_colours=args.rsi_colours,
+            alerts_file=spec.get("alerts", args.alerts if i == 0 else ""),
+            holdings_file=spec.get("holdings", args.holdings if i == 0 else ""),
+            baskets_file=spec.get("baskets", args.baskets if i == 0 else ""),
+            feed=feed,
+            x_offset=int(spec.get("x", 0)),
+            width=spec.get("width"),
+        )
+    feed.start()
     root.mainloop()
 
 
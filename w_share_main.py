@@ -1,8 +1,15 @@
-import yfinance as yf, tkinter as tk, matplotlib.pyplot as plt, pandas as pd
-import time, threading,json, os, logging, yaml
+import time
+_T_START = time.perf_counter()  # reference point for the startup timing report
+import tkinter as tk
+import threading,json, os, logging, yaml
+import market_data
 from tkinter import scrolledtext, messagebox
 from datetime import datetime
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from concurrent.futures import Future
+_T_IMPORTS = time.perf_counter()
+
+# matplotlib, pandas and yfinance are imported on first use (chart, export, first fetch), so the
+# window paints without paying for them.
 
 
 class StockApp:
@@ -22,6 +29,26 @@ class StockApp:
         self.running = True
         self.cache = {}  # Cache for stock data
         self.cache_timeout = 300  # Cache for 5 minutes
+        self.ticker_text = ""
+        self.scroll_pos = 0
+        self.startup_marks = {'imports': _T_IMPORTS}  # perf_counter timestamps for the startup report
+        self.recommendations_started = False
+        self.chart_window = None  # charts.ChartWindow, created on first use
+        self.compare_window = None  # charts.CompareWindow, created on first use
+        self.screener_window = None  # screener.ScreenerWindow, created on first use
+        self.fundamentals = None  # screener.FundamentalsTable, fed by every fetch_stock_data
+        self.fundamentals_lock = threading.Lock()
+        self.portfolio = None  # portfolio.Portfolio from holdings.yaml, created on first use
+        self.correlation = None  # correlation.RollingCorrelation over the screener universe
+        self.heatmap_window = None  # charts.HeatmapWindow, created on first use
+        self.portfolio_window = None
+        self.daily_indicators = {}  # symbol -> [indicators.IndicatorSet, ts of the last closed bar pushed]
+        self.daily_indicators_lock = threading.Lock()  # screener and ranking may update concurrently
+        self.ranking = None  # ranking.RankingEngine over self.fundamentals
+
+        # Status bar (startup timing report lands here)
+        self.status_label = tk.Label(self.root, text="Starting...", anchor="w", bg="#e0e0e0", font=("Arial", 8))
+        self.status_label.pack(side="bottom", fill="x")
 
         # Configure main frame
         self.frame = tk.Frame(self.root, padx=10, pady=10, bg="#f0f0f0")
@@ -45,7 +72,7 @@ class StockApp:
         # Input frame
         self.input_frame = tk.Frame(self.frame, bg="#f0f0f0")
         self.input_frame.pack(fill="x", pady=5)
-        tk.Label(self.input_frame, text="Enter Stock Ticker (e.g., AAPL, BHP.AX, AIA.NZ):", bg="#f0f0f0", font=("Arial", 10)).pack(anchor="w")
+        tk.Label(self.input_frame, text="Enter Stock Ticker (e.g., AAPL, BHP.AX, AIA.NZ; several for Compare):", bg="#f0f0f0", font=("Arial", 10)).pack(anchor="w")
         self.ticker_entry = tk.Entry(self.input_frame, width=20, font=("Arial", 10))
         self.ticker_entry.pack(anchor="w", pady=5)
 
@@ -54,6 +81,10 @@ class StockApp:
         self.button_frame.pack(fill="x", pady=5)
         tk.Button(self.button_frame, text="Get Stock Info", command=self.get_stock_info, bg="#4CAF50", fg="white").pack(side="left", padx=5)
         tk.Button(self.button_frame, text="Show Chart", command=self.show_chart, bg="#2196F3", fg="white").pack(side="left", padx=5)
+        tk.Button(self.button_frame, text="Compare", command=self.show_comparison, bg="#3F51B5", fg="white").pack(side="left", padx=5)
+        tk.Button(self.button_frame, text="Screener", command=self.show_screener, bg="#009688", fg="white").pack(side="left", padx=5)
+        tk.Button(self.button_frame, text="Correlation", command=self.show_correlation, bg="#673AB7", fg="white").pack(side="left", padx=5)
+        tk.Button(self.button_frame, text="Portfolio", command=self.show_portfolio, bg="#795548", fg="white").pack(side="left", padx=5)
         tk.Button(self.button_frame, text="Export to CSV", command=self.export_to_csv, bg="#FF9800", fg="white").pack(side="left", padx=5)
         tk.Button(self.button_frame, text="Clear Output", command=self.clear_output, bg="#F44336", fg="white").pack(side="left", padx=5)
 
@@ -61,11 +92,60 @@ class StockApp:
         self.output_text = scrolledtext.ScrolledText(self.frame, wrap=tk.WORD, height=20, width=80, font=("Arial", 10))
         self.output_text.pack(fill="both", expand=True, pady=10)
 
-        # Start ticker tape update
+        # Paint last-known prices (with their age) before the first network fetch
+        self.load_ticker_snapshot()
+        self.scroll_text()
+
+        # Data loads once the skeleton window is on screen, in priority order:
+        # ticker tape first, then daily recommendations (see startup_load)
+        self.root.after_idle(self.startup_load)
+
+    def startup_load(self):
+        """Record time to first paint, then start the ticker tape fetch."""
+        self.root.update_idletasks()
+        self.startup_marks['first_paint'] = time.perf_counter()
+        self.status_label.config(text=f"Window ready in {(self.startup_marks['first_paint'] - _T_START) * 1000:.0f} ms - loading prices...")
         self.update_ticker_tape()
 
-        # Display daily recommendations on startup
-        self.display_daily_recommendations()
+    def report_startup_timing(self):
+        """Log (and show in the status bar) how long each startup stage took."""
+        def ms(key):
+            return f"{(self.startup_marks[key] - _T_START) * 1000:.0f} ms" if key in self.startup_marks else "n/a"
+        report = (f"Startup: imports {ms('imports')}, first paint {ms('first_paint')}, "
+                  f"ticker tape {ms('ticker_tape')}, recommendations {ms('recommendations')}")
+        logging.info(report)
+        self.status_label.config(text=report)
+
+    def run_in_background(self, work, on_done, poll_ms=50):
+        """Run work() on a loader thread and call on_done(result) on the Tk thread afterwards.
+
+        The loader thread may fan out onto the shared market_data pool; it is not itself a pool
+        worker, so it can safely block on those requests.
+        """
+        future = Future()
+
+        def runner():
+            try:
+                future.set_result(work())
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=runner, daemon=True, name="StockAppLoader").start()
+
+        def check():
+            if not self.running:
+                return
+            if not future.done():
+                self.root.after(poll_ms, check)
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Background load failed in {getattr(work, '__name__', work)}: {e}")
+                return
+            on_done(result)
+
+        self.root.after(poll_ms, check)
     
     def load_ticker_stocks(self):
         """Load ticker stocks from a YAML file or use defaults."""
@@ -98,7 +178,7 @@ class StockApp:
             return
 
         try:
-            stock = yf.Ticker(ticker)
+            stock = market_data.get_ticker(ticker, max_age=self.cache_timeout)
             info = stock.info
             if 'currentPrice' not in info or info['currentPrice'] is None:
                 messagebox.showerror("Error", f"Invalid ticker or no data available for {ticker}.")
@@ -133,16 +213,56 @@ class StockApp:
             logging.info(f"Attempted to remove non-existent ticker: {ticker}. Current tickers: {self.ticker_stocks}")
         messagebox.showwarning("Warning", f"{ticker} not found in ticker tape.")
 
+    def load_ticker_snapshot(self):
+        """Prime the ticker tape from the shared quote snapshot, each price marked with its age."""
+        saved = market_data.load_quote_snapshot()
+        now = time.time()
+        ticker_text = ""
+        for ticker in self.ticker_stocks:
+            if ticker not in saved:
+                continue
+            price, change_percent, as_of = saved[ticker]
+            self.ticker_prices[ticker] = (price, change_percent if change_percent is not None else 'N/A')
+            age = market_data.format_age(now - as_of)
+            ticker_text += f"{ticker}: ${price:.2f} ({change_percent:+.2f}%) [{age}]  |  " if change_percent is not None else f"{ticker}: ${price:.2f} [{age}]  |  "
+        if ticker_text:
+            self.ticker_text = ticker_text
+            self.ticker_label.config(text=ticker_text)
+
+    def save_ticker_snapshot(self):
+        """Save the current ticker tape prices to the shared quote snapshot."""
+        now = time.time()
+        quotes = {ticker: (price, change_percent if change_percent != 'N/A' else None, now)
+                  for ticker, (price, change_percent) in self.ticker_prices.items()
+                  if isinstance(price, (int, float))}
+        if quotes:
+            market_data.save_quote_snapshot(quotes)
+
     def update_ticker_tape(self):
-        """Update the ticker tape with stock prices and percentage changes."""
+        """Update the ticker tape with stock prices and percentage changes (fetched in the background)."""
         if not self.running:
             return
+        self.run_in_background(self.fetch_ticker_infos, self.apply_ticker_infos)
+
+    def fetch_ticker_infos(self):
+        """Background: fetch info for every tape symbol concurrently on the shared pool/session."""
+        def fetch_info(ticker):
+            try:
+                return market_data.get_ticker(ticker, max_age=self.cache_timeout).info, None
+            except Exception as e:
+                return None, e
 
+        tickers = list(self.ticker_stocks)
+        return tickers, list(market_data.get_executor().map(fetch_info, tickers))
+
+    def apply_ticker_infos(self, result):
+        """Tk thread: build the tape text from fetched infos, then schedule the next refresh."""
+        tickers, infos = result
         ticker_text = ""
-        for ticker in self.ticker_stocks:
+        for ticker, (info, err) in zip(tickers, infos):
             try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
+                if err is not None:
+                    raise err
                 price = info.get('currentPrice', 'N/A')
                 prev_close = info.get('previousClose', None)
                 change_percent = ((price - prev_close) / prev_close * 100) if price != 'N/A' and prev_close else 'N/A'
@@ -153,21 +273,30 @@ class StockApp:
                 ticker_text += f"{ticker}: N/A  |  "
                 logging.error(f"Ticker tape error for {ticker}: {e}")
 
-        # Update ticker label
+        self.save_ticker_snapshot()
+
+        # Update ticker label (the running scroll loop picks up the new text)
         if not ticker_text:
             ticker_text = "No data available for ticker tape stocks. Please check logs or try adding new tickers."
-        self.ticker_label.config(text=ticker_text)
+        self.ticker_text = ticker_text
+        self.scroll_pos = 0
+        self.root.after(120000, self.update_ticker_tape)  # Update every 120 seconds
 
-        # Implement scrolling using root.after
-        def scroll_text(pos=0):
-            if not self.running:
-                return
-            self.ticker_label.config(text=ticker_text[pos:] + ticker_text[:pos])
-            pos = (pos + 1) % (len(ticker_text) + 50) if ticker_text else 0
-            self.root.after(100, scroll_text, pos)
+        # Startup priority: recommendations load only after the tape's first prices are in
+        if not self.recommendations_started:
+            self.recommendations_started = True
+            self.startup_marks['ticker_tape'] = time.perf_counter()
+            self.display_daily_recommendations()
 
-        scroll_text()
-        self.root.after(120000, self.update_ticker_tape)  # Update every 120 seconds
+    def scroll_text(self):
+        """Scroll the ticker label one character every 100 ms (single loop for the app's lifetime)."""
+        if not self.running:
+            return
+        text = self.ticker_text
+        if text:
+            self.ticker_label.config(text=text[self.scroll_pos:] + text[:self.scroll_pos])
+            self.scroll_pos = (self.scroll_pos + 1) % (len(text) + 50)
+        self.root.after(100, self.scroll_text)
 
     def fetch_stock_data(self, ticker):
         """Fetch stock data using yfinance with caching."""
@@ -176,7 +305,7 @@ class StockApp:
             return self.cache[ticker]['data']
 
         try:
-            stock = yf.Ticker(ticker)
+            stock = market_data.get_ticker(ticker, max_age=self.cache_timeout)
             info = stock.info
             recommendations = stock.recommendations_summary
             prev_close = info.get('previousClose', None)
@@ -200,7 +329,8 @@ class StockApp:
                 'Ticker': ticker.upper(),
                 'Current Price': current_price,
                 'Daily Change (%)': f"{change_percent:+.2f}" if change_percent != 'N/A' else 'N/A',
-                'Market Cap (Billion USD)': round(info.get('marketCap', 0) / 1e9, 2) if info.get('marketCap') else 'N/A',
+                'Currency': info.get('currency', 'N/A'),
+                'Market Cap (Billion)': round(info.get('marketCap', 0) / 1e9, 2) if info.get('marketCap') else 'N/A',  # in 'Currency'
                 'P/E Ratio': info.get('trailingPE', 'N/A'),
                 'Forward P/E': info.get('forwardPE', 'N/A'),
                 'Dividend Yield (%)': round(info.get('dividendYield', 0) * 100, 2) if info.get('dividendYield') else 'N/A',
@@ -212,11 +342,108 @@ class StockApp:
                 'Analyst Ratings': analyst_ratings
             }
             self.cache[ticker] = {'data': stock_data, 'timestamp': current_time}
+            self.get_fundamentals().upsert(ticker.upper(), stock_data)
             return stock_data
         except Exception as e:
             logging.error(f"Fetch stock data error for {ticker}: {e}")
             return {'Error': f"Error retrieving data for {ticker}: {str(e)}"}
 
+    def get_fundamentals(self):
+        """The columnar fundamentals table (numpy/screener imported on first use; any thread)."""
+        with self.fundamentals_lock:
+            if self.fundamentals is None:
+                import screener
+                self.fundamentals = screener.FundamentalsTable()
+            return self.fundamentals
+
+    def screener_universe(self):
+        """tickers.yaml (the tape universe) plus this app's ticker stocks, de-duplicated."""
+        import history_store
+        return list(dict.fromkeys(history_store.load_watchlist('tickers.yaml') + [t.upper() for t in self.ticker_stocks]))
+
+    def show_screener(self):
+        """Open the screener; symbols not yet in the fundamentals table are fetched in the background."""
+        try:
+            if self.screener_window is None or not self.screener_window.alive():
+                import screener
+
+                def open_symbol(symbol):
+                    self.ticker_entry.delete(0, tk.END)
+                    self.ticker_entry.insert(0, symbol)
+                    self.get_stock_info()
+
+                self.screener_window = screener.ScreenerWindow(self.root, self.get_fundamentals(), on_open=open_symbol)
+            table = self.get_fundamentals()
+            universe = self.screener_universe()
+            missing = [t for t in universe if t not in table.index]
+
+            def load():
+                list(market_data.get_executor().map(self.fetch_stock_data, missing))
+                self.update_history_fields(universe)
+
+            self.screener_window.refresh(loading=f"fetching {len(missing)} more..." if missing else "updating history...")
+            self.run_in_background(load, lambda _results: self.screener_window.alive() and self.screener_window.refresh())
+        except Exception as e:
+            logging.error(f"Screener error: {e}")
+            messagebox.showerror("Error", f"Failed to open screener: {str(e)}")
+
+    def show_correlation(self):
+        """Heatmap of daily-return correlations across the universe (rolling window, updated incrementally)."""
+        import correlation
+        universe = self.screener_universe()
+        if self.correlation is None or self.correlation.symbols != universe:
+            self.correlation = correlation.RollingCorrelation(universe)
+        engine = self.correlation
+
+        def load():
+            started = time.perf_counter()
+            engine.update()
+            symbols, corr = engine.matrix()
+            return symbols, corr, engine.most_correlated(3, corr), time.perf_counter() - started
+
+        def apply(result):
+            symbols, corr, top, seconds = result
+            if self.heatmap_window is None or not self.heatmap_window.alive():
+                import charts
+                self.heatmap_window = charts.HeatmapWindow(self.root)
+            pairs = ", ".join(f"{a}/{b} {c:+.2f}" for a, b, c in top)
+            self.heatmap_window.show(symbols, corr, f"{len(symbols)} symbols, {engine.days()} days "
+                                                    f"({seconds:.2f}s)   most correlated: {pairs}")
+
+        self.output_text.insert(tk.END, "Computing correlations...\n")
+        self.run_in_background(load, apply)
+
+    def show_portfolio(self):
+        """Value holdings.yaml in its base currency: one batch quote download + cached FX, in the background."""
+        try:
+            import portfolio
+            if self.portfolio is None:
+                base, holdings = portfolio.load_holdings()
+                self.portfolio = portfolio.Portfolio(holdings, base)
+            book = self.portfolio
+            if not len(book):
+                messagebox.showinfo("Portfolio", "No holdings. List positions in holdings.yaml (see portfolio.py).")
+                return
+            if self.portfolio_window is None or not self.portfolio_window.alive():
+                self.portfolio_window = portfolio.PortfolioWindow(self.root, book, on_refresh=self.show_portfolio)
+            else:
+                self.portfolio_window.lift()
+
+            def load():
+                book.fx.refresh(book.currencies())
+                return portfolio.fetch_quotes(book.symbols)
+
+            def apply(quotes):
+                book.sync_fx()
+                book.value_board(quotes)  # a full board: one vectorized pass
+                if self.portfolio_window.alive():
+                    self.portfolio_window.refresh()
+
+            self.run_in_background(load, apply)
+        except Exception as e:
+            logging.error(f"Portfolio error: {e}")
+            messagebox.showerror("Error", f"Failed to open portfolio: {str(e)}")
+
     def display_stock_data(self, stock_data, ticker):
         """Display stock data in the output text area."""
         self.output_text.insert(tk.END, f"\nInvestment Information for {ticker}\n")
@@ -254,40 +481,38 @@ class StockApp:
         self.display_stock_data(stock_data, ticker)
 
     def show_chart(self):
-        """Show a 30-day price history chart for the entered ticker."""
+        """Show the price chart for the entered ticker (one chart window, reused across clicks)."""
         ticker = self.ticker_entry.get().strip().upper()
         if not ticker:
             messagebox.showerror("Error", "Please enter a ticker to show the chart.")
             return
 
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="1mo")
-            if hist.empty:
-                messagebox.showerror("Error", f"No historical data available for {ticker}.")
-                return
-
-            fig, ax = plt.subplots(figsize=(6, 4))
-            ax.plot(hist.index, hist['Close'], label=f"{ticker} Closing Price")
-            ax.set_title(f"{ticker} 30-Day Price History")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Price (USD)")
-            ax.legend()
-            ax.grid(True)
-            plt.xticks(rotation=45)
-
-            chart_window = tk.Toplevel(self.root)
-            chart_window.title(f"{ticker} Price Chart")
-            canvas = FigureCanvasTkAgg(fig, master=chart_window)
-            canvas.draw()
-            canvas.get_tk_widget().pack()
+            if self.chart_window is None or not self.chart_window.alive():
+                import charts
+                self.chart_window = charts.ChartWindow(self.root, self.run_in_background)
+            self.chart_window.show(ticker)
         except Exception as e:
             logging.error(f"Chart error for {ticker}: {e}")
             messagebox.showerror("Error", f"Failed to generate chart for {ticker}: {str(e)}")
 
+    def show_comparison(self):
+        """Compare several tickers rebased to 100 (comma/space separated; empty = ticker tape stocks)."""
+        symbols = [t.upper() for t in self.ticker_entry.get().replace(",", " ").split()] or list(self.ticker_stocks)
+        try:
+            if self.compare_window is None or not self.compare_window.alive():
+                import charts
+                self.compare_window = charts.CompareWindow(self.root, self.run_in_background)
+            self.compare_window.show(symbols)
+        except Exception as e:
+            logging.error(f"Comparison chart error for {symbols}: {e}")
+            messagebox.showerror("Error", f"Failed to generate comparison chart: {str(e)}")
+
     def export_to_csv(self):
         """Export displayed stock data to a CSV file."""
         try:
+            import pandas as pd
+
             output_content = self.output_text.get(1.0, tk.END).strip()
             if not output_content:
                 messagebox.showwarning("Warning", "No data to export.")
@@ -327,30 +552,91 @@ class StockApp:
         self.output_text.delete(1.0, tk.END)
 
     def display_daily_recommendations(self):
-        """Display three daily stock recommendations based on analyst ratings."""
-        candidate_tickers = ['AAPL', 'MSFT', 'GOOGL', 'BHP.AX', 'CBA.AX', 'AIA.NZ', 'FPH.NZ', 'TSLA', 'WBC.AX', 'SPK.NZ']
-        recommendations = []
-        for ticker in candidate_tickers:
-            stock_data = self.fetch_stock_data(ticker)
-            if 'Error' not in stock_data:
-                recommendation_mean = stock_data['Recommendation Mean']
-                score = -recommendation_mean if recommendation_mean != 'N/A' else 0
-                recommendations.append((ticker, score))
-
-        recommendations.sort(key=lambda x: x[1])
-        top_tickers = [ticker for ticker, _ in recommendations[:3]]
-
+        """Display the three best-ranked stocks of the configured universe (computed in the background)."""
+        self.output_text.insert(tk.END, "Loading daily recommendations...\n")
+        self.run_in_background(self.rank_daily_recommendations, self.show_daily_recommendations)
+
+    def get_ranking(self):
+        """Factor ranking engine over the fundamentals table (created on first use)."""
+        if self.ranking is None:
+            import ranking
+            self.ranking = ranking.RankingEngine(self.get_fundamentals())
+        return self.ranking
+
+    def update_history_fields(self, universe):
+        """Background: fill the price-history columns (mom, rsi, sma50_gap) of the fundamentals table.
+
+        Daily bars come from the local history store (one batch download for whatever is
+        missing). Each symbol keeps a streaming IndicatorSet: the first call seeds it from the
+        stored bars, later calls push only the bars closed since, and the newest (possibly
+        still forming) bar is peeked.
+        """
+        import numpy as np
+        import history_store
+        import indicators
+        table = self.get_fundamentals()
+        start = int(time.time()) - 183 * 86400
+        history_store.ensure_many(universe, "1d", start)
+        with self.daily_indicators_lock:
+            for symbol in universe:
+                bars = history_store.query(symbol, start=start)
+                bars = bars[~np.isnan(bars["close"])]
+                if len(bars) < 2:
+                    continue
+                closes = bars["close"]
+                if closes[0] > 0:
+                    table.set_field(symbol, "mom", (closes[-1] / closes[0] - 1.0) * 100.0)
+
+                state = self.daily_indicators.setdefault(symbol, [indicators.IndicatorSet(), -1])
+                closed = bars[:-1]
+                state[0].seed(closed[closed["ts"] > state[1]])
+                state[1] = int(closed["ts"][-1])
+                last = bars[-1]
+                now = state[0].peek(float(last["high"]), float(last["low"]), float(last["close"]))
+                if now["rsi"] is not None:
+                    table.set_field(symbol, "rsi", now["rsi"])
+                if now["sma_slow"]:
+                    table.set_field(symbol, "sma50_gap", (float(last["close"]) / now["sma_slow"] - 1.0) * 100.0)
+
+    def rank_daily_recommendations(self):
+        """Background: refresh fundamentals + price-history fields for the universe, return the top three
+        as (ticker, score, factors, stock_data).
+
+        Fundamentals come from the 5-minute cache where possible, momentum and indicators from
+        update_history_fields(). Only rows that changed since the last ranking are re-scored.
+        """
+        universe = self.screener_universe()
+        list(market_data.get_executor().map(self.fetch_stock_data, universe))
+        self.update_history_fields(universe)
+
+        engine = self.get_ranking()
+        engine.sync()
+        return [(ticker, score, factors, self.fetch_stock_data(ticker))
+                for ticker, score, factors in engine.top(3, universe)]
+
+    def show_daily_recommendations(self, top_ranked):
+        """Tk thread: render the recommendations with their factor breakdown (no fetching here)."""
         self.output_text.delete(1.0, tk.END)
-        self.output_text.insert(tk.END, "Daily Stock Recommendations (Based on Analyst Ratings)\n")
-        self.output_text.insert(tk.END, "=" * 50 + "\n\n")
-
-        for ticker in top_tickers:
-            stock_data = self.fetch_stock_data(ticker)
+        self.output_text.insert(tk.END, "Daily Stock Recommendations (Multi-Factor Ranking)\n")
+        self.output_text.insert(tk.END, "=" * 50 + "\n")
+        self.output_text.insert(tk.END, "Factors (z-score, higher is better): rec = analyst mean, upside = to target, "
+                                        "pe = P/E, div_yield = yield, mom = 6-month return\n\n")
+
+        for ticker, score, factors, stock_data in top_ranked:
+            breakdown = ", ".join(f"{name} {z:+.2f}" for name, z in factors.items())
+            self.output_text.insert(tk.END, f"{ticker}: score {score:+.2f} ({breakdown})\n")
             self.display_stock_data(stock_data, ticker)
+        if not top_ranked:
+            self.output_text.insert(tk.END, "Not enough data to rank the universe right now.\n")
+
+        if 'recommendations' not in self.startup_marks:
+            self.startup_marks['recommendations'] = time.perf_counter()
+            self.report_startup_timing()
 
     def stop(self):
         """Stop the ticker tape thread when closing the app."""
         self.running = False
+        market_data.shutdown()
 
 def main():
     root = tk.Tk()